@@ -6,12 +6,21 @@ matplotlib.use('Agg')
 from flask import Flask, request, send_file, jsonify
 from flask_cors import CORS
 import pandas as pd
-import re
 import io
 import logging
 import paramiko
 from io import BytesIO
-from app.parser_script import parse_log_file, parse_log_file2, parse_log_file3  # ✅ Absolute import
+from app.parser_script import PARSER_VERSION, TIMESTAMP_FORMAT, parse_log_file3, parse_many  # ✅ Absolute import
+from app.parse_cache import ParseCache
+from app.history_store import HistoryStore
+from app.log_follower import LogFollower
+from app.result_cache import ResultCache
+from app.yield_state import StaleYieldState, YieldState
+from app.yield_summary import (
+    create_slt_tracker, create_yield_summary, create_yield_summary2, create_yield_summary3,
+    render_failure_summaries, count_bank_nonbank_failures_by_mode,
+    count_all_failures, pie_chart_data, DEFAULT_LOT_PATTERN
+)
 from werkzeug.utils import secure_filename
 
 import matplotlib.pyplot as plt
@@ -55,6 +64,48 @@ app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024
 UPLOAD_FOLDER = "uploads"  # Ensure this folder exists
 os.makedirs(UPLOAD_FOLDER, exist_ok=True)
 
+# Number of processes used to parse an upload; defaults to every core
+PARSE_WORKERS = int(os.getenv("PARSE_WORKERS", os.cpu_count() or 1))
+
+# On-disk cache of parsed rows, so re-uploaded logs are not parsed again
+PARSE_CACHE = ParseCache(
+    os.getenv("PARSE_CACHE_DIR", "parse_cache"),
+    max_bytes=int(os.getenv("PARSE_CACHE_MAX_BYTES", 256 * 1024 * 1024))
+)
+
+# Local Format 1, Format 2 and Merge histories; the sheets are published from them.
+# One Merge row is kept per chip and power mode: the first ingested ("first")
+# or the one with the latest Timestamp ("latest")
+HISTORY = HistoryStore(
+    os.getenv("HISTORY_PATH", "history.sqlite3"),
+    dedup_policy=os.getenv("MERGE_DEDUP_POLICY", "first")
+)
+
+# Rows per chunk when streaming the Merge history for aggregation, which
+# bounds the memory it takes
+HISTORY_CHUNK_ROWS = int(os.getenv("HISTORY_CHUNK_ROWS", 50000))
+
+# Running SLT Tracker and Yield counters, updated by each upload's new rows
+YIELD_STATE = YieldState(
+    os.getenv("YIELD_STATE_PATH", "yield_state.sqlite3"),
+    lot_pattern=os.getenv("LOT_PATTERN", DEFAULT_LOT_PATTERN)  # Lot prefix of a Marking Id, for the rollups
+)
+# Counters left by another version or lot pattern, or never built, are rebuilt
+# here and by the next ingest (see YieldState.apply), never by a read
+YIELD_STATE.sync(HISTORY.count("Merge"), lambda: HISTORY.read_chunks("Merge", HISTORY_CHUNK_ROWS))
+
+# Computed tables and charts shared across workers, so they are built once
+# per Merge dataset version (or per upload, for /get_piechart)
+RESULT_CACHE = ResultCache(
+    os.getenv("RESULT_CACHE_PATH", "result_cache.sqlite3"),
+    max_bytes=int(os.getenv("RESULT_CACHE_MAX_BYTES", 64 * 1024 * 1024))
+)
+
+# Logs still being written can be followed from FOLLOW_LOG_DIR (see /follow);
+# the byte offset reached in each is checkpointed under FOLLOW_CHECKPOINT_DIR
+FOLLOW_LOG_DIR = os.getenv("FOLLOW_LOG_DIR", UPLOAD_FOLDER)
+FOLLOWER = LogFollower(os.getenv("FOLLOW_CHECKPOINT_DIR", "follow_checkpoints"))
+
 # ✅ Read SFTP config from environment variable
 sftp_config_base64 = os.getenv("SFTP_CONFIG_BASE64")
 
@@ -73,314 +124,6 @@ except json.JSONDecodeError as e:
 
 
 
-def create_slt_tracker(merge_df):
-    print("Columns in Merge Sheet:", merge_df.columns.tolist())
-
-    required_columns = ["Marking Id", "Current Power Mode", "Final Bin", "Bank Related Fails", "Non-Bank Related Fails"]
-    for column in required_columns:
-        if column not in merge_df.columns:
-            raise ValueError(f"Column '{column}' not found in the Merge sheet.")
-
-    merge_df = merge_df.drop_duplicates(subset=["Marking Id", "Current Power Mode"], keep="first")
-
-    unique_ids = merge_df["Marking Id"].unique()
-    slt_tracker_df = pd.DataFrame({
-        "Marking Id": unique_ids,
-        "Binning_ECO": "",
-        "Binning_SPORT": "",
-        "Failure_Remarks_ECO": "",
-        "Failure_Remarks_SPORT": "",
-        "Final Binning": "",
-    })
-
-    binning_dict = merge_df.set_index(["Marking Id", "Current Power Mode"])["Final Bin"].to_dict()
-    failure_dict = merge_df.set_index(["Marking Id", "Current Power Mode"])[["Bank Related Fails", "Non-Bank Related Fails"]].to_dict(orient='index')
-
-
-    for index, row in slt_tracker_df.iterrows():
-        marking_id = row["Marking Id"]
-        
-        if (marking_id, "ECO") in binning_dict:
-            slt_tracker_df.at[index, "Binning_ECO"] = binning_dict[(marking_id, "ECO")]
-        if (marking_id, "SPORT") in binning_dict:
-            slt_tracker_df.at[index, "Binning_SPORT"] = binning_dict[(marking_id, "SPORT")]
-        
-        if (marking_id, "ECO") in failure_dict:
-            slt_tracker_df.at[index, "Failure_Remarks_ECO"] = f"Bank Related: {failure_dict[(marking_id, 'ECO')]['Bank Related Fails']}, Non-Bank Related: {failure_dict[(marking_id, 'ECO')]['Non-Bank Related Fails']}"
-        if (marking_id, "SPORT") in failure_dict:
-            slt_tracker_df.at[index, "Failure_Remarks_SPORT"] = f"Bank Related: {failure_dict[(marking_id, 'SPORT')]['Bank Related Fails']}, Non-Bank Related: {failure_dict[(marking_id, 'SPORT')]['Non-Bank Related Fails']}"
-
-    slt_tracker_df["Final Binning"] = slt_tracker_df.apply(calculate_final_binning, axis=1)
-    
-    return slt_tracker_df
-
-def calculate_final_binning(row):
-    eco_bin = row["Binning_ECO"].strip()
-    sport_bin = row["Binning_SPORT"].strip()
-
-    if eco_bin == "HB1(ECO)":
-        return "HB1(ECO)"
-    elif eco_bin == "Failed(ECO)" and sport_bin == "HB2(SPORT)":
-        return "HB2(SPORT)"
-    elif eco_bin == "HB1(ECO)" and sport_bin == "HB2(SPORT)":
-        return "HB1(ECO)"
-    elif eco_bin == "Failed(ECO)" and (sport_bin == "Failed(SPORT)" or not sport_bin):
-        return "Failed(ECO)"
-    return ""
-
-
-def create_yield_summary(slt_tracker_df):
-    # Calculate counts for each category
-    failed_eco_count = (slt_tracker_df["Binning_ECO"] == "Failed(ECO)").sum()
-    hb1_eco_count = (slt_tracker_df["Binning_ECO"] == "HB1(ECO)").sum()
-    special_eco_count = (slt_tracker_df["Binning_ECO"] == "Special Case").sum()
-    
-    # Calculate Grand Total as the sum of individual counts
-    grand_total = failed_eco_count + hb1_eco_count + special_eco_count
-    
-    summary = {
-        "SPORT-from SLT Tracker": ["Failed (SPORT)", "HB1 (SPORT)", "Special Case", "Grand Total"],
-        "Count of marking ID": [
-            failed_eco_count,
-            hb1_eco_count,
-            special_eco_count,
-            grand_total  # Corrected Grand Total
-        ]
-    }
-    yield_df = pd.DataFrame(summary)
-
-    return yield_df
-
-
-def create_yield_summary2(slt_tracker_df):
-    # Calculate counts for each category
-    failed_sport_count = (slt_tracker_df["Binning_SPORT"] == "Failed(SPORT)").sum()
-    hb1_sport_count = (slt_tracker_df["Binning_SPORT"] == "HB1(SPORT)").sum()
-    special_case_count = (slt_tracker_df["Binning_SPORT"] == "Special Case").sum()
-    
-    # Calculate Grand Total as the sum of individual counts
-    grand_total = failed_sport_count + hb1_sport_count + special_case_count
-    
-    summary = {
-        "SPORT-from SLT Tracker": ["Failed (SPORT)", "HB1 (SPORT)", "Special Case", "Grand Total"],
-        "Count of marking ID": [
-            failed_sport_count,
-            hb1_sport_count,
-            special_case_count,
-            grand_total  # Corrected Grand Total
-        ]
-    }
-    yield_df1 = pd.DataFrame(summary)
-
-    return yield_df1
-
-def create_yield_summary3(slt_tracker_df):
-    # Calculate counts for each category
-    failed_eco_count = (slt_tracker_df["Final Binning"] == "Failed(ECO)").sum()
-    hb1_eco_count = (slt_tracker_df["Final Binning"] == "HB1(ECO)").sum()
-    special_eco_count = (slt_tracker_df["Final Binning"] == "Special Case").sum()
-    failed_sport_count = (slt_tracker_df["Final Binning"] == "Failed(SPORT)").sum()
-    hb1_sport_count = (slt_tracker_df["Final Binning"] == "HB1(SPORT)").sum()
-    special_case_count = (slt_tracker_df["Final Binning"] == "Special Case").sum()
-    
-    # Calculate Grand Total as the sum of individual counts
-    grand_total = failed_eco_count + hb1_eco_count + special_eco_count + failed_sport_count + hb1_sport_count + special_case_count
-    
-    summary = {
-        "Final Binning": ["Failed (ECO)","HB1 (ECO)","Failed (SPORT)", "HB1 (SPORT)", "Special Case", "Grand Total"],
-        "Count of marking ID": [
-            failed_eco_count,
-            hb1_eco_count,
-            failed_sport_count,
-            hb1_sport_count,
-            special_case_count,
-            grand_total  # Corrected Grand Total
-        ]
-    }
-    yield_summary = pd.DataFrame(summary)
-
-    return yield_summary
-
-
-
-def count_bank_nonbank_failures_ECO(Merge):
-    # Extract unique failure categories from both columns, excluding N/A values
-    unique_bank_failures = Merge["Bank Related Fails"].dropna().replace("N/A", None).dropna().unique()
-    unique_nonbank_failures = Merge["Non-Bank Related Fails"].dropna().replace("N/A", None).dropna().unique()
-    
-    # Initialize dictionaries for counts
-    conditions = {failure: 0 for failure in unique_bank_failures}
-    conditions.update({failure: 0 for failure in unique_nonbank_failures})
-
-    # Count failures in ECO mode
-    for key in conditions.keys():
-        conditions[key] += ((Merge["Current Power Mode"] == "ECO") & 
-                            ((Merge["Bank Related Fails"] == key) | 
-                             (Merge["Non-Bank Related Fails"] == key))).sum()
-    
-    # Count adjacent failures
-    adjacent_conditions = {key + " (Adjacent)": 0 for key in conditions.keys()}
-    for key in conditions.keys():
-        adjacent_conditions[key + " (Adjacent)"] += ((Merge["Current Power Mode"] == "ECO") & 
-                                                     ((Merge["Bank Related Fails"] == key) | 
-                                                      (Merge["Non-Bank Related Fails"] == key)) & 
-                                                     (Merge["Adjacent"] == "Yes")).sum()
-
-    # Merge counts
-    conditions.update(adjacent_conditions)
-
-    # Convert dictionary to DataFrame
-    summary = pd.DataFrame(list(conditions.items()), columns=["failure_ECO", "Count"])
-
-    # Filter out zero-count entries
-    summary = summary[summary["Count"] > 0].reset_index(drop=True)
-
-    # Compute grand total
-    grand_total = summary["Count"].sum()
-
-    # Append the Grand Total row
-    summary.loc[len(summary.index)] = ["Grand Total", grand_total]
-
-    return summary
-
-def count_bank_nonbank_failures_SPORT(Merge):
-    # Extract unique failure categories from both columns, excluding N/A values
-    unique_bank_failures = Merge["Bank Related Fails"].dropna().replace("N/A", None).dropna().unique()
-    unique_nonbank_failures = Merge["Non-Bank Related Fails"].dropna().replace("N/A", None).dropna().unique()
-    
-    # Initialize dictionaries for counts
-    conditions = {failure: 0 for failure in unique_bank_failures}
-    conditions.update({failure: 0 for failure in unique_nonbank_failures})
-
-    # Count failures in ECO mode
-    for key in conditions.keys():
-        conditions[key] += ((Merge["Current Power Mode"] == "SPORT") & 
-                            ((Merge["Bank Related Fails"] == key) | 
-                             (Merge["Non-Bank Related Fails"] == key))).sum()
-    
-    # Count adjacent failures
-    adjacent_conditions = {key + " (Adjacent)": 0 for key in conditions.keys()}
-    for key in conditions.keys():
-        adjacent_conditions[key + " (Adjacent)"] += ((Merge["Current Power Mode"] == "SPORT") & 
-                                                     ((Merge["Bank Related Fails"] == key) | 
-                                                      (Merge["Non-Bank Related Fails"] == key)) & 
-                                                     (Merge["Adjacent"] == "Yes")).sum()
-
-    # Merge counts
-    conditions.update(adjacent_conditions)
-
-    # Convert dictionary to DataFrame
-    summary = pd.DataFrame(list(conditions.items()), columns=["Failure_SPORT", "Count"])
-
-    # Filter out zero-count entries
-    summary = summary[summary["Count"] > 0].reset_index(drop=True)
-
-    # Compute grand total
-    grand_total = summary["Count"].sum()
-
-    # Append the Grand Total row
-    summary.loc[len(summary.index)] = ["Grand Total", grand_total]
-
-    return summary
-
-
-
-'''def count_bank_nonbank_failures(Merge):
-    # Extract unique failure categories from both columns, excluding N/A values
-    unique_bank_failures = Merge["Bank Related Fails"].dropna().replace("N/A", None).dropna().unique()
-    unique_nonbank_failures = Merge["Non-Bank Related Fails"].dropna().replace("N/A", None).dropna().unique()
-    
-    # Initialize dictionary for counts
-    conditions = {failure: 0 for failure in unique_bank_failures}
-    conditions.update({failure: 0 for failure in unique_nonbank_failures})
-
-    # Count failures across all modes
-    for key in conditions.keys():
-        conditions[key] += ((Merge["Bank Related Fails"] == key) | (Merge["Non-Bank Related Fails"] == key)).sum()
-    
-    # Count adjacent failures
-    adjacent_conditions = {key + " (Adjacent)": 0 for key in conditions.keys()}
-    for key in conditions.keys():
-        adjacent_conditions[key + " (Adjacent)"] += (((Merge["Bank Related Fails"] == key) | (Merge["Non-Bank Related Fails"] == key)) & (Merge["Adjacent"] == "Yes")).sum()
-    
-    # Merge counts
-    conditions.update(adjacent_conditions)
-
-    # Convert dictionary to DataFrame
-    summary = pd.DataFrame(list(conditions.items()), columns=["Category", "Count"])
-
-    # Filter out zero-count entries
-    summary = summary[summary["Count"] > 0].reset_index(drop=True)
-
-    # Compute grand total
-    grand_total = summary["Count"].sum()
-
-    # Append the Grand Total row
-    summary.loc[len(summary.index)] = ["Grand Total", grand_total]
-
-    return summary'''
-
-
-def count_all_failures(Merge):
-    # Count Bank Related Fails other than N/A or " " for ECO and SPORT separately
-    bank_eco = ((Merge["Current Power Mode"] == "ECO") & Merge["Bank Related Fails"].notna() & (Merge["Bank Related Fails"] != " ")).sum()
-    bank_sport = ((Merge["Current Power Mode"] == "SPORT") & Merge["Bank Related Fails"].notna() & (Merge["Bank Related Fails"] != " ")).sum()
-
-    # Count Adjacent Column Failures other than N/A or " " for ECO and SPORT separately
-    adjacent_eco = ((Merge["Current Power Mode"] == "ECO") & Merge["Adjacent"].notna() & (Merge["Adjacent"] != " ")).sum()
-    adjacent_sport = ((Merge["Current Power Mode"] == "SPORT") & Merge["Adjacent"].notna() & (Merge["Adjacent"] != " ")).sum()
-
-    # Count CMCM Functional Tests failures other than N/A, " ", "p" for ECO and SPORT separately
-    cmcm_eco = ((Merge["Current Power Mode"] == "ECO") & Merge["CMCM Functional Tests"].notna() & (Merge["CMCM Functional Tests"] != " ") & (Merge["CMCM Functional Tests"] != "p")).sum()
-    cmcm_sport = ((Merge["Current Power Mode"] == "SPORT") & Merge["CMCM Functional Tests"].notna() & (Merge["CMCM Functional Tests"] != " ") & (Merge["CMCM Functional Tests"] != "p")).sum()
-
-    # Count LPDDR Test failures other than N/A, " ", "p" for ECO and SPORT separately
-    lpddr_eco = ((Merge["Current Power Mode"] == "ECO") & Merge["LPDDR Test"].notna() & (Merge["LPDDR Test"] != " ") & (Merge["LPDDR Test"] != "p")).sum()
-    lpddr_sport = ((Merge["Current Power Mode"] == "SPORT") & Merge["LPDDR Test"].notna() & (Merge["LPDDR Test"] != " ") & (Merge["LPDDR Test"] != "p")).sum()
-
-    # Count Final Bin as passing when HB1 (ECO) or HB2 (SPORT)
-    final_bin_pass_eco = (Merge["Final Bin"] == "HB1").sum()
-    final_bin_pass_sport = (Merge["Final Bin"] == "HB2").sum()
-    
-    # Count Special Cases
-    #special_case_eco = ((Merge["Current Power Mode"] == "ECO") & (Merge["Special Case"].notna())).sum()
-    #special_case_sport = ((Merge["Current Power Mode"] == "SPORT") & (Merge["Special Case"].notna())).sum()
-    
-    # Total counts
-    total_eco = bank_eco + adjacent_eco + cmcm_eco + lpddr_eco + final_bin_pass_eco 
-    total_sport = bank_sport + adjacent_sport + cmcm_sport + lpddr_sport + final_bin_pass_sport 
-    
-    # Compute percentages
-    def calc_percentage(count, total):
-        return f"{(count / total * 100):.1f}%" if total > 0 else "0%"
-
-    summary = pd.DataFrame({
-        "Failure Modes": [
-            "Bank-related Fails",
-            "Adjacent Col Fails",
-            "CMCM Func Fails",
-            "LPDDR Fails",
-            "Passing"
-        ],
-        "ECO": [bank_eco, adjacent_eco, cmcm_eco, lpddr_eco, final_bin_pass_eco],
-        "SPORT": [bank_sport, adjacent_sport, cmcm_sport, lpddr_sport, final_bin_pass_sport],
-        "ECO %": [calc_percentage(bank_eco, total_eco), calc_percentage(adjacent_eco, total_eco), calc_percentage(cmcm_eco, total_eco), calc_percentage(lpddr_eco, total_eco), calc_percentage(final_bin_pass_eco, total_eco)],
-        "SPORT %": [calc_percentage(bank_sport, total_sport), calc_percentage(adjacent_sport, total_sport), calc_percentage(cmcm_sport, total_sport), calc_percentage(lpddr_sport, total_sport), calc_percentage(final_bin_pass_sport, total_sport)]
-    })
-    
-    # Append total row
-    summary.loc[len(summary.index)] = ["Total", total_eco, total_sport, "", ""]
-    
-    return summary
-
-
-
-    
-
-        
-
-
-
 def clear_sheet(sheet_name):
     """Clears all data from a Google Sheet."""
     sheet = client.open("UAI").worksheet(sheet_name)
@@ -430,6 +173,44 @@ def get_existing_data(sheet_name):
         return pd.DataFrame()
 
 
+def seed_history(sheet_name):
+    """Copy a sheet into the local history the first time it is used; the history is the source of truth afterwards."""
+    if not HISTORY.seeded(sheet_name):
+        if HISTORY.seed(sheet_name, get_existing_data(sheet_name)):
+            republish_history(sheet_name)  # Duplicates were dropped from it
+
+
+def republish_history(sheet_name):
+    """Rewrite a sheet with the whole local history."""
+    clear_sheet(sheet_name)
+    update_google_sheet(sheet_name, HISTORY.read(sheet_name))
+
+
+def publish_history(sheet_name, new_data, replaced):
+    """
+    Append newly stored rows to their sheet, rewriting it in full only if
+    they replaced stored rows or its header no longer matches the history.
+    """
+    sheet = client.open("UAI").worksheet(sheet_name)
+    columns = HISTORY.columns(sheet_name)
+    if replaced.empty and sheet.row_values(1) == columns:
+        if not new_data.empty:
+            sheet.append_rows(new_data.reindex(columns=columns).values.tolist(), value_input_option='RAW')
+    else:
+        republish_history(sheet_name)
+
+
+def store_history(sheet_name, new_data):
+    """
+    Add newly parsed rows to the local history and publish them to its sheet.
+    Returns (stored, replaced, preceding) as HistoryStore.append does.
+    """
+    seed_history(sheet_name)
+    stored, replaced, preceding = HISTORY.append(sheet_name, new_data)
+    publish_history(sheet_name, stored, replaced)
+    return stored, replaced, preceding
+
+
 @app.route('/process_logs', methods=['POST'])
 def process_logs():
     try:
@@ -442,27 +223,29 @@ def process_logs():
 
         sheet_data = {"Format 1": [], "Format 2": [], "Merge": []}
 
-        # Process uploaded files
-        for file in files:
-            with tempfile.TemporaryDirectory() as temp_dir:
-                temp_file_path = os.path.join(temp_dir, file.filename)
+        # Process uploaded files: save each one, then parse them all across the worker pool
+        with tempfile.TemporaryDirectory() as temp_dir:
+            temp_file_paths = []
+            for index, file in enumerate(files):
+                file_dir = os.path.join(temp_dir, str(index))  # Keep same-named uploads apart
+                os.makedirs(file_dir)
+                temp_file_path = os.path.join(file_dir, file.filename)
                 file.save(temp_file_path)
                 logging.debug(f"Saved file to temporary path: {temp_file_path}")
+                temp_file_paths.append(temp_file_path)
 
-                try:
-                    df1 = parse_log_file(temp_file_path)  # Parse for Format 1
-                    df2 = parse_log_file2(temp_file_path)  # Parse for Format 2
-                    df3 = parse_log_file3(temp_file_path)  # Parse for Merge
-
-                    if df1 is not None and not df1.empty:
-                        sheet_data["Format 1"].append(df1)
-                    if df2 is not None and not df2.empty:
-                        sheet_data["Format 2"].append(df2)
-                    if df3 is not None and not df3.empty:
-                        sheet_data["Merge"].append(df3)
-                except Exception as e:
-                    logging.error(f"Error processing file {file.filename}: {str(e)}", exc_info=True)
-                    return {"error": f"Error processing file {file.filename}: {str(e)}"}, 500
+            try:
+                df1, df2, df3 = parse_many(temp_file_paths, workers=PARSE_WORKERS, cache=PARSE_CACHE)  # Format 1, Format 2 and Merge
+            except ValueError as e:
+                logging.error(str(e), exc_info=True)
+                return {"error": str(e)}, 500
+
+        if not df1.empty:
+            sheet_data["Format 1"].append(df1)
+        if not df2.empty:
+            sheet_data["Format 2"].append(df2)
+        if not df3.empty:
+            sheet_data["Merge"].append(df3)
 
         # Ensure sheets exist
         ensure_sheet_exists("Format 1")
@@ -474,16 +257,12 @@ def process_logs():
 
         # Update "Format 1" and "Format 2" sheets
         if sheet_data["Format 1"]:
-            existing_format1_data = get_existing_data("Format 1")
             new_format1_data = pd.concat(sheet_data["Format 1"], ignore_index=True)
-            combined_format1_data = pd.concat([existing_format1_data, new_format1_data], ignore_index=True)
-            update_google_sheet("Format 1", combined_format1_data)
+            store_history("Format 1", new_format1_data)
 
         if sheet_data["Format 2"]:
-            existing_format2_data = get_existing_data("Format 2")
             new_format2_data = pd.concat(sheet_data["Format 2"], ignore_index=True)
-            combined_format2_data = pd.concat([existing_format2_data, new_format2_data], ignore_index=True)
-            update_google_sheet("Format 2", combined_format2_data)
+            store_history("Format 2", new_format2_data)
 
         # Reset "SLT Tracker" and "Yield" sheets
         clear_sheet("SLT Tracker")
@@ -491,41 +270,16 @@ def process_logs():
 
         # Update "Merge" sheet
         if sheet_data["Merge"]:
-            existing_merge_data = get_existing_data("Merge")
             new_merge_data = pd.concat(sheet_data["Merge"], ignore_index=True)
-            combined_merge_data = pd.concat([existing_merge_data, new_merge_data], ignore_index=True)
-            update_google_sheet("Merge", combined_merge_data)
-
-            # Update "SLT Tracker" and "Yield" sheets
-            slt_tracker_df = create_slt_tracker(combined_merge_data)
-            update_google_sheet("SLT Tracker", slt_tracker_df)
 
-            yield_df = create_yield_summary(slt_tracker_df)
-            update_google_sheet1("Yield", yield_df)
+            # Bring the running yield counters up to date by the new and replaced
+            # rows only; they are rebuilt from the history if it no longer matches them
+            stored_merge_data, replaced, preceding = store_history("Merge", new_merge_data)
+            YIELD_STATE.apply(
+                stored_merge_data, replaced, preceding, lambda: HISTORY.read_chunks("Merge", HISTORY_CHUNK_ROWS)
+            )
 
-            yield_df2 = create_yield_summary2(slt_tracker_df)
-            update_google_sheet1("Yield", yield_df2)
-
-            yield_df3 = create_yield_summary3(slt_tracker_df)
-            update_google_sheet1("Yield", yield_df3)
-
-            yield_df4 = count_bank_nonbank_failures_ECO(combined_merge_data)
-            update_google_sheet1("Yield", yield_df4)
-
-            yield_df5 = count_bank_nonbank_failures_SPORT(combined_merge_data)
-            update_google_sheet1("Yield", yield_df5)
-
-            yield_df7 = count_all_failures(combined_merge_data)
-            update_google_sheet1("Yield", yield_df7)
-
-            # Generate pie charts for ECO and SPORT modes
-            test_columns = ['Noc PassThrough', 'Noc Route', 'Bank Cram Test', 'CMCM Functional Tests', 'UCM_ALL', 'LPDDR Test', 'Failed Banks']
-            eco_chart = generate_combined_pie_chart(combined_merge_data[combined_merge_data['Current Power Mode'] == 'ECO'], "ECO Mode - Combined Test Results", test_columns)
-            sport_chart = generate_combined_pie_chart(combined_merge_data[combined_merge_data['Current Power Mode'] == 'SPORT'], "SPORT Mode - Combined Test Results", test_columns)
-
-            bar_chart = generate_yield_bar_chart(yield_df4, yield_df5)
-
-            update_chart_sheet(eco_chart, sport_chart, bar_chart)
+            publish_merge_results()
 
         return jsonify({"message": "Google Sheets updated successfully"}), 200
     except Exception as e:
@@ -646,25 +400,12 @@ def generate_yield_bar_chart(yield_df4, yield_df5):
     return img_base64
 
 
-def extract_numeric(value):
-    """Extracts numeric part from a string like '12F' -> 12, or handles 'P' as 100% passed."""
-    if isinstance(value, str):
-        value = value.strip().upper()
-        if value == "P":
-            return 0  # Ignore "P" (100% passed)
-        match = re.search(r'(\d+)', value)
-        return int(match.group(1)) if match else 0
-    return 0
-
 def generate_combined_pie_chart(df, title, test_columns):
+    return render_pie_chart(pie_chart_data(df, test_columns), title)
 
-    combined_data = {}
 
-    for column in test_columns:
-        if column in df.columns:
-            df[column] = df[column].astype(str)  # Convert to string to avoid errors
-            df[column] = df[column].apply(extract_numeric)  # Extract numeric values
-            combined_data[column] = df[column].sum()  # Sum values per test column
+def render_pie_chart(combined_data, title):
+    """Pie chart (base64 PNG) of pie_chart_data output, or None if every sum is 0."""
 
     # Ensure there is valid data
     combined_data = {k: v for k, v in combined_data.items() if v > 0}
@@ -701,6 +442,56 @@ def generate_combined_pie_chart(df, title, test_columns):
 
 
 
+def compute_merge_results():
+    """SLT Tracker, Yield tables and charts of the Merge history held by YIELD_STATE."""
+    slt_tracker_df = YIELD_STATE.slt_tracker()
+
+    bin_counts = YIELD_STATE.bin_counts()  # Shared by the three yield tables
+    yield_df = create_yield_summary(slt_tracker_df, bin_counts)
+    yield_df2 = create_yield_summary2(slt_tracker_df, bin_counts)
+    yield_df3 = create_yield_summary3(slt_tracker_df, bin_counts)
+
+    failure_summaries = render_failure_summaries(*YIELD_STATE.failure_categories())
+    yield_df4 = failure_summaries["ECO"]
+    yield_df5 = failure_summaries["SPORT"]
+
+    yield_df7 = count_all_failures(None, YIELD_STATE.failure_counts())
+
+    # Generate pie charts for ECO and SPORT modes
+    pie_data = YIELD_STATE.pie_sums()
+    eco_chart = render_pie_chart(pie_data["ECO"], "ECO Mode - Combined Test Results")
+    sport_chart = render_pie_chart(pie_data["SPORT"], "SPORT Mode - Combined Test Results")
+
+    bar_chart = generate_yield_bar_chart(yield_df4, yield_df5)
+
+    return {
+        "slt_tracker": slt_tracker_df,
+        "yield_tables": [yield_df, yield_df2, yield_df3, yield_df4, yield_df5, yield_df7],
+        "eco_chart": eco_chart,
+        "sport_chart": sport_chart,
+        "bar_chart": bar_chart,
+    }
+
+
+def merge_results():
+    """
+    compute_merge_results, served from RESULT_CACHE when any worker already
+    built it for the current Merge dataset version.
+    """
+    return RESULT_CACHE.get_or_compute_current("merge_results", compute_merge_results, YIELD_STATE.dataset_version)
+
+
+def publish_merge_results():
+    """Write the SLT Tracker, Yield tables and charts of the Merge history to their (cleared) sheets."""
+    results = merge_results()
+
+    # Update "SLT Tracker" and "Yield" sheets
+    update_google_sheet("SLT Tracker", results["slt_tracker"])
+    for yield_table in results["yield_tables"]:
+        update_google_sheet1("Yield", yield_table)
+
+    update_chart_sheet(results["eco_chart"], results["sport_chart"], results["bar_chart"])
+
 
 def update_chart_sheet(eco_chart, sport_chart, bar_chart):
     """Updates the 'Chart' sheet with pie chart URLs for ECO and SPORT modes along with the bar chart."""
@@ -740,12 +531,19 @@ def get_piechart():
     files = request.files.getlist('files')
     if not files:
         return jsonify({"error": "No files uploaded"}), 400
-    
+
+    # The charts depend only on the uploaded contents, so repeats are served from the cache
+    contents = [file.read() for file in files]
+    cache_key = ResultCache.key_for(f"piechart.{PARSER_VERSION}", *contents)
+    pie_charts = RESULT_CACHE.get(cache_key)
+    if pie_charts is not None:
+        return jsonify(pie_charts)
+
     sheet_data = {"Merge": []}
 
-    for file in files:
+    for file, content in zip(files, contents):
         with tempfile.NamedTemporaryFile(delete=False) as temp_file:
-            temp_file.write(file.read())
+            temp_file.write(content)
             temp_file_path = temp_file.name
 
         try:
@@ -779,9 +577,181 @@ def get_piechart():
         "ECO": f"data:image/png;base64,{eco_chart}" if eco_chart else None,
         "SPORT": f"data:image/png;base64,{sport_chart}" if sport_chart else None
     }
+    RESULT_CACHE.put(cache_key, pie_charts)
 
     return jsonify(pie_charts)
 
+
+# /yield query parameters -> Merge column they filter on; each may be repeated
+YIELD_QUERY_FILTERS = {
+    "chip_version": "Chip Version",
+    "slt_test_version": "SLT Test Version",
+    "frequency": "Current Frequency",
+    "power_mode": "Current Power Mode",
+    "marking_id": "Marking Id",
+}
+
+
+def timestamp_bound(value, end=False):
+    """
+    A /yield 'from' or 'to' date/datetime as a log Timestamp, which sorts
+    chronologically as text. 'to' is inclusive: a bare date covers that day.
+    """
+    bound = pd.Timestamp(value)
+    if end:
+        bound += pd.Timedelta(days=1) if len(value.strip()) <= 10 else pd.Timedelta(seconds=1)
+    return bound.strftime(TIMESTAMP_FORMAT)
+
+
+def query_yield(equals, ranges):
+    """Yield tables over the Merge rows matching the filters (see HistoryStore.query)."""
+    rows = HISTORY.count("Merge", equals, ranges)
+    if rows <= HISTORY_CHUNK_ROWS:
+        merge_df = HISTORY.query("Merge", equals, ranges)
+        slt_tracker_df = create_slt_tracker(merge_df)
+        failure_summaries = count_bank_nonbank_failures_by_mode(merge_df)  # Every mode in one pass
+        return {
+            "rows": rows,
+            "yield_summary": create_yield_summary3(slt_tracker_df),
+            "failure_modes": count_all_failures(merge_df),
+            "eco_failures": failure_summaries["ECO"],
+            "sport_failures": failure_summaries["SPORT"],
+        }
+
+    # Too many rows to hold at once: combine them chunk by chunk in a scratch yield state
+    with tempfile.TemporaryDirectory() as scratch_dir:
+        state = YieldState(os.path.join(scratch_dir, "yield_state.sqlite3"))
+        state.rebuild(HISTORY.query_chunks("Merge", equals, ranges, chunk_rows=HISTORY_CHUNK_ROWS))
+        failure_summaries = render_failure_summaries(*state.failure_categories())
+        return {
+            "rows": rows,
+            "yield_summary": create_yield_summary3(None, state.bin_counts()),
+            "failure_modes": count_all_failures(None, state.failure_counts()),
+            "eco_failures": failure_summaries["ECO"],
+            "sport_failures": failure_summaries["SPORT"],
+        }
+
+
+@app.route('/yield', methods=['GET'])
+def get_yield():
+    """
+    Yield tables over a filtered subset of the Merge history, e.g.
+    /yield?from=2024-03-01&to=2024-03-31&chip_version=B0&frequency=1000
+    """
+    equals = {
+        column: request.args.getlist(param)
+        for param, column in YIELD_QUERY_FILTERS.items() if request.args.getlist(param)
+    }
+    ranges = {}
+    try:
+        if request.args.get("from") or request.args.get("to"):
+            ranges["Timestamp"] = (
+                timestamp_bound(request.args["from"]) if request.args.get("from") else None,
+                timestamp_bound(request.args["to"], end=True) if request.args.get("to") else None
+            )
+    except ValueError as e:
+        return jsonify({"error": f"Invalid date: {e}"}), 400
+
+    if not HISTORY.count("Merge"):
+        return jsonify({"error": "No Merge history yet"}), 404
+
+    # Served from the cache until the next ingest changes the Merge history
+    cache_key = f"yield:{json.dumps([equals, ranges], sort_keys=True)}"
+    try:
+        tables = RESULT_CACHE.get_or_compute_current(
+            cache_key, lambda: query_yield(equals, ranges), YIELD_STATE.dataset_version
+        )
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    return jsonify({
+        name: table if name == "rows" else json.loads(table.to_json(orient="records"))
+        for name, table in tables.items()
+    })
+
+
+@app.route('/yield/rollups', methods=['GET'])
+def get_yield_rollups():
+    """
+    Rows per day, lot or firmware by power mode and Final Bin, maintained at
+    ingest, e.g. /yield/rollups?by=day&power_mode=ECO&from=2024-03-01&to=2024-03-31
+    """
+    dimension = request.args.get("by", "day")
+    start, end = request.args.get("from"), request.args.get("to")
+    try:
+        if dimension == "day":
+            start = pd.Timestamp(start).strftime("%Y-%m-%d") if start else None
+            end = pd.Timestamp(end).strftime("%Y-%m-%d") if end else None
+        table = YIELD_STATE.rollups(dimension, request.args.getlist("power_mode"), start, end)
+    except StaleYieldState as e:
+        # Built by another version or configuration: nothing current to serve
+        # until they are rebuilt at startup or by the next ingest
+        return jsonify({"error": str(e)}), 503
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    return jsonify(json.loads(table.to_json(orient="records")))
+
+
+def followed_log_path(file_name):
+    """Path of a log under FOLLOW_LOG_DIR, or None if file_name points outside it."""
+    root = os.path.realpath(FOLLOW_LOG_DIR)
+    path = os.path.realpath(os.path.join(root, file_name))
+    return path if path != root and os.path.commonpath([root, path]) == root else None
+
+
+@app.route('/follow', methods=['GET', 'DELETE'])
+def follow_log():
+    """
+    The partial rows of a log still being written under FOLLOW_LOG_DIR,
+    parsing only what was appended since the last request, e.g.
+    /follow?file=run_ECO.log. 204 if no complete line was added since.
+    DELETE drops its checkpoint once the run has finished.
+    """
+    file_name = request.args.get("file", "")
+    log_file_path = followed_log_path(file_name) if file_name else None
+    if log_file_path is None:
+        return jsonify({"error": "Missing or invalid 'file'"}), 400
+
+    if request.method == 'DELETE':
+        FOLLOWER.forget(log_file_path)
+        return jsonify({"message": f"Stopped following {file_name}"}), 200
+
+    try:
+        records = FOLLOWER.poll(log_file_path)
+    except FileNotFoundError:
+        return jsonify({"error": f"No log named {file_name}"}), 404
+    if records is None:
+        return "", 204
+    format1_record, format2_records, merge_record = records
+    return jsonify({"format1": format1_record, "format2": format2_records, "merge": merge_record}), 200
+
+
+@app.route('/rebin', methods=['POST'])
+def rebin():
+    """
+    Re-bin the stored Format 1 and Merge rows with the current Final Bin
+    rules, then republish the sheets whose rows changed bin.
+    """
+    try:
+        changed = {}
+        for sheet_name in ["Format 1", "Merge"]:
+            seed_history(sheet_name)
+            changed[sheet_name] = HISTORY.rebin(sheet_name, HISTORY_CHUNK_ROWS)
+            if changed[sheet_name]:
+                republish_history(sheet_name)
+
+        if changed["Merge"]:
+            YIELD_STATE.rebuild(HISTORY.read_chunks("Merge", HISTORY_CHUNK_ROWS))
+            clear_sheet("SLT Tracker")
+            clear_sheet("Yield")
+            publish_merge_results()
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        logging.error(f"Error in /rebin: {str(e)}", exc_info=True)
+        return jsonify({"error": f"Internal Server Error: {str(e)}"}), 500
+    return jsonify({"rebinned": changed}), 200
+
 @app.route('/upload', methods=['POST'])
 def upload_file():
     if 'files' not in request.files:
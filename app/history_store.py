@@ -0,0 +1,331 @@
+import sqlite3
+
+import numpy as np
+import pandas as pd
+
+from app.parser_script import TIMESTAMP_FORMAT, TYPED_INT_COLUMNS, evaluate_final_bin, to_typed
+from app.sqlite_db import PARAMETER_CHUNK, snapshot, transaction
+
+# Sheet name -> table holding its history
+HISTORY_TABLES = {"Format 1": "format1", "Format 2": "format2", "Merge": "merge"}
+
+# Columns indexed for filtered queries (see query), per history
+HISTORY_INDEXES = {
+    "Merge": ["Timestamp", "Chip Version", "Current Power Mode", "Marking Id", "SLT Test Version", "Current Frequency"],
+}
+
+# History -> column whose duplicates are resolved at ingest (see DEDUP_POLICIES)
+DEDUP_KEYS = {"Merge": "Mark Power"}
+
+# "first": the first row stored for a key wins and later ones are dropped;
+# "latest": the row with the latest Timestamp wins, replacing a stored one.
+# Ties, and rows without a valid Timestamp, go to the earlier row.
+DEDUP_POLICIES = ["first", "latest"]
+
+# Columns evaluate_final_bin reads to re-bin a history (see rebin)
+FINAL_BIN_INPUTS = ["Total Banks Failed", "Current Power Mode", "Adjacent"]
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS seeded (name TEXT PRIMARY KEY);
+"""
+
+
+def _quote(name):
+    return '"' + name.replace('"', '""') + '"'
+
+
+class HistoryStore:
+    """
+    Local SQLite copy of the Format 1, Format 2 and Merge histories, the
+    source of truth that the Google Sheets are published from. Integer
+    columns (TYPED_INT_COLUMNS) are stored as INTEGER, so they can be
+    filtered and sorted as numbers; values that aren't integers, such as
+    "N/A", are kept as they are. Each sheet is seeded from its Google
+    Sheet once, the first time it is used.
+    A unique index on each DEDUP_KEYS column keeps one row per key (one
+    row per chip and power mode for Merge), picked by dedup_policy.
+    Rows read back as the parser emits them (strings), or typed.
+    """
+
+    def __init__(self, path, dedup_policy="first"):
+        if dedup_policy not in DEDUP_POLICIES:
+            raise ValueError(f"Unknown dedup policy '{dedup_policy}', expected one of {', '.join(DEDUP_POLICIES)}")
+        self.path = path
+        self.dedup_policy = dedup_policy
+        db = sqlite3.connect(path, timeout=30)
+        try:
+            db.execute("PRAGMA journal_mode=WAL")  # Readers don't block the writer
+            db.executescript(SCHEMA)
+        finally:
+            db.close()
+        with transaction(self.path) as db:
+            for name in HISTORY_TABLES:
+                self._index(db, name)
+
+    @staticmethod
+    def _table(name):
+        if name not in HISTORY_TABLES:
+            raise ValueError(f"Unknown history '{name}'")
+        return HISTORY_TABLES[name]
+
+    @staticmethod
+    def _columns(db, table):
+        return [row[1] for row in db.execute(f"PRAGMA table_info({_quote(table)})")]
+
+    def _index(self, db, name):
+        table = self._table(name)
+        columns = self._columns(db, table)
+        for column in HISTORY_INDEXES.get(name, []):
+            if column in columns:
+                index = _quote(f"{table}_{column}")
+                db.execute(f"CREATE INDEX IF NOT EXISTS {index} ON {_quote(table)} ({_quote(column)})")
+
+        key = DEDUP_KEYS.get(name)
+        unique_index = f"{table}_{key}_unique"
+        if key in columns and not db.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'index' AND name = ?", (unique_index,)
+        ).fetchone():
+            # Rows stored before the index existed may hold duplicates
+            stored = db.execute(
+                f"SELECT rowid, {_quote(key)}, {self._timestamp_column(columns)} FROM {_quote(table)} ORDER BY rowid"
+            ).fetchall()
+            winners = set(self._winners([row[1] for row in stored], [row[2] for row in stored]))
+            db.executemany(
+                f"DELETE FROM {_quote(table)} WHERE rowid = ?",
+                [(row[0],) for position, row in enumerate(stored) if position not in winners]
+            )
+            db.execute(f"CREATE UNIQUE INDEX {_quote(unique_index)} ON {_quote(table)} ({_quote(key)})")
+
+    @staticmethod
+    def _timestamp_column(columns):
+        return _quote("Timestamp") if "Timestamp" in columns else "NULL"
+
+    def _winners(self, keys, timestamps):
+        """
+        Positions of the rows kept under the dedup policy, in order; rows
+        earlier in keys win ties. Rows without a key are always kept.
+        """
+        frame = pd.DataFrame({"key": pd.Series(keys, dtype=object), "position": range(len(keys))})
+        if self.dedup_policy == "latest":
+            frame["time"] = pd.to_datetime(
+                pd.Series(timestamps, dtype=object), format=TIMESTAMP_FORMAT, errors="coerce"
+            )
+            frame = frame.sort_values(["time", "position"], ascending=[False, True], na_position="last")
+        keyed = frame["key"].notna()
+        winners = pd.concat([frame[keyed].drop_duplicates("key")["position"], frame[~keyed]["position"]])
+        return sorted(winners.tolist())
+
+    def columns(self, name):
+        """Columns of a history, in sheet order ([] until it holds rows)."""
+        with snapshot(self.path) as db:
+            return self._columns(db, self._table(name))
+
+    def seeded(self, name):
+        """Whether the history was already seeded from its Google Sheet."""
+        with snapshot(self.path) as db:
+            return db.execute("SELECT 1 FROM seeded WHERE name = ?", (name,)).fetchone() is not None
+
+    def seed(self, name, df):
+        """
+        Store df as the history's starting rows, unless another worker
+        seeded it first. Returns how many of its rows were dropped as duplicates.
+        """
+        with transaction(self.path) as db:
+            if db.execute("SELECT 1 FROM seeded WHERE name = ?", (name,)).fetchone() is not None:
+                return 0
+            stored, _, _ = self._append(db, name, df)
+            db.execute("INSERT INTO seeded (name) VALUES (?)", (name,))
+        return len(df) - len(stored)
+
+    def append(self, name, df):
+        """
+        Append rows to a history, adding any columns it doesn't have yet and
+        resolving duplicate keys by the dedup policy. Returns (stored, replaced,
+        preceding): the rows of df actually stored, the stored rows they
+        replaced (as read would return them) and how many rows the history
+        held just before them, all read in the same transaction as the append.
+        """
+        with transaction(self.path) as db:
+            return self._append(db, name, df)
+
+    def _stored_keys(self, db, table, key, columns, values):
+        rows = []
+        for start in range(0, len(values), PARAMETER_CHUNK):
+            chunk = values[start:start + PARAMETER_CHUNK]
+            rows += db.execute(
+                f"SELECT rowid, {_quote(key)}, {self._timestamp_column(columns)} FROM {_quote(table)} "
+                f"WHERE {_quote(key)} IN ({', '.join('?' * len(chunk))}) ORDER BY rowid", chunk
+            ).fetchall()
+        return rows
+
+    def _append(self, db, name, df):
+        table = self._table(name)
+        columns = self._columns(db, table)
+        definitions = [
+            f"{_quote(column)} {'INTEGER' if column in TYPED_INT_COLUMNS else 'TEXT'}"
+            for column in df.columns if column not in columns
+        ]
+        if definitions and not columns:
+            db.execute(f"CREATE TABLE {_quote(table)} ({', '.join(definitions)})")
+        else:
+            for definition in definitions:
+                db.execute(f"ALTER TABLE {_quote(table)} ADD COLUMN {definition}")
+        columns = self._columns(db, table)
+        self._index(db, name)
+
+        replaced_rows = []
+        key = DEDUP_KEYS.get(name)
+        if key in columns and not df.empty:
+            df = df.reset_index(drop=True)
+            batch_keys = df[key].tolist() if key in df.columns else [None] * len(df)
+            batch_times = df["Timestamp"].tolist() if "Timestamp" in df.columns else [None] * len(df)
+            distinct_keys = list(dict.fromkeys(value for value in batch_keys if not pd.isna(value)))
+            stored = self._stored_keys(db, table, key, columns, distinct_keys)
+            winners = self._winners([row[1] for row in stored] + batch_keys, [row[2] for row in stored] + batch_times)
+            kept = set(winners)
+            replaced = [row[0] for position, row in enumerate(stored) if position not in kept]
+            df = df.iloc[[position - len(stored) for position in winners if position >= len(stored)]]
+            replaced_rows = self._rows_by_id(db, table, replaced)
+            db.executemany(f"DELETE FROM {_quote(table)} WHERE rowid = ?", [(rowid,) for rowid in replaced])
+
+        preceding = db.execute(f"SELECT COUNT(*) FROM {_quote(table)}").fetchone()[0] if columns else 0
+        if not df.empty:
+            rows = df.reindex(columns=columns).astype(object)
+            rows = rows.where(rows.notna(), None)  # NULL for missing values
+            placeholders = ", ".join("?" * len(columns))
+            db.executemany(f"INSERT INTO {_quote(table)} VALUES ({placeholders})", rows.values.tolist())
+        return df, self._frame(replaced_rows, columns, typed=False), preceding
+
+    @staticmethod
+    def _rows_by_id(db, table, rowids):
+        rows = []
+        for start in range(0, len(rowids), PARAMETER_CHUNK):
+            chunk = rowids[start:start + PARAMETER_CHUNK]
+            rows += db.execute(
+                f"SELECT * FROM {_quote(table)} WHERE rowid IN ({', '.join('?' * len(chunk))}) ORDER BY rowid", chunk
+            ).fetchall()
+        return rows
+
+    def rebin(self, name, chunk_rows=50000):
+        """
+        Recompute the Final Bin of every stored row of a history with
+        evaluate_final_bin, e.g. after FINAL_BIN_RULES changed, chunk_rows
+        rows at a time. Returns how many rows changed bin. Raises ValueError,
+        leaving the history as it was, if a row's Total Banks Failed isn't a number.
+        """
+        with transaction(self.path) as db:
+            table = self._table(name)
+            columns = self._columns(db, table)
+            if "Final Bin" not in columns:
+                return 0
+            inputs = [column for column in FINAL_BIN_INPUTS if column in columns]
+            selected = ", ".join(_quote(column) for column in ["Final Bin"] + inputs)
+            changed, last_rowid = 0, 0
+            while True:
+                rows = db.execute(
+                    f"SELECT rowid, {selected} FROM {_quote(table)} WHERE rowid > ? ORDER BY rowid LIMIT ?",
+                    (last_rowid, chunk_rows)
+                ).fetchall()
+                if not rows:
+                    return changed
+                last_rowid = rows[-1][0]
+                chunk = self._frame([row[1:] for row in rows], ["Final Bin"] + inputs, typed=False)
+                bins = evaluate_final_bin(chunk)
+                updates = [
+                    (new_bin, row[0]) for row, old_bin, new_bin in zip(rows, chunk["Final Bin"], bins)
+                    if old_bin != new_bin
+                ]
+                db.executemany(f"UPDATE {_quote(table)} SET {_quote('Final Bin')} = ? WHERE rowid = ?", updates)
+                changed += len(updates)
+
+    @staticmethod
+    def _where(name, columns, equals, ranges):
+        """SQL WHERE clause and parameters for query filters."""
+        unknown = [column for column in {**(equals or {}), **(ranges or {})} if column not in columns]
+        if unknown and columns:
+            raise ValueError(f"Unknown column(s) for '{name}': {', '.join(unknown)}")
+        conditions, params = [], []
+        for column, values in (equals or {}).items():
+            values = list(values)
+            conditions.append(f"{_quote(column)} IN ({', '.join('?' * len(values))})")
+            params += values
+        for column, (low, high) in (ranges or {}).items():
+            # Values a range can't order, such as "N/A" (which sorts after
+            # digits and numbers), never fall inside one
+            if low is not None or high is not None:
+                if column in TYPED_INT_COLUMNS:
+                    conditions.append(f"typeof({_quote(column)}) = 'integer'")
+                elif column == "Timestamp":
+                    conditions.append(f"{_quote(column)} GLOB '[0-9]*'")
+            if low is not None:
+                conditions.append(f"{_quote(column)} >= ?")
+                params.append(low)
+            if high is not None:
+                conditions.append(f"{_quote(column)} < ?")
+                params.append(high)
+        return (f" WHERE {' AND '.join(conditions)}" if conditions else ""), params
+
+    @staticmethod
+    def _frame(rows, columns, typed):
+        df = pd.DataFrame(rows, columns=columns, dtype=object)
+        # Back to the parser's strings: integers as text, missing values as NaN
+        for column in TYPED_INT_COLUMNS:
+            if column in df.columns:
+                df[column] = [value if isinstance(value, str) or value is None else str(value) for value in df[column]]
+        df = df.fillna(np.nan)
+        return to_typed(df) if typed else df
+
+    def count(self, name, equals=None, ranges=None):
+        """Number of rows in a history matching every filter (see query)."""
+        with snapshot(self.path) as db:
+            table = self._table(name)
+            columns = self._columns(db, table)
+            if not columns:
+                return 0
+            where, params = self._where(name, columns, equals, ranges)
+            return db.execute(f"SELECT COUNT(*) FROM {_quote(table)}{where}", params).fetchone()[0]
+
+    def read(self, name, typed=False):
+        """The whole history in insertion order; typed returns to_typed frames."""
+        return self.query(name, typed=typed)
+
+    def read_chunks(self, name, chunk_rows, typed=False):
+        """The whole history as frames of at most chunk_rows rows (see query_chunks)."""
+        return self.query_chunks(name, chunk_rows=chunk_rows, typed=typed)
+
+    def query(self, name, equals=None, ranges=None, typed=False):
+        """
+        Rows of a history matching every filter, in insertion order:
+        equals maps a column to the values it may take, ranges maps a column
+        to (low, high) bounds, low inclusive and high exclusive, None for
+        unbounded. A row whose Timestamp isn't a timestamp, or whose integer
+        column holds text, is outside any range on that column.
+        Filters on HISTORY_INDEXES columns are served by indexes.
+        """
+        with snapshot(self.path) as db:
+            table = self._table(name)
+            columns = self._columns(db, table)
+            rows = []
+            if columns:
+                where, params = self._where(name, columns, equals, ranges)
+                rows = db.execute(f"SELECT * FROM {_quote(table)}{where} ORDER BY rowid", params).fetchall()
+        return self._frame(rows, columns, typed)
+
+    def query_chunks(self, name, equals=None, ranges=None, chunk_rows=50000, typed=False):
+        """
+        query, streamed as frames of at most chunk_rows rows from one
+        consistent snapshot, so memory use is bounded by the chunk size.
+        Yields nothing if no row matches.
+        """
+        with snapshot(self.path) as db:
+            table = self._table(name)
+            columns = self._columns(db, table)
+            if not columns:
+                return
+            where, params = self._where(name, columns, equals, ranges)
+            cursor = db.execute(f"SELECT * FROM {_quote(table)}{where} ORDER BY rowid", params)
+            while True:
+                rows = cursor.fetchmany(chunk_rows)
+                if not rows:
+                    return
+                yield self._frame(rows, columns, typed)
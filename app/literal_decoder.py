@@ -0,0 +1,113 @@
+import re
+import ast
+import json
+
+# Decoders for the Python literals the SLT firmware prints into its logs:
+# the "Failures by Test:" dict of test name -> bank ids and the
+# "Bank Coordinates with failures:" list of [row, col] pairs.
+# Known shapes are decoded with C-level regex and json passes instead
+# of eval(); anything else goes to ast.literal_eval, which never runs code.
+
+# Every run of whitespace in these patterns can be matched one way only:
+# it either precedes a separator or closes the sequence, never both, so
+# a long run can't be split many ways and matching stays linear.
+_INT = r"-?\d+"
+_INT_SEQ = rf"\s*(?:{_INT}(?:\s*,\s*{_INT})*(?:\s*,)?\s*)?"
+_INT_COLLECTION = rf"set\(\)|\[{_INT_SEQ}\]|\{{{_INT_SEQ}\}}|\({_INT_SEQ}\)|{_INT}"
+_KEY = r"'[^'\\]*'|\"[^\"\\]*\""
+_ENTRY = rf"(?:{_KEY})\s*:\s*(?:{_INT_COLLECTION})"
+
+_DICT_ENTRY = re.compile(rf"({_KEY})\s*:\s*({_INT_COLLECTION})")
+_DICT_SHAPE = re.compile(rf"\{{\s*(?:{_ENTRY}(?:\s*,\s*{_ENTRY})*(?:\s*,)?\s*)?\}}")
+_INT_TOKEN = re.compile(_INT)
+
+
+def _ints(text):
+    """Decode the ints of an already validated "[...]", "{...}" or "(...)"."""
+    body = text[1:-1].strip().rstrip(",")
+    try:
+        return json.loads(f"[{body}]")
+    except ValueError:  # e.g. "00", which Python accepts and JSON does not
+        return [int(token) for token in _INT_TOKEN.findall(body)]
+
+
+def _int_set(values):
+    """
+    Build a set whose iteration order (and so str()) matches what eval()
+    gives for the same literal. The parser stores str(bank_id) as the
+    "Bank Ids" of Format 2, so a different order would change its output
+    for existing logs. CPython folds set literals of 3+ constants into a
+    frozenset constant, rebuilt once while merging constants, and copies
+    that into the new set; the same steps are taken here.
+    """
+    if len(values) > 2:
+        return set(frozenset(tuple(frozenset(values))))
+    return set(values)
+
+
+def _decode_collection(text):
+    """Decode one int, or list/set/tuple of ints, matched by _INT_COLLECTION."""
+    opener = text[0]
+    if opener == "[":
+        return _ints(text)
+    if opener == "{":
+        values = _ints(text)
+        # "{}" is an empty dict, not a set; only set() spells an empty set
+        return _int_set(values) if values else {}
+    if opener == "(":
+        values = _ints(text)
+        # "(3)" is just a parenthesised int; only a comma makes a tuple
+        if len(values) == 1 and "," not in text:
+            return values[0]
+        return tuple(values)
+    if text == "set()":
+        return set()
+    return int(text)
+
+
+def decode_int_dict(text):
+    """
+    Decode a dict of string keys to ints or int lists/sets/tuples,
+    e.g. "{'ATE_CMD_UCM_ALL': [3, 7], 'ATE_CMD_DDR_ACK_HO': set()}".
+    Returns None if text is not of that shape.
+    """
+    text = text.strip()
+    if not _DICT_SHAPE.fullmatch(text):
+        return None
+    return {key[1:-1]: _decode_collection(value) for key, value in _DICT_ENTRY.findall(text)}
+
+
+def decode_int_lists(text):
+    """
+    Decode a list of int lists, e.g. "[[1, 2], [3, 4]]".
+    Returns None if text is not of that shape.
+    """
+    # Python and JSON spell this shape the same way, and json is C-fast
+    try:
+        decoded = json.loads(text)
+    except ValueError:
+        return None
+    if type(decoded) is not list:
+        return None
+    for inner in decoded:
+        if type(inner) is not list or not all(type(value) is int for value in inner):
+            return None
+    return decoded
+
+
+def decode_literal(text):
+    """
+    Decode a log literal into Python values, equal to what eval() gave for
+    the shapes the logs contain. Falls back to ast.literal_eval (raising
+    ValueError/SyntaxError on anything that isn't a plain literal).
+    """
+    stripped = text.strip()
+    if stripped.startswith("{"):
+        decoded = decode_int_dict(stripped)
+    elif stripped.startswith("[["):
+        decoded = decode_int_lists(stripped)
+    else:
+        decoded = None
+    if decoded is not None:
+        return decoded
+    return ast.literal_eval(stripped)
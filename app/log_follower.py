@@ -0,0 +1,104 @@
+import os
+import copy
+import pickle
+import hashlib
+import tempfile
+
+from app.parser_script import PARSER_VERSION, COLUMNS, LogScanner, records_from_scanner
+
+# How much of a growing log is read per step of a poll.
+FOLLOW_READ_SIZE = 1024 * 1024
+
+
+class LogFollower:
+    """
+    Incremental parsing of logs that are still being written.
+    Each poll reads only the bytes appended since the last one, up to the
+    last complete line, and feeds them to the file's LogScanner. The byte
+    offset and scanner state are checkpointed per file under directory, so
+    following survives restarts. A log that shrinks or is replaced is
+    parsed again from the start.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, log_file_path):
+        name = hashlib.sha256(os.path.abspath(log_file_path).encode()).hexdigest()
+        return os.path.join(self.directory, name)
+
+    def load(self, log_file_path):
+        """Return the checkpoint for log_file_path, or None if there is none."""
+        try:
+            with open(self._path(log_file_path), "rb") as entry:
+                checkpoint = pickle.load(entry)
+        except (OSError, pickle.UnpicklingError, EOFError):
+            return None
+        if checkpoint.get("parser_version") != PARSER_VERSION:
+            return None
+        return checkpoint
+
+    def save(self, log_file_path, checkpoint):
+        path = self._path(log_file_path)
+        # Write then rename, so a crash never leaves a partial checkpoint
+        fd, temp_path = tempfile.mkstemp(dir=self.directory)
+        with os.fdopen(fd, "wb") as entry:
+            pickle.dump(checkpoint, entry, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temp_path, path)
+
+    def forget(self, log_file_path):
+        """Drop the checkpoint of a log, e.g. once its run has finished."""
+        try:
+            os.remove(self._path(log_file_path))
+        except FileNotFoundError:
+            pass
+
+    def poll(self, log_file_path):
+        """
+        Parse what was appended to log_file_path since the last poll.
+        Returns the chip's current partial rows as (Format 1 record, list of
+        Format 2 records, Merge record), or None if no complete line was
+        added. Final Bin stays "N/A" until Total Banks Failed is logged; once
+        the log is complete (and ends with a newline) the rows equal
+        parse_log_all_records.
+        """
+        with open(log_file_path, "rb") as log_file:
+            stat = os.fstat(log_file.fileno())
+            checkpoint = self.load(log_file_path)
+            if checkpoint is None or checkpoint["inode"] != stat.st_ino or checkpoint["offset"] > stat.st_size:
+                checkpoint = {
+                    "parser_version": PARSER_VERSION,
+                    "inode": stat.st_ino,
+                    "offset": 0,
+                    "scanner": LogScanner(COLUMNS),
+                }
+
+            scanner = checkpoint["scanner"]
+            offset = checkpoint["offset"]
+            log_file.seek(offset)
+            advanced = False
+            pending = b""
+            while True:
+                block = log_file.read(FOLLOW_READ_SIZE)
+                pending += block
+                end = pending.rfind(b"\n") + 1
+                if end:
+                    # Only whole lines are fed; a partly written one waits for the next poll
+                    scanner.feed(pending[:end])
+                    offset += end
+                    pending = pending[end:]
+                    advanced = True
+                if len(block) < FOLLOW_READ_SIZE:
+                    break
+
+        if not advanced:
+            return None
+        checkpoint["offset"] = offset
+        self.save(log_file_path, checkpoint)
+
+        # Finishing resolves Remark and the rows consume the fields, so work
+        # on a copy and keep the checkpointed scanner open for more lines
+        snapshot = copy.deepcopy(scanner)
+        snapshot.finish()
+        return records_from_scanner(log_file_path, snapshot, in_progress=True)
@@ -0,0 +1,77 @@
+import os
+import json
+import zlib
+import hashlib
+import tempfile
+
+
+class ParseCache:
+    """
+    On-disk cache of parsed log rows, keyed on a hash of the file contents,
+    its file name and the parser version.
+    Entries are zlib-compressed JSON; the least recently used ones are
+    evicted once the directory grows past max_bytes.
+    """
+
+    def __init__(self, directory, max_bytes=256 * 1024 * 1024):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        os.makedirs(directory, exist_ok=True)
+
+    @staticmethod
+    def key_for(log_file_path, parser_version):
+        """Content hash of a log, salted with its file name and the parser version."""
+        digest = hashlib.sha256()
+        # File Name and the ECO/SPORT guess of Format 2 come from the name
+        digest.update(f"{parser_version}\0{os.path.basename(log_file_path)}\0".encode())
+        with open(log_file_path, "rb") as log_file:
+            for block in iter(lambda: log_file.read(1024 * 1024), b""):
+                digest.update(block)
+        return digest.hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.directory, key[:2], key)
+
+    def get(self, key):
+        """Return the cached rows for key, or None on a miss."""
+        path = self._path(key)
+        try:
+            with open(path, "rb") as entry:
+                rows = json.loads(zlib.decompress(entry.read()))
+            os.utime(path)  # Mark as recently used for eviction
+        except (OSError, ValueError, zlib.error):
+            return None
+        return rows
+
+    def put(self, key, rows):
+        """Store rows (anything JSON-serialisable) under key."""
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        data = zlib.compress(json.dumps(rows, separators=(",", ":")).encode("utf-8"))
+        # Write then rename, so concurrent readers never see a partial entry
+        fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path))
+        with os.fdopen(fd, "wb") as entry:
+            entry.write(data)
+        os.replace(temp_path, path)
+
+    def evict(self):
+        """Delete least recently used entries until the cache fits in max_bytes."""
+        entries = []
+        total = 0
+        for shard in os.scandir(self.directory):
+            if not shard.is_dir():
+                continue
+            for entry in os.scandir(shard.path):
+                stat = entry.stat()
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+                total += stat.st_size
+
+        entries.sort()
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            total -= size
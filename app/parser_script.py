@@ -1,64 +1,55 @@
 import re
 import os
+import locale
+import gzip
+import mmap
+import tarfile
+import zipfile
+import numpy as np
 import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
 from glob import glob
+from app.literal_decoder import decode_literal
 
-def parse_log_file(log_file_path: str) ->  pd.DataFrame:
-    """
-    Parse a log file and extract structured data
-    Returns dictionary with 40+ extracted metrics
-    """
-    columns = [
+# Bump whenever a change alters the parsed rows, so cached parses are redone.
+PARSER_VERSION = "1"
+
+# Columns shared by the Format 1 and Merge outputs. Format 1 additionally
+# carries the raw bank coordinates and the per-test columns below.
+COLUMNS = [
     "File Name", "Timestamp", "Chip Number", "Marking Id", "Chip Version",
     "SLT Test Version", "Current Frequency", "Current Power Mode",
-    "VDDP", "VDDM", "VDDCORE", "VDDHF", "VDDIO", "VDDWL", 
+    "VDDP", "VDDM", "VDDCORE", "VDDHF", "VDDIO", "VDDWL",
     "Banks Failed", "Columns with Failures","Bank Co-ordinates with Failures",
     "Banks Repairable after CRAM test", "Banks Failed after CRAM Test", "Repair Data Applied", "Remark", "Total Banks Failed"
 ]
 
-    test_columns = [
-    "ATE_CMD_BANK_PE_ALL_REG_ACCESS", "ATE_CMD_BANK_PE_MACC", "ATE_CMD_BANK_PE_MULT5X5", 
-    "ATE_CMD_BANK_PE_ACC", "ATE_CMD_BANK_PE_ROTATE", "ATE_CMD_BANK_PE_NORM_PRIORITY", 
-    "ATE_CMD_BANK_PE_GEMV_FP8", "ATE_CMD_BANK_PE_GEMV_FP8_SFP16", "ATE_CMD_BANK_PE_GEMV_SFP16", 
-    "ATE_CMD_BANK_PE_GEMV_INT4", "ATE_CMD_BANK_PE_GEMV_INT8", "ATE_CMD_BANK_PE_ROW_REDUCE", 
-    "ATE_CMD_BANK_PE_NORM_REDUCE_ADDER", "ATE_CMD_BANK_PE_NORM_BYTEADDER_SHIFT_PRIO", 
-    "ATE_CMD_BANK_PE_GEMV_BROADCAST", "ATE_CMD_BANK_PE_GEMV_SPARSITY", "ATE_CMD_BANK_PE_NORM_DATA_MUX", 
-    "ATE_CMD_BANK_GEMV_HALF_ZERO", "ATE_CMD_BANK_PE_NORM", "ATE_CMD_BANK_NOC_PERECV_STORE_FRWD_NS", 
-    "ATE_CMD_BANK_NOC_PERECV_STORE_FRWD_SN", "ATE_CMD_BANK_NOC_PASSTHROUGH_N", 
-    "ATE_CMD_BANK_NOC_PASSTHROUGH_S", "ATE_CMD_BANK_NOC_PASSTHROUGH_W", "ATE_CMD_BANK_NOC_ROUTE_N", 
-    "ATE_CMD_BANK_NOC_ROUTE_S", "ATE_CMD_BANK_NOC_ROUTE_W", "ATE_CMD_BANK_NOC_BUFFER", 
-    "ATE_CMD_BANK_CRAM_BIST_10N", "ATE_CMD_BANK_CRAM_BIST_FULL", "ATE_CMD_BANK_CRAM_BIST_B2B", 
-    "ATE_CMD_BANK_CRAM_BIST_BURST", "ATE_CMD_CMCM_ALL_FUNCTIONAL", "ATE_CMD_UCM_ALL", 
-    "ATE_CMD_PCM_BANK_IDC_PING_S", "ATE_CMD_DDR_APB_ACCESS", "ATE_CMD_DDR_MCU_MEM", 
-    "ATE_CMD_DDR_ACK_HO", "ATE_CMD_DDR_ACK_FS", "ATE_CMD_DDR_PHYINIT_TRAIN_NORTH", 
-    "ATE_CMD_DDR_PHYINIT_ALL_NORTH_WR_RD", "ATE_CMD_DDR_MEM_SWP_WRRD_N", "ATE_CMD_DDR_MEM_SWP_RDLOOP_N", 
-    "ATE_CMD_DDR_PHYINIT_TRAIN_EAST", "ATE_CMD_DDR_PHYINIT_ALL_EAST_WR_RD", "ATE_CMD_DDR_MEM_SWP_WRRD_E", 
+MERGE_COLUMNS = [col for col in COLUMNS if col != "Bank Co-ordinates with Failures"]
+
+TEST_COLUMNS = [
+    "ATE_CMD_BANK_PE_ALL_REG_ACCESS", "ATE_CMD_BANK_PE_MACC", "ATE_CMD_BANK_PE_MULT5X5",
+    "ATE_CMD_BANK_PE_ACC", "ATE_CMD_BANK_PE_ROTATE", "ATE_CMD_BANK_PE_NORM_PRIORITY",
+    "ATE_CMD_BANK_PE_GEMV_FP8", "ATE_CMD_BANK_PE_GEMV_FP8_SFP16", "ATE_CMD_BANK_PE_GEMV_SFP16",
+    "ATE_CMD_BANK_PE_GEMV_INT4", "ATE_CMD_BANK_PE_GEMV_INT8", "ATE_CMD_BANK_PE_ROW_REDUCE",
+    "ATE_CMD_BANK_PE_NORM_REDUCE_ADDER", "ATE_CMD_BANK_PE_NORM_BYTEADDER_SHIFT_PRIO",
+    "ATE_CMD_BANK_PE_GEMV_BROADCAST", "ATE_CMD_BANK_PE_GEMV_SPARSITY", "ATE_CMD_BANK_PE_NORM_DATA_MUX",
+    "ATE_CMD_BANK_GEMV_HALF_ZERO", "ATE_CMD_BANK_PE_NORM", "ATE_CMD_BANK_NOC_PERECV_STORE_FRWD_NS",
+    "ATE_CMD_BANK_NOC_PERECV_STORE_FRWD_SN", "ATE_CMD_BANK_NOC_PASSTHROUGH_N",
+    "ATE_CMD_BANK_NOC_PASSTHROUGH_S", "ATE_CMD_BANK_NOC_PASSTHROUGH_W", "ATE_CMD_BANK_NOC_ROUTE_N",
+    "ATE_CMD_BANK_NOC_ROUTE_S", "ATE_CMD_BANK_NOC_ROUTE_W", "ATE_CMD_BANK_NOC_BUFFER",
+    "ATE_CMD_BANK_CRAM_BIST_10N", "ATE_CMD_BANK_CRAM_BIST_FULL", "ATE_CMD_BANK_CRAM_BIST_B2B",
+    "ATE_CMD_BANK_CRAM_BIST_BURST", "ATE_CMD_CMCM_ALL_FUNCTIONAL", "ATE_CMD_UCM_ALL",
+    "ATE_CMD_PCM_BANK_IDC_PING_S", "ATE_CMD_DDR_APB_ACCESS", "ATE_CMD_DDR_MCU_MEM",
+    "ATE_CMD_DDR_ACK_HO", "ATE_CMD_DDR_ACK_FS", "ATE_CMD_DDR_PHYINIT_TRAIN_NORTH",
+    "ATE_CMD_DDR_PHYINIT_ALL_NORTH_WR_RD", "ATE_CMD_DDR_MEM_SWP_WRRD_N", "ATE_CMD_DDR_MEM_SWP_RDLOOP_N",
+    "ATE_CMD_DDR_PHYINIT_TRAIN_EAST", "ATE_CMD_DDR_PHYINIT_ALL_EAST_WR_RD", "ATE_CMD_DDR_MEM_SWP_WRRD_E",
     "ATE_CMD_DDR_MEM_SWP_RDLOOP_E", "ATE_CMD_DDR_PHYINIT_FULL"
 ]
-    
-
-    test_summary = [
-    "ATE_CMD_BANK_PE_ALL_REG_ACCESS_grade", "ATE_CMD_BANK_PE_MACC_grade", "ATE_CMD_BANK_PE_MULT5X5_grade",
-    "ATE_CMD_BANK_PE_ACC_grade", "ATE_CMD_BANK_PE_ROTATE_grade", "ATE_CMD_BANK_PE_NORM_PRIORITY_grade",
-    "ATE_CMD_BANK_PE_GEMV_FP8_grade", "ATE_CMD_BANK_PE_GEMV_FP8_SFP16_grade", "ATE_CMD_BANK_PE_GEMV_SFP16_grade",
-    "ATE_CMD_BANK_PE_GEMV_INT4_grade", "ATE_CMD_BANK_PE_GEMV_INT8_grade", "ATE_CMD_BANK_PE_ROW_REDUCE_grade",
-    "ATE_CMD_BANK_PE_NORM_REDUCE_ADDER_grade", "ATE_CMD_BANK_PE_NORM_BYTEADDER_SHIFT_PRIO_grade",
-    "ATE_CMD_BANK_PE_GEMV_BROADCAST_grade", "ATE_CMD_BANK_PE_GEMV_SPARSITY_grade", "ATE_CMD_BANK_PE_NORM_DATA_MUX_grade",
-    "ATE_CMD_BANK_GEMV_HALF_ZERO_grade", "ATE_CMD_BANK_PE_NORM_grade", "ATE_CMD_BANK_NOC_PERECV_STORE_FRWD_NS_grade",
-    "ATE_CMD_BANK_NOC_PERECV_STORE_FRWD_SN_grade", "ATE_CMD_BANK_NOC_PASSTHROUGH_N_grade",
-    "ATE_CMD_BANK_NOC_PASSTHROUGH_S_grade", "ATE_CMD_BANK_NOC_PASSTHROUGH_W_grade", "ATE_CMD_BANK_NOC_ROUTE_N_grade",
-    "ATE_CMD_BANK_NOC_ROUTE_S_grade", "ATE_CMD_BANK_NOC_ROUTE_W_grade", "ATE_CMD_BANK_NOC_BUFFER_grade",
-    "ATE_CMD_BANK_CRAM_BIST_10N_grade", "ATE_CMD_BANK_CRAM_BIST_FULL_grade", "ATE_CMD_BANK_CRAM_BIST_B2B_grade",
-    "ATE_CMD_BANK_CRAM_BIST_BURST_grade", "ATE_CMD_CMCM_ALL_FUNCTIONAL_grade", "ATE_CMD_UCM_ALL_grade",
-    "ATE_CMD_PCM_BANK_IDC_PING_S_grade", "ATE_CMD_DDR_APB_ACCESS_grade", "ATE_CMD_DDR_MCU_MEM_grade",
-    "ATE_CMD_DDR_ACK_HO_grade", "ATE_CMD_DDR_ACK_FS_grade", "ATE_CMD_DDR_PHYINIT_TRAIN_NORTH_grade",
-    "ATE_CMD_DDR_PHYINIT_ALL_NORTH_WR_RD_grade", "ATE_CMD_DDR_MEM_SWP_WRRD_N_grade", "ATE_CMD_DDR_MEM_SWP_RDLOOP_N_grade",
-    "ATE_CMD_DDR_PHYINIT_TRAIN_EAST_grade", "ATE_CMD_DDR_PHYINIT_ALL_EAST_WR_RD_grade", "ATE_CMD_DDR_MEM_SWP_WRRD_E_grade",
-    "ATE_CMD_DDR_MEM_SWP_RDLOOP_E_grade", "ATE_CMD_DDR_PHYINIT_FULL_grade"
-]
-    
 
-    patterns = {
+TEST_SUMMARY = [f"{test}_grade" for test in TEST_COLUMNS]
+
+PATTERNS = {
     "Timestamp": r"curr_time=(\d{4}-\d{2}-\d{2}_\d{2}-\d{2}-\d{2})",
     "Chip Number": r"chip_id=([\w\d\.]+)",
     "Marking Id": r"Marking ID: ([\w\d\-\_]+)",
@@ -73,127 +64,619 @@ def parse_log_file(log_file_path: str) ->  pd.DataFrame:
     "VDDIO": r"VDDIO: (\d+)",
     "VDDWL": r"VDDWL: (\d+)",
     "Banks Failed": r"Banks Failed: \{([\d, ]+)\}",
-    
-}
-
-    patterns1 = {
     "Columns with Failures": r"Columns with failures: \{([\d, ]+)\}",
     "Banks Repairable after CRAM test": r"Banks Repairable after CRAM test: \{([\d, ]+)\}",
     "Banks Failed after CRAM Test": r"Banks Failed after CRAM [Tt]est:\s*\{([\d, ]+)\}",
     "Repair Data Applied": r"Repair Data Applied: \{(.*?)\}",
     "Total Banks Failed": r"Total Numbers of Banks Failed: (\d+)",
     "Bank Co-ordinates with Failures": r"Bank Coordinates with failures:\s*(\[\[.*?\]\])",
+}
+
+COMPILED_PATTERNS = {key: re.compile(pattern) for key, pattern in PATTERNS.items()}
 
+# Typed output mode: numeric fields as nullable ints, Timestamp as a
+# datetime and low-cardinality labels as categoricals; "N/A" becomes <NA>.
+TYPED_INT_COLUMNS = [
+    "Current Frequency", "VDDP", "VDDM", "VDDCORE", "VDDHF", "VDDIO", "VDDWL", "Total Banks Failed"
+]
+TYPED_CATEGORY_COLUMNS = [
+    "Current Power Mode", "Chip Version", "Final Bin", "Adjacent",
+    "Power Mode", "Result", "Result Type", "Test Categories"
+]
+TIMESTAMP_FORMAT = "%Y-%m-%d_%H-%M-%S"
+
+# Test groups rolled up into the "<n>f" / "P" summary columns, in output order.
+TEST_GROUPS = {
+    "Failed Banks": [
+        "ATE_CMD_BANK_PE_ALL_REG_ACCESS", "ATE_CMD_BANK_PE_MACC", "ATE_CMD_BANK_PE_MULT5X5",
+        "ATE_CMD_BANK_PE_ACC", "ATE_CMD_BANK_PE_ROTATE", "ATE_CMD_BANK_PE_NORM_PRIORITY",
+        "ATE_CMD_BANK_PE_GEMV_FP8", "ATE_CMD_BANK_PE_GEMV_FP8_SFP16", "ATE_CMD_BANK_PE_GEMV_SFP16",
+        "ATE_CMD_BANK_PE_GEMV_INT4", "ATE_CMD_BANK_PE_GEMV_INT8", "ATE_CMD_BANK_PE_ROW_REDUCE",
+        "ATE_CMD_BANK_PE_NORM_REDUCE_ADDER", "ATE_CMD_BANK_PE_NORM_BYTEADDER_SHIFT_PRIO",
+        "ATE_CMD_BANK_PE_GEMV_BROADCAST", "ATE_CMD_BANK_PE_GEMV_SPARSITY", "ATE_CMD_BANK_PE_NORM_DATA_MUX",
+        "ATE_CMD_BANK_GEMV_HALF_ZERO", "ATE_CMD_BANK_PE_NORM", "ATE_CMD_BANK_PE_ZERO_DETECT", "ATE_CMD_BANK_NOC_BUFFER"
+    ],
+    "Noc PassThrough": [
+        "ATE_CMD_BANK_NOC_PASSTHROUGH_N", "ATE_CMD_BANK_NOC_PASSTHROUGH_S",
+        "ATE_CMD_BANK_NOC_PASSTHROUGH_E", "ATE_CMD_BANK_NOC_PASSTHROUGH_W"
+    ],
+    "Noc Route": [
+        "ATE_CMD_BANK_NOC_ROUTE_N", "ATE_CMD_BANK_NOC_ROUTE_S",
+        "ATE_CMD_BANK_NOC_ROUTE_E", "ATE_CMD_BANK_NOC_ROUTE_W"
+    ],
+    "Bank Cram Test": [
+        "ATE_CMD_BANK_CRAM_BIST_10N", "ATE_CMD_BANK_CRAM_BIST_FULL",
+        "ATE_CMD_BANK_CRAM_BIST_B2B", "ATE_CMD_BANK_CRAM_BIST_BURST"
+    ],
+    "CMCM Functional Tests": [
+        "ATE_CMD_CMCM_ALL_FUNCTIONAL"
+    ],
+    "UCM_ALL": [
+        "ATE_CMD_UCM_ALL"
+    ],
+    "LPDDR Test": [
+        "ATE_CMD_DDR_APB_ACCESS", "ATE_CMD_DDR_MCU_MEM", "ATE_CMD_DDR_ACK_HO",
+        "ATE_CMD_DDR_ACK_FS", "ATE_CMD_DDR_PHYINIT_TRAIN_NORTH",
+        "ATE_CMD_DDR_PHYINIT_ALL_NORTH_WR_RD", "ATE_CMD_DDR_MEM_SWP_WRRD_N",
+        "ATE_CMD_DDR_MEM_SWP_RDLOOP_N", "ATE_CMD_DDR_PHYINIT_TRAIN_EAST",
+        "ATE_CMD_DDR_PHYINIT_ALL_EAST_WR_RD", "ATE_CMD_DDR_MEM_SWP_WRRD_E",
+        "ATE_CMD_DDR_MEM_SWP_RDLOOP_E", "ATE_CMD_DDR_PHYINIT_FULL"
+    ],
 }
 
-    file_name = os.path.basename(log_file_path)
-
-    extracted_data = {col: "N/A" for col in columns + test_columns + test_summary}
-    
-    extracted_data["File Name"] = file_name  # Store file name
-# Function to extract data from a single log file
-    
-    with open(log_file_path, "r") as log_file:
-        log_content = log_file.read()
-        for key, pattern in patterns.items():
-            match = re.search(pattern, log_content)
-            if match:
-                extracted_data[key] = match.group(1)
+# SLT Test to Category Mapping
+TEST_CATEGORY_MAPPING = {
+    "ATE_CMD_DDR_APB_ACCESS": "LPDDR Test",
+    "ATE_CMD_DDR_MCU_MEM": "LPDDR Test",
+    "ATE_CMD_DDR_ACK_HO": "LPDDR Test",
+    "ATE_CMD_DDR_ACK_FS": "LPDDR Test",
+    "ATE_CMD_DDR_PHYINIT_TRAIN_NORTH": "LPDDR Test",
+    "ATE_CMD_DDR_PHYINIT_ALL_NORTH_WR_RD": "LPDDR Test",
+    "ATE_CMD_DDR_MEM_SWP_WRRD_N": "LPDDR Test",
+    "ATE_CMD_DDR_MEM_SWP_RDLOOP_N": "LPDDR Test",
+    "ATE_CMD_DDR_PHYINIT_TRAIN_EAST": "LPDDR Test",
+    "ATE_CMD_DDR_PHYINIT_ALL_EAST_WR_RD": "LPDDR Test",
+    "ATE_CMD_DDR_MEM_SWP_WRRD_E": "LPDDR Test",
+    "ATE_CMD_DDR_MEM_SWP_RDLOOP_E": "LPDDR Test",
+    "ATE_CMD_DDR_PHYINIT_FULL": "LPDDR Test",
+    "ATE_CMD_BANK_PE_ALL_REG_ACCESS": "Failed Banks",
+    "ATE_CMD_BANK_PE_MACC": "Failed Banks",
+    "ATE_CMD_BANK_PE_MULT5X5": "Failed Banks",
+    "ATE_CMD_BANK_PE_ACC": "Failed Banks",
+    "ATE_CMD_BANK_PE_ROTATE": "Failed Banks",
+    "ATE_CMD_BANK_PE_NORM_PRIORITY": "Failed Banks",
+    "ATE_CMD_BANK_PE_GEMV_FP8": "Failed Banks",
+    "ATE_CMD_BANK_PE_GEMV_FP8_SFP16": "Failed Banks",
+    "ATE_CMD_BANK_PE_GEMV_SFP16": "Failed Banks",
+    "ATE_CMD_BANK_PE_GEMV_INT4": "Failed Banks",
+    "ATE_CMD_BANK_PE_GEMV_INT8": "Failed Banks",
+    "ATE_CMD_BANK_PE_ROW_REDUCE": "Failed Banks",
+    "ATE_CMD_BANK_PE_NORM_REDUCE_ADDER": "Failed Banks",
+    "ATE_CMD_BANK_PE_NORM_BYTEADDER_SHIFT_PRIO": "Failed Banks",
+    "ATE_CMD_BANK_PE_GEMV_BROADCAST": "Failed Banks",
+    "ATE_CMD_BANK_PE_GEMV_SPARSITY": "Failed Banks",
+    "ATE_CMD_BANK_PE_NORM_DATA_MUX": "Failed Banks",
+    "ATE_CMD_BANK_GEMV_HALF_ZERO": "Failed Banks",
+    "ATE_CMD_BANK_PE_NORM": "Failed Banks",
+    "ATE_CMD_BANK_PE_ZERO_DETECT": "Failed Banks",
+    "ATE_CMD_BANK_NOC_PASSTHROUGH_N": "Noc PassThrough",
+    "ATE_CMD_BANK_NOC_PASSTHROUGH_S": "Noc PassThrough",
+    "ATE_CMD_BANK_NOC_PASSTHROUGH_E": "Noc PassThrough",
+    "ATE_CMD_BANK_NOC_PASSTHROUGH_W": "Noc PassThrough",
+    "ATE_CMD_BANK_NOC_ROUTE_N": "Noc Route",
+    "ATE_CMD_BANK_NOC_ROUTE_S": "Noc Route",
+    "ATE_CMD_BANK_NOC_ROUTE_E": "Noc Route",
+    "ATE_CMD_BANK_NOC_ROUTE_W": "Noc Route",
+    "ATE_CMD_BANK_NOC_BUFFER": "Failed Banks",
+    "ATE_CMD_BANK_CRAM_BIST_10N": "Bank Cram Test",
+    "ATE_CMD_BANK_CRAM_BIST_FULL": "Bank Cram Test",
+    "ATE_CMD_BANK_CRAM_BIST_B2B": "Bank Cram Test",
+    "ATE_CMD_BANK_CRAM_BIST_BURST": "Bank Cram Test",
+    "ATE_CMD_CMCM_ALL_FUNCTIONAL": "CMCM Functional Tests",
+    "ATE_CMD_UCM_ALL": "UCM_ALL",
+    "ATE_CMD_PCM_SKT_SCAN_E": "PCM Fails",
+    "ATE_CMD_PCM_SKT_SCAN_W": "PCM Fails",
+    "ATE_CMD_PCM_SKT_SCAN_S": "PCM Fails",
+    "ATE_CMD_PCM_SKT_SCAN_N": "PCM Fails",
+    "ATE_CMD_PCM_BANK_IDC_PING_S": "Failed Banks",
+    "ATE_CMD_PCM_IDC_READ_WRITE_S": "PCM Fails",
+    "ATE_CMD_BANK_GEMV_QUARTER_POWER": "Power",
+    "ATE_CMD_BANK_GEMV_POWER_STATUS_CHECK": "Power"
+}
 
-        for key, pattern in patterns1.items():
-            match = re.search(pattern, log_content)
-            if match:
-                extracted_data[key] = match.group(1)
+FAILURES_BY_TEST = "Failures by Test:"
+
+# One scanner for every ATE_CMD value and grade line. It anchors on the
+# literal key prefix (so re can skip ahead quickly) and reads the value or
+# grade through a lookahead, so a value that itself contains ATE_CMD keys
+# (a nested dict) does not hide them from the scan.
+TEST_FIELD_SCANNER = re.compile(
+    r"ATE_CMD_\w+(?=': (set\(\)|\[.*?\]|\{.*?\}|\d+)| : (PASS|FAIL))"
+)
+
+TEST_NAME_PREFIX = "Test Name: "
+
+TEST_COLUMN_SET = frozenset(TEST_COLUMNS)
+TEST_FIELD_KEYS = TEST_COLUMN_SET | frozenset(TEST_SUMMARY)
+
+# A LogScanner is complete once it has every PATTERNS field its columns
+# use, and the per-test fields are settled: all found, or the first
+# "Failures by Test:" line was read. That line follows every test the log
+# ran and lists them all, so a test missing by then never ran. After that
+# only the remark markers and the last "Failures by Test:" line matter.
+
+# Remark markers, highest priority first; Remark is the first one present.
+REMARK_MARKERS = [
+    "More than 2 bad columns. Bad CHIP",
+    "passing",
+    "BAD CHIP. Below Test failed",
+]
+
+# Uploads with these suffixes are archives of logs; their members are
+# decompressed on the fly into the parser, never extracted to disk.
+ZIP_SUFFIXES = (".zip",)
+TAR_SUFFIXES = (".tar", ".tar.gz", ".tgz", ".tar.bz2", ".tar.xz")
+GZIP_SUFFIXES = (".gz",)
+# Archive members that are never logs (macOS resource forks)
+ARCHIVE_SKIP_PREFIXES = ("__MACOSX/",)
+
+# Final Bin decision table. Within the chip's power mode the rules are
+# tried in order and the first whose condition holds gives the bin; other
+# modes bin as "N/A". Conditions get a mapping of Total Banks Failed and
+# Adjacent and the mode's bank-failure limit, and work on scalars and whole
+# columns alike. Chip Version "A0" only differs by ignoring Noc Passthrough,
+# which no rule reads, so every version shares the same rules.
+# The old tree also failed chips whose "Non Bank" field was "N/A", but no
+# parsed row has that field (it is "Non-Bank Related Fails"), so that
+# branch was never taken and has no rule here.
+BANK_FAIL_LIMITS = {"ECO": 2, "SPORT": 5}
+FINAL_BIN_RULES = [
+    (lambda row, limit: row["Total Banks Failed"] <= limit, "Failed({mode})"),
+    (lambda row, limit: row["Adjacent"] == "YES", "Failed({mode})"),
+    (lambda row, limit: True, "HB1({mode})"),
+]
+
+# Patterns whose \s* may run onto the next line, keyed to their label.
+SPANNING_TAILS = {
+    key: re.compile(pattern.split(r"\s*")[0] + r"\s*\Z")
+    for key, pattern in PATTERNS.items() if r"\s*" in pattern
+}
+
+STREAM_CHUNK_SIZE = 1024 * 1024
+
+# bytes twins of the tables above, for scanning raw or memory-mapped logs
+# without decoding the whole file. Only captured values get decoded.
+LOG_ENCODING = "utf-8"
+
+BYTES_PATTERNS = {key: re.compile(pattern.encode()) for key, pattern in PATTERNS.items()}
+BYTES_TEST_FIELD_SCANNER = re.compile(TEST_FIELD_SCANNER.pattern.encode())
+BYTES_REMARK_MARKERS = [marker.encode() for marker in REMARK_MARKERS]
+BYTES_SPANNING_TAILS = {key: re.compile(tail.pattern.encode()) for key, tail in SPANNING_TAILS.items()}
+
+
+def decode_capture(value):
+    """Decode a value captured by a bytes pattern; str passes through."""
+    if isinstance(value, (bytes, bytearray)):
+        return value.decode(LOG_ENCODING, errors="replace")
+    return value
+
+
+def first_line_of(text):
+    """Return the first line of text (str, bytes or mmap) without its newline."""
+    end = text.find("\n" if isinstance(text, str) else b"\n")
+    return decode_capture(text[:end] if end != -1 else text[:])
 
-        for summary in test_summary:
-            pattern2 = rf"Test Name: {summary.replace('_grade', '')} : (PASS|FAIL)"
-            match = re.search(pattern2, log_content)
-            if match:
-                extracted_data[summary] = match.group(1)
 
-    # Extract test_columns data
-        for test_col in test_columns:
-            pattern = rf"{test_col}': (set\(\)|\[.*?\]|\{{.*?\}}|\d+)"
-            match = re.search(pattern, log_content)
+def last_line_containing(text, marker):
+    """Return the last line of text that contains marker, or None."""
+    newline = "\n" if isinstance(marker, str) else b"\n"
+    index = text.rfind(marker)
+    if index == -1:
+        return None
+    start = text.rfind(newline, 0, index) + 1
+    end = text.find(newline, index)
+    return decode_capture(text[start:] if end == -1 else text[start:end])
+
+
+def iter_blocks_backwards(log_file, overlap=0, block_size=STREAM_CHUNK_SIZE, stop=0):
+    """
+    Yield (offset, block) pairs of a binary file from its end back to byte
+    offset stop. Each block is extended by the first overlap bytes of the
+    one after it, so a marker of up to overlap + 1 bytes is never split.
+    """
+    log_file.seek(0, os.SEEK_END)
+    end = log_file.tell()
+    tail = b""
+    while end > stop:
+        start = max(stop, end - block_size)
+        log_file.seek(start)
+        block = log_file.read(end - start) + tail
+        yield start, block
+        tail = block[:overlap]
+        end = start
+
+
+def read_line_at(log_file, position, block_size=STREAM_CHUNK_SIZE):
+    """Return the line of a binary file holding the byte at position."""
+    line_start = 0
+    end = position
+    while end > 0:
+        start = max(0, end - block_size)
+        log_file.seek(start)
+        newline = log_file.read(end - start).rfind(b"\n")
+        if newline != -1:
+            line_start = start + newline + 1
+            break
+        end = start
+    log_file.seek(line_start)
+    return decode_capture(log_file.readline().rstrip(b"\n"))
+
+
+def read_last_line_containing(log_file, marker: bytes, block_size=STREAM_CHUNK_SIZE):
+    """
+    Return the last line of a binary file containing marker, or None,
+    reading blocks backwards from the end so only the tail is touched.
+    """
+    for start, block in iter_blocks_backwards(log_file, len(marker) - 1, block_size):
+        index = block.rfind(marker)
+        if index != -1:
+            return read_line_at(log_file, start + index, block_size)
+    return None
+
+
+def scan_test_fields(text, extracted_data: dict, found=None) -> None:
+    """
+    Fill the per-test value and _grade columns from one pass over text
+    (str, or bytes-like for the binary backend).
+    Only the first occurrence of each key is kept, as re.search would;
+    keys already in found are skipped, and the scan stops once every
+    test key is found.
+    """
+    if found is None:
+        found = set()
+    remaining = set(TEST_FIELD_KEYS - found)
+    if not remaining:
+        return
+    binary = not isinstance(text, str)
+    scanner = BYTES_TEST_FIELD_SCANNER if binary else TEST_FIELD_SCANNER
+    prefix = TEST_NAME_PREFIX.encode() if binary else TEST_NAME_PREFIX
+    for match in scanner.finditer(text):
+        test_col = decode_capture(match.group(0))
+        if test_col not in TEST_COLUMN_SET:
+            continue
+        value, grade = match.group(1), match.group(2)
+        if value is None:
+            start = match.start()
+            if text[start - len(prefix):start] != prefix:
+                continue
+            key, value = f"{test_col}_grade", grade
+        else:
+            key = test_col
+        if key not in found:
+            found.add(key)
+            extracted_data[key] = decode_capture(value)
+            remaining.discard(key)
+            if not remaining:
+                return
+
+
+class LogScanner:
+    """
+    Collects the parser fields from a log fed in pieces of whole lines.
+    Only captured values are kept, so memory stays flat however large the
+    log is. Feeding the whole log at once gives the same result as running
+    each pattern over the full text. Pieces may be str or bytes-like
+    (bytes, mmap); the matching pattern tables are picked per piece.
+    """
+
+    def __init__(self, columns=COLUMNS):
+        self.extracted_data = {col: "N/A" for col in columns + TEST_COLUMNS + TEST_SUMMARY}
+        self.required_patterns = frozenset(PATTERNS).intersection(columns)
+        self.found = set()
+        self.tests_settled = False
+        self.remarks_seen = set()
+        self.first_line = None
+        self.failures_line = None
+        self.carry = ""
+
+    def feed(self, text) -> None:
+        if self.carry:
+            text = self.carry + text
+        binary = not isinstance(text, str)
+        patterns = BYTES_PATTERNS if binary else COMPILED_PATTERNS
+        markers = BYTES_REMARK_MARKERS if binary else REMARK_MARKERS
+        spanning_tails = BYTES_SPANNING_TAILS if binary else SPANNING_TAILS
+
+        if self.first_line is None:
+            self.first_line = first_line_of(text)
+
+        # Once every field is filled the rest of the log only needs the
+        # literal searches below
+        if not self.complete:
+            for key, pattern in patterns.items():
+                if key in self.found:
+                    continue
+                match = pattern.search(text)
+                if match:
+                    self.found.add(key)
+                    self.extracted_data[key] = decode_capture(match.group(1))
+
+            scan_test_fields(text, self.extracted_data, self.found)
+
+        # Remark lines sit in the log summary, so search from the end
+        for marker, remark in zip(markers, REMARK_MARKERS):
+            if remark not in self.remarks_seen and text.rfind(marker) != -1:
+                self.remarks_seen.add(remark)
+
+        failures_line = last_line_containing(text, FAILURES_BY_TEST.encode() if binary else FAILURES_BY_TEST)
+        if failures_line is not None:
+            self.failures_line = failures_line
+            self.tests_settled = True  # Its tests were scanned above
+
+        # A label whose value has not started yet (only whitespace follows
+        # it) is carried into the next piece so the \s* can span lines.
+        carry_start = len(text)
+        for key, tail in spanning_tails.items():
+            if key in self.found:
+                continue
+            match = tail.search(text)
             if match:
-                extracted_data[test_col] = match.group(1)
-
-    def extract_bank_coordinates(text):
-        pattern = r"Bank Coordinates with failures:\s*(\[\[.*?\]\])"
-        match = re.search(pattern, text)
-
-        if match:
-            coordinates_str = match.group(1)  # Extract full list as a string
-            coordinates_list = eval(coordinates_str)  # Convert string to list
-        
-        # Format the extracted data
-            if len(coordinates_list) > 5:
-                return ", ".join(map(str, coordinates_list[:5])) + ", +more..."
+                carry_start = min(carry_start, match.start())
+        self.carry = text[carry_start:]
+
+    def search_tail(self, log_file, start=0, block_size=STREAM_CHUNK_SIZE) -> None:
+        """
+        Settle Remark and the last "Failures by Test:" line from a binary
+        file, for a scan that stopped feeding once complete at byte offset
+        start. Only the bytes after start are searched, backwards from the
+        end, stopping once that line and the best remark marker still
+        possible are found.
+        """
+        seen = [position for position, remark in enumerate(REMARK_MARKERS) if remark in self.remarks_seen]
+        # Only markers ranking above the best one seen can change Remark
+        pending = list(range(min(seen, default=len(REMARK_MARKERS))))
+        failures_marker = FAILURES_BY_TEST.encode()
+        overlap = max(len(marker) for marker in BYTES_REMARK_MARKERS + [failures_marker]) - 1
+        failures_position = None
+        for offset, block in iter_blocks_backwards(log_file, overlap, block_size, start):
+            found = [position for position in pending if block.find(BYTES_REMARK_MARKERS[position]) != -1]
+            if found:
+                self.remarks_seen.update(REMARK_MARKERS[position] for position in found)
+                pending = pending[:min(found)]
+            if failures_position is None:
+                index = block.rfind(failures_marker)
+                if index != -1:
+                    failures_position = offset + index
+            if failures_position is not None and not pending:
+                break
+        if failures_position is not None:
+            self.failures_line = read_line_at(log_file, failures_position, block_size)
+
+    @property
+    def complete(self) -> bool:
+        """Whether every field the scan still needs to look for has been found."""
+        return self.found >= self.required_patterns and (self.tests_settled or self.found >= TEST_FIELD_KEYS)
+
+    def finish(self) -> dict:
+        """Return the raw extracted_data, with Remark resolved."""
+        self.extracted_data["Remark"] = next(
+            (marker for marker in REMARK_MARKERS if marker in self.remarks_seen),
+            "No match found"
+        )
+        return self.extracted_data
+
+
+def iter_line_chunks(log_file, chunk_size=STREAM_CHUNK_SIZE):
+    """
+    Yield pieces of roughly chunk_size that always end on a line boundary.
+    Works on text and binary file objects alike.
+    """
+    while True:
+        chunk = log_file.read(chunk_size)
+        if not chunk:
+            return
+        if not chunk.endswith("\n" if isinstance(chunk, str) else b"\n"):
+            chunk += log_file.readline()
+        yield chunk
+
+
+def scan_log_mmap(log_file_path: str, columns=COLUMNS) -> LogScanner:
+    """
+    Run a LogScanner over a memory-mapped log using the bytes patterns.
+    The file is never decoded or copied as a whole; pages are read by the
+    OS on demand and only captured values become str.
+    """
+    scanner = LogScanner(columns)
+    with open(log_file_path, "rb") as log_file:
+        if os.fstat(log_file.fileno()).st_size == 0:
+            scanner.feed(b"")  # mmap refuses empty files
+        else:
+            with mmap.mmap(log_file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                scanner.feed(mapped)
+    scanner.finish()
+    return scanner
+
+
+def scan_log_file(log_file_path: str, columns=COLUMNS, streaming=False, encoding=None, use_mmap=False) -> LogScanner:
+    """
+    Run a LogScanner over a log file. With streaming the file is read in
+    bounded chunks instead of as one string; with use_mmap it is scanned
+    as bytes straight from a memory map.
+    """
+    if use_mmap:
+        return scan_log_mmap(log_file_path, columns)
+    scanner = LogScanner(columns)
+    if streaming:
+        # Read as bytes and decoded per chunk the way text mode would, so
+        # the offset where the scan completes is known
+        encoding = encoding or locale.getpreferredencoding(False)
+        with open(log_file_path, "rb") as log_file:
+            offset = 0
+            for chunk in iter_line_chunks(log_file):
+                offset += len(chunk)
+                scanner.feed(chunk.decode(encoding).replace("\r\n", "\n").replace("\r", "\n"))
+                if scanner.complete:
+                    # The rest of the log only matters for its summary lines
+                    scanner.search_tail(log_file, offset)
+                    break
+    else:
+        with open(log_file_path, "r", encoding=encoding) as log_file:
+            scanner.feed(log_file.read())
+    scanner.finish()
+    return scanner
+
+
+def scan_log_stream(log_file, columns=COLUMNS) -> LogScanner:
+    """
+    Run a LogScanner over a binary stream (e.g. an archive member) in
+    bounded chunks, using the bytes patterns like the mmap backend.
+    """
+    scanner = LogScanner(columns)
+    fed = False
+    for chunk in iter_line_chunks(log_file):
+        scanner.feed(chunk)
+        fed = True
+    if not fed:
+        scanner.feed(b"")
+    scanner.finish()
+    return scanner
+
+
+def extract_fields(log_content: str, columns=COLUMNS) -> dict:
+    """
+    Run the field patterns over the full log text.
+    Returns the raw extracted_data dict, "N/A" for anything not found.
+    """
+    scanner = LogScanner(columns)
+    scanner.feed(log_content)
+    return scanner.finish()
+
+
+def extract_bank_coordinates(text):
+    pattern = r"Bank Coordinates with failures:\s*(\[\[.*?\]\])"
+    match = re.search(pattern, text)
+
+    if match:
+        coordinates_str = match.group(1)  # Extract full list as a string
+        coordinates_list = decode_literal(coordinates_str)  # Convert string to list
+
+    # Format the extracted data
+        if len(coordinates_list) > 5:
+            return ", ".join(map(str, coordinates_list[:5])) + ", +more..."
+        else:
+            return ", ".join(map(str, coordinates_list))
+
+    return "N/A"
+
+
+def count_failures(test_group, extracted_data):
+    fail_count = 0
+    for test in test_group:
+        if extracted_data.get(f"{test}_grade") == "FAIL":
+            fail_count += 1
+    return f"{fail_count}f" if fail_count > 0 else "P"
+
+
+def get_failure_count(value):
+    if value == "P":
+        return 0
+    elif value.endswith('f'):
+        try:
+            return int(value[:-1])  # Extract numeric part before 'f'
+        except:
+            return 0
+    return 0
+
+
+def format_adjacent_failures(numbers):
+    numbers = sorted(set(map(int, numbers.split(", "))))  # Convert to sorted list of integers
+    if not numbers:
+        return "No Adjacent Failures"
+    ranges = []
+    start = numbers[0]
+    prev = numbers[0]
+    for num in numbers[1:]:
+        if num == prev + 1:
+            prev = num  # Continue range
+        else:
+            ranges.append(f"{start}-{prev}" if start != prev else str(start))
+            start = prev = num  # Start new range
+    ranges.append(f"{start}-{prev}" if start != prev else str(start))
+    return ", ".join(ranges)
+
+
+def format_multiple_values(value, limit=5):
+    if value == "N/A":
+        return value
+    if isinstance(value, str):
+        if value.startswith("{") or value.startswith("["):
+            values = re.findall(r"\d+", value)
+            if len(values) > limit:
+                return ", ".join(values[:limit]) + ", +more..."
             else:
-                return ", ".join(map(str, coordinates_list))
-    
+                return ", ".join(values)
+        return value
+
+
+def final_bin(extracted_data: dict) -> str:
+    """Final Bin of one parsed row, per FINAL_BIN_RULES."""
+    total_banks_failed = int(extracted_data.get("Total Banks Failed", "0"))
+    power_mode = extracted_data.get("Current Power Mode", "").strip().upper()
+    if power_mode not in BANK_FAIL_LIMITS:
         return "N/A"
 
-    
-    def count_failures(test_group, extracted_data):
-        fail_count = 0
-        for test in test_group:
-            if extracted_data.get(f"{test}_grade") == "FAIL":
-                fail_count += 1
-        return f"{fail_count}f" if fail_count > 0 else "P"
-    
-
-    extracted_data["Failed Banks"] = count_failures([
-    "ATE_CMD_BANK_PE_ALL_REG_ACCESS", "ATE_CMD_BANK_PE_MACC", "ATE_CMD_BANK_PE_MULT5X5", 
-    "ATE_CMD_BANK_PE_ACC", "ATE_CMD_BANK_PE_ROTATE", "ATE_CMD_BANK_PE_NORM_PRIORITY", 
-    "ATE_CMD_BANK_PE_GEMV_FP8", "ATE_CMD_BANK_PE_GEMV_FP8_SFP16", "ATE_CMD_BANK_PE_GEMV_SFP16", 
-    "ATE_CMD_BANK_PE_GEMV_INT4", "ATE_CMD_BANK_PE_GEMV_INT8", "ATE_CMD_BANK_PE_ROW_REDUCE", 
-    "ATE_CMD_BANK_PE_NORM_REDUCE_ADDER", "ATE_CMD_BANK_PE_NORM_BYTEADDER_SHIFT_PRIO", 
-    "ATE_CMD_BANK_PE_GEMV_BROADCAST", "ATE_CMD_BANK_PE_GEMV_SPARSITY", "ATE_CMD_BANK_PE_NORM_DATA_MUX", 
-    "ATE_CMD_BANK_GEMV_HALF_ZERO", "ATE_CMD_BANK_PE_NORM", "ATE_CMD_BANK_PE_ZERO_DETECT", "ATE_CMD_BANK_NOC_BUFFER"
-], extracted_data)
-
-    extracted_data["Noc PassThrough"] = count_failures([
-    "ATE_CMD_BANK_NOC_PASSTHROUGH_N", "ATE_CMD_BANK_NOC_PASSTHROUGH_S", 
-    "ATE_CMD_BANK_NOC_PASSTHROUGH_E", "ATE_CMD_BANK_NOC_PASSTHROUGH_W"
-], extracted_data)
-    
-    extracted_data["Noc Route"] = count_failures([
-    "ATE_CMD_BANK_NOC_ROUTE_N", "ATE_CMD_BANK_NOC_ROUTE_S", 
-    "ATE_CMD_BANK_NOC_ROUTE_E", "ATE_CMD_BANK_NOC_ROUTE_W"
-], extracted_data)
-
-    extracted_data["Bank Cram Test"] = count_failures([
-    "ATE_CMD_BANK_CRAM_BIST_10N", "ATE_CMD_BANK_CRAM_BIST_FULL", 
-    "ATE_CMD_BANK_CRAM_BIST_B2B", "ATE_CMD_BANK_CRAM_BIST_BURST"
-], extracted_data)
-
-    extracted_data["CMCM Functional Tests"] = count_failures([
-    "ATE_CMD_CMCM_ALL_FUNCTIONAL"
-], extracted_data)
-
-    extracted_data["UCM_ALL"] = count_failures([
-    "ATE_CMD_UCM_ALL"
-], extracted_data)
-
-    extracted_data["LPDDR Test"] = count_failures([
-    "ATE_CMD_DDR_APB_ACCESS", "ATE_CMD_DDR_MCU_MEM", "ATE_CMD_DDR_ACK_HO", 
-    "ATE_CMD_DDR_ACK_FS", "ATE_CMD_DDR_PHYINIT_TRAIN_NORTH", 
-    "ATE_CMD_DDR_PHYINIT_ALL_NORTH_WR_RD", "ATE_CMD_DDR_MEM_SWP_WRRD_N", 
-    "ATE_CMD_DDR_MEM_SWP_RDLOOP_N", "ATE_CMD_DDR_PHYINIT_TRAIN_EAST", 
-    "ATE_CMD_DDR_PHYINIT_ALL_EAST_WR_RD", "ATE_CMD_DDR_MEM_SWP_WRRD_E", 
-    "ATE_CMD_DDR_MEM_SWP_RDLOOP_E", "ATE_CMD_DDR_PHYINIT_FULL"
-], extracted_data)
+    row = {
+        "Total Banks Failed": total_banks_failed,
+        "Adjacent": extracted_data.get("Adjacent"),
+    }
+    limit = BANK_FAIL_LIMITS[power_mode]
+    for condition, outcome in FINAL_BIN_RULES:
+        if condition(row, limit):
+            return outcome.format(mode=power_mode)
+
+
+def evaluate_final_bin(df: pd.DataFrame) -> pd.Series:
+    """
+    Final Bin of every row of a Format 1 or Merge frame, per FINAL_BIN_RULES,
+    evaluated column-wise with np.select. Equal to final_bin() row by row,
+    so historical rows can be re-binned in one pass after a rule change.
+    Raises ValueError if Total Banks Failed is not a number in some row.
+    """
+    rows = len(df)
+    if "Total Banks Failed" in df.columns:
+        total_banks_failed = pd.to_numeric(df["Total Banks Failed"]).astype(float)
+        if total_banks_failed.isna().any():
+            raise ValueError(f"Total Banks Failed is missing in {int(total_banks_failed.isna().sum())} rows")
+    else:
+        total_banks_failed = pd.Series(0.0, index=df.index)
+
+    power_mode = (df["Current Power Mode"].astype(str).str.strip().str.upper().to_numpy()
+                  if "Current Power Mode" in df.columns else np.full(rows, ""))
+    row = {
+        "Total Banks Failed": total_banks_failed.to_numpy(),
+        "Adjacent": df["Adjacent"].astype(object).to_numpy() if "Adjacent" in df.columns else None,
+    }
+
+    conditions, choices = [], []
+    for power_mode_name, limit in BANK_FAIL_LIMITS.items():
+        in_mode = power_mode == power_mode_name
+        for condition, outcome in FINAL_BIN_RULES:
+            conditions.append(in_mode & np.broadcast_to(condition(row, limit), (rows,)))
+            choices.append(outcome.format(mode=power_mode_name))
+    bins = np.select(conditions, choices, default="N/A").astype(object)
+    return pd.Series(bins, index=df.index, name="Final Bin")
+
+
+def finalize_row(extracted_data: dict, in_progress: bool = False) -> dict:
+    """
+    Derive the summary columns (failure groups, remarks, adjacency, Final Bin)
+    from the raw fields. Mutates and returns extracted_data.
+    in_progress marks a log still being written, whose Final Bin stays "N/A"
+    until its Total Banks Failed line arrives.
+    """
+    for group, tests in TEST_GROUPS.items():
+        extracted_data[group] = count_failures(tests, extracted_data)
 
-    def get_failure_count(value):
-        if value == "P":
-            return 0
-        elif value.endswith('f'):
-            try:
-                return int(value[:-1])  # Extract numeric part before 'f'
-            except:
-                return 0
-        return 0
     fb_count = get_failure_count(extracted_data.get("Failed Banks", ""))
     bct_count = get_failure_count(extracted_data.get("Bank Cram Test", ""))
     ucm_count = get_failure_count(extracted_data.get("UCM_ALL", ""))
@@ -243,36 +726,9 @@ def parse_log_file(log_file_path: str) ->  pd.DataFrame:
     else:
         extracted_data["Remarks"] = "N/A"
 
-    def format_adjacent_failures(numbers):
-        numbers = sorted(set(map(int, numbers.split(", "))))  # Convert to sorted list of integers
-        if not numbers:
-            return "No Adjacent Failures"
-        ranges = []
-        start = numbers[0]
-        prev = numbers[0]
-        for num in numbers[1:]:
-            if num == prev + 1:
-                prev = num  # Continue range
-            else:
-                ranges.append(f"{start}-{prev}" if start != prev else str(start))
-                start = prev = num  # Start new range
-        ranges.append(f"{start}-{prev}" if start != prev else str(start))
-        return ", ".join(ranges)
-
     if extracted_data["Columns with Failures"] != "N/A":
         extracted_data["Adjacent Columns Failures"] = format_adjacent_failures(extracted_data["Columns with Failures"])
 
-    def format_multiple_values(value, limit=5):
-        if value == "N/A":
-            return value
-        if isinstance(value, str):
-            if value.startswith("{") or value.startswith("["):
-                values = re.findall(r"\d+", value)
-                if len(values) > limit:
-                    return ", ".join(values[:limit]) + ", +more..."
-                else:
-                    return ", ".join(values)
-            return value
     for key in ["Banks Failed", "Columns with Failures", "Banks Repairable after CRAM test", "Banks Failed after CRAM Test"]:
         extracted_data[key] = format_multiple_values(extracted_data[key])
 
@@ -288,85 +744,38 @@ def parse_log_file(log_file_path: str) ->  pd.DataFrame:
     else:
         extracted_data["Adjacent"] = "NO"
 
-    if "More than 2 bad columns. Bad CHIP" in log_content:
-        extracted_data["Remark"] = "More than 2 bad columns. Bad CHIP"
-    elif "passing" in log_content:
-        extracted_data["Remark"] = "passing"
-    elif "BAD CHIP. Below Test failed" in log_content:
-        extracted_data["Remark"] = "BAD CHIP. Below Test failed"
+    if in_progress and extracted_data.get("Total Banks Failed") == "N/A":
+        extracted_data["Final Bin"] = "N/A"
     else:
-        extracted_data["Remark"] = "No match found"
+        extracted_data["Final Bin"] = final_bin(extracted_data)
 
-# Convert "Total Banks Failed" safely to integer
-    total_banks_failed = int(extracted_data.get("Total Banks Failed", "0"))  # Default "0" to avoid errors
+    return extracted_data
 
-    power_mode = extracted_data.get("Current Power Mode", "").strip().upper()
 
-# Initialize Final Bin
-    final_bin = "N/A"
+def format1_record(log_file_path: str, extracted_data: dict, in_progress: bool = False) -> dict:
+    """Build the Format 1 row from raw extracted fields."""
+    extracted_data["File Name"] = os.path.basename(log_file_path)  # Store file name
+    return finalize_row(extracted_data, in_progress)
 
-    if power_mode == "ECO":
-        if total_banks_failed <= 2:
-            final_bin = "Failed(ECO)"
-        elif extracted_data.get("Adjacent") == "YES":
-            final_bin = "Failed(ECO)"
-        else:
-            chip_version = extracted_data.get("Chip Version", "").strip()
-            non_bank = extracted_data.get("Non Bank", "").strip()
-
-            if chip_version == "A0":
-                # Ignore Noc Passthrough, check Non Bank
-                if non_bank == "N/A":
-                    final_bin = "Failed(ECO)"
-                else:
-                    final_bin = "HB1(ECO)"
-            else:
-                if non_bank == "N/A":
-                    final_bin = "Failed(ECO)"
-                else:
-                    final_bin = "HB1(ECO)"
-
-    elif power_mode == "SPORT":
-        if total_banks_failed <= 5:
-            final_bin = "Failed(SPORT)"
-        elif extracted_data.get("Adjacent") == "YES":
-            final_bin = "Failed(SPORT)"
-        else:
-            chip_version = extracted_data.get("Chip Version", "").strip()
-            non_bank = extracted_data.get("Non Bank", "").strip()
-
-            if chip_version == "A0":
-                # Ignore Noc Passthrough, check Non Bank
-                if non_bank == "N/A":
-                    final_bin = "Failed(SPORT)"
-                else:
-                    final_bin = "HB1(SPORT)"
-            else:
-                if non_bank == "N/A":
-                    final_bin = "Failed(SPORT)"
-                else:
-                    final_bin = "HB1(SPORT)"
-    extracted_data["Final Bin"] = final_bin
-
-    extracted_data_list = [extracted_data]
 
-    return pd.DataFrame(extracted_data_list)
+def merge_record(log_file_path: str, extracted_data: dict, in_progress: bool = False) -> dict:
+    """Build the Merge row from raw extracted fields."""
+    extracted_data["File Name"] = os.path.basename(log_file_path)  # Store file name
+    finalize_row(extracted_data, in_progress)
+    extracted_data["Mark Power"] = extracted_data["Current Power Mode"] + extracted_data["Marking Id"]
 
-    
+    delete_columns = TEST_COLUMNS + TEST_SUMMARY
+    for i in set(delete_columns):
+        extracted_data.pop(i, None)  # Safe deletion
 
+    return extracted_data
 
 
-def parse_log_file2(log_file_path: str) ->  pd.DataFrame:
+def format2_records(log_file_path: str, first_line: str, failures_line) -> list:
     """
-    Parse a log file for format2 and extract structured data.
-    Returns a dictionary with extracted metrics instead of directly writing to Excel.
+    Build the Format 2 rows (one per SLT test) from the first log line and
+    the last "Failures by Test:" line.
     """
-
-    # Read the log file
-    with open(log_file_path, "r", encoding="utf-8") as file:
-        lines = file.readlines()
-
-    # Extract Information
     extracted_data = {
         "File Name": os.path.basename(log_file_path),
         "Marking ID": "N/A",
@@ -374,82 +783,19 @@ def parse_log_file2(log_file_path: str) ->  pd.DataFrame:
         "Power Mode": "ECO" if "ECO" in log_file_path else "SPORT",
     }
 
-    if lines:
-        extracted_data["Marking ID"] = lines[0].strip().split(":")[1].strip() if lines[0].startswith("Marking ID:") else "N/A"
-
-    for line in lines:
-        line = line.strip()
-
-        # Extract Failures by Test
-        if "Failures by Test:" in line:
-            extracted_data["Failures by Test"] = eval(line.split("Failures by Test:")[1].strip())
-
-    # SLT Test to Category Mapping
-    test_category_mapping = {
-        "ATE_CMD_DDR_APB_ACCESS": "LPDDR Test",
-        "ATE_CMD_DDR_MCU_MEM": "LPDDR Test",
-        "ATE_CMD_DDR_ACK_HO": "LPDDR Test",
-        "ATE_CMD_DDR_ACK_FS": "LPDDR Test",
-        "ATE_CMD_DDR_PHYINIT_TRAIN_NORTH": "LPDDR Test",
-        "ATE_CMD_DDR_PHYINIT_ALL_NORTH_WR_RD": "LPDDR Test",
-        "ATE_CMD_DDR_MEM_SWP_WRRD_N": "LPDDR Test",
-        "ATE_CMD_DDR_MEM_SWP_RDLOOP_N": "LPDDR Test",
-        "ATE_CMD_DDR_PHYINIT_TRAIN_EAST": "LPDDR Test",
-        "ATE_CMD_DDR_PHYINIT_ALL_EAST_WR_RD": "LPDDR Test",
-        "ATE_CMD_DDR_MEM_SWP_WRRD_E": "LPDDR Test",
-        "ATE_CMD_DDR_MEM_SWP_RDLOOP_E": "LPDDR Test",
-        "ATE_CMD_DDR_PHYINIT_FULL": "LPDDR Test",
-        "ATE_CMD_BANK_PE_ALL_REG_ACCESS": "Failed Banks",
-        "ATE_CMD_BANK_PE_MACC": "Failed Banks",
-        "ATE_CMD_BANK_PE_MULT5X5": "Failed Banks",
-        "ATE_CMD_BANK_PE_ACC": "Failed Banks",
-        "ATE_CMD_BANK_PE_ROTATE": "Failed Banks",
-        "ATE_CMD_BANK_PE_NORM_PRIORITY": "Failed Banks",
-        "ATE_CMD_BANK_PE_GEMV_FP8": "Failed Banks",
-        "ATE_CMD_BANK_PE_GEMV_FP8_SFP16": "Failed Banks",
-        "ATE_CMD_BANK_PE_GEMV_SFP16": "Failed Banks",
-        "ATE_CMD_BANK_PE_GEMV_INT4": "Failed Banks",
-        "ATE_CMD_BANK_PE_GEMV_INT8": "Failed Banks",
-        "ATE_CMD_BANK_PE_ROW_REDUCE": "Failed Banks",
-        "ATE_CMD_BANK_PE_NORM_REDUCE_ADDER": "Failed Banks",
-        "ATE_CMD_BANK_PE_NORM_BYTEADDER_SHIFT_PRIO": "Failed Banks",
-        "ATE_CMD_BANK_PE_GEMV_BROADCAST": "Failed Banks",
-        "ATE_CMD_BANK_PE_GEMV_SPARSITY": "Failed Banks",
-        "ATE_CMD_BANK_PE_NORM_DATA_MUX": "Failed Banks",
-        "ATE_CMD_BANK_GEMV_HALF_ZERO": "Failed Banks",
-        "ATE_CMD_BANK_PE_NORM": "Failed Banks",
-        "ATE_CMD_BANK_PE_ZERO_DETECT": "Failed Banks",
-        "ATE_CMD_BANK_NOC_PASSTHROUGH_N": "Noc PassThrough",
-        "ATE_CMD_BANK_NOC_PASSTHROUGH_S": "Noc PassThrough",
-        "ATE_CMD_BANK_NOC_PASSTHROUGH_E": "Noc PassThrough",
-        "ATE_CMD_BANK_NOC_PASSTHROUGH_W": "Noc PassThrough",
-        "ATE_CMD_BANK_NOC_ROUTE_N": "Noc Route",
-        "ATE_CMD_BANK_NOC_ROUTE_S": "Noc Route",
-        "ATE_CMD_BANK_NOC_ROUTE_E": "Noc Route",
-        "ATE_CMD_BANK_NOC_ROUTE_W": "Noc Route",
-        "ATE_CMD_BANK_NOC_BUFFER": "Failed Banks",
-        "ATE_CMD_BANK_CRAM_BIST_10N": "Bank Cram Test",
-        "ATE_CMD_BANK_CRAM_BIST_FULL": "Bank Cram Test",
-        "ATE_CMD_BANK_CRAM_BIST_B2B": "Bank Cram Test",
-        "ATE_CMD_BANK_CRAM_BIST_BURST": "Bank Cram Test",
-        "ATE_CMD_CMCM_ALL_FUNCTIONAL": "CMCM Functional Tests",
-        "ATE_CMD_UCM_ALL": "UCM_ALL",
-        "ATE_CMD_PCM_SKT_SCAN_E": "PCM Fails",
-        "ATE_CMD_PCM_SKT_SCAN_W": "PCM Fails",
-        "ATE_CMD_PCM_SKT_SCAN_S": "PCM Fails",
-        "ATE_CMD_PCM_SKT_SCAN_N": "PCM Fails",
-        "ATE_CMD_PCM_BANK_IDC_PING_S": "Failed Banks",
-        "ATE_CMD_PCM_IDC_READ_WRITE_S": "PCM Fails",
-        "ATE_CMD_BANK_GEMV_QUARTER_POWER": "Power",
-        "ATE_CMD_BANK_GEMV_POWER_STATUS_CHECK": "Power"
-    }
+    if first_line:
+        extracted_data["Marking ID"] = first_line.strip().split(":")[1].strip() if first_line.startswith("Marking ID:") else "N/A"
+
+    # Extract Failures by Test
+    if failures_line is not None:
+        extracted_data["Failures by Test"] = decode_literal(failures_line.strip().split(FAILURES_BY_TEST)[1].strip())
 
     # Initialize extracted values
     extracted_data["Tests"] = []
-    
+
     for test_name, bank_id in extracted_data["Failures by Test"].items():
         result = "FAIL" if bank_id else "PASS"
-        category = test_category_mapping.get(test_name.strip(), "Unknown Category")
+        category = TEST_CATEGORY_MAPPING.get(test_name.strip(), "Unknown Category")
 
         extracted_data["Tests"].append({
             "SLT Test": test_name,
@@ -459,338 +805,293 @@ def parse_log_file2(log_file_path: str) ->  pd.DataFrame:
             "Power Mode": extracted_data["Power Mode"],
             "Result Type": "Pass_0B" if result == "PASS" else "Fail_1B"
         })
-    df=pd.DataFrame(extracted_data["Tests"])
-    return df
+    return extracted_data["Tests"]
 
-def parse_log_file3(log_file_path: str) ->  pd.DataFrame:
+
+def format2_from_content(log_file_path: str, log_content: str) -> list:
+    """Locate the Format 2 inputs in the full log text and build its rows."""
+    first_line = log_content.split("\n", 1)[0]
+    failures_line = last_line_containing(log_content, FAILURES_BY_TEST)
+    return format2_records(log_file_path, first_line, failures_line)
+
+
+def to_typed(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Return a copy of a parser output frame with typed columns (see
+    TYPED_INT_COLUMNS / TYPED_CATEGORY_COLUMNS). Columns the frame does not
+    have are skipped, so it works on Format 1, Format 2 and Merge alike.
+    """
+    typed = df.copy()
+    for col in TYPED_INT_COLUMNS:
+        if col in typed.columns:
+            typed[col] = pd.to_numeric(typed[col], errors="coerce").astype("Int64")
+    if "Timestamp" in typed.columns:
+        typed["Timestamp"] = pd.to_datetime(typed["Timestamp"], format=TIMESTAMP_FORMAT, errors="coerce")
+    # Per-test grades and group summaries only take a handful of values too
+    for col in TYPED_CATEGORY_COLUMNS + TEST_SUMMARY + list(TEST_GROUPS):
+        if col in typed.columns:
+            typed[col] = typed[col].where(typed[col] != "N/A").astype("category")
+    return typed
+
+
+def parse_log_file(log_file_path: str, streaming: bool = False, use_mmap: bool = False, typed: bool = False) ->  pd.DataFrame:
     """
     Parse a log file and extract structured data
     Returns dictionary with 40+ extracted metrics
     """
-    columns = [
-    "File Name", "Timestamp", "Chip Number", "Marking Id", "Chip Version",
-    "SLT Test Version", "Current Frequency", "Current Power Mode",
-    "VDDP", "VDDM", "VDDCORE", "VDDHF", "VDDIO", "VDDWL", 
-    "Banks Failed", "Columns with Failures",
-    "Banks Repairable after CRAM test", "Banks Failed after CRAM Test", "Repair Data Applied", "Remark", "Total Banks Failed"
-]
+    extracted_data = scan_log_file(log_file_path, COLUMNS, streaming, use_mmap=use_mmap).extracted_data
 
-    test_columns = [
-    "ATE_CMD_BANK_PE_ALL_REG_ACCESS", "ATE_CMD_BANK_PE_MACC", "ATE_CMD_BANK_PE_MULT5X5", 
-    "ATE_CMD_BANK_PE_ACC", "ATE_CMD_BANK_PE_ROTATE", "ATE_CMD_BANK_PE_NORM_PRIORITY", 
-    "ATE_CMD_BANK_PE_GEMV_FP8", "ATE_CMD_BANK_PE_GEMV_FP8_SFP16", "ATE_CMD_BANK_PE_GEMV_SFP16", 
-    "ATE_CMD_BANK_PE_GEMV_INT4", "ATE_CMD_BANK_PE_GEMV_INT8", "ATE_CMD_BANK_PE_ROW_REDUCE", 
-    "ATE_CMD_BANK_PE_NORM_REDUCE_ADDER", "ATE_CMD_BANK_PE_NORM_BYTEADDER_SHIFT_PRIO", 
-    "ATE_CMD_BANK_PE_GEMV_BROADCAST", "ATE_CMD_BANK_PE_GEMV_SPARSITY", "ATE_CMD_BANK_PE_NORM_DATA_MUX", 
-    "ATE_CMD_BANK_GEMV_HALF_ZERO", "ATE_CMD_BANK_PE_NORM", "ATE_CMD_BANK_NOC_PERECV_STORE_FRWD_NS", 
-    "ATE_CMD_BANK_NOC_PERECV_STORE_FRWD_SN", "ATE_CMD_BANK_NOC_PASSTHROUGH_N", 
-    "ATE_CMD_BANK_NOC_PASSTHROUGH_S", "ATE_CMD_BANK_NOC_PASSTHROUGH_W", "ATE_CMD_BANK_NOC_ROUTE_N", 
-    "ATE_CMD_BANK_NOC_ROUTE_S", "ATE_CMD_BANK_NOC_ROUTE_W", "ATE_CMD_BANK_NOC_BUFFER", 
-    "ATE_CMD_BANK_CRAM_BIST_10N", "ATE_CMD_BANK_CRAM_BIST_FULL", "ATE_CMD_BANK_CRAM_BIST_B2B", 
-    "ATE_CMD_BANK_CRAM_BIST_BURST", "ATE_CMD_CMCM_ALL_FUNCTIONAL", "ATE_CMD_UCM_ALL", 
-    "ATE_CMD_PCM_BANK_IDC_PING_S", "ATE_CMD_DDR_APB_ACCESS", "ATE_CMD_DDR_MCU_MEM", 
-    "ATE_CMD_DDR_ACK_HO", "ATE_CMD_DDR_ACK_FS", "ATE_CMD_DDR_PHYINIT_TRAIN_NORTH", 
-    "ATE_CMD_DDR_PHYINIT_ALL_NORTH_WR_RD", "ATE_CMD_DDR_MEM_SWP_WRRD_N", "ATE_CMD_DDR_MEM_SWP_RDLOOP_N", 
-    "ATE_CMD_DDR_PHYINIT_TRAIN_EAST", "ATE_CMD_DDR_PHYINIT_ALL_EAST_WR_RD", "ATE_CMD_DDR_MEM_SWP_WRRD_E", 
-    "ATE_CMD_DDR_MEM_SWP_RDLOOP_E", "ATE_CMD_DDR_PHYINIT_FULL"
-]
+    df = pd.DataFrame([format1_record(log_file_path, extracted_data)])
+    return to_typed(df) if typed else df
 
-    test_summary = [
-    "ATE_CMD_BANK_PE_ALL_REG_ACCESS_grade", "ATE_CMD_BANK_PE_MACC_grade", "ATE_CMD_BANK_PE_MULT5X5_grade",
-    "ATE_CMD_BANK_PE_ACC_grade", "ATE_CMD_BANK_PE_ROTATE_grade", "ATE_CMD_BANK_PE_NORM_PRIORITY_grade",
-    "ATE_CMD_BANK_PE_GEMV_FP8_grade", "ATE_CMD_BANK_PE_GEMV_FP8_SFP16_grade", "ATE_CMD_BANK_PE_GEMV_SFP16_grade",
-    "ATE_CMD_BANK_PE_GEMV_INT4_grade", "ATE_CMD_BANK_PE_GEMV_INT8_grade", "ATE_CMD_BANK_PE_ROW_REDUCE_grade",
-    "ATE_CMD_BANK_PE_NORM_REDUCE_ADDER_grade", "ATE_CMD_BANK_PE_NORM_BYTEADDER_SHIFT_PRIO_grade",
-    "ATE_CMD_BANK_PE_GEMV_BROADCAST_grade", "ATE_CMD_BANK_PE_GEMV_SPARSITY_grade", "ATE_CMD_BANK_PE_NORM_DATA_MUX_grade",
-    "ATE_CMD_BANK_GEMV_HALF_ZERO_grade", "ATE_CMD_BANK_PE_NORM_grade", "ATE_CMD_BANK_NOC_PERECV_STORE_FRWD_NS_grade",
-    "ATE_CMD_BANK_NOC_PERECV_STORE_FRWD_SN_grade", "ATE_CMD_BANK_NOC_PASSTHROUGH_N_grade",
-    "ATE_CMD_BANK_NOC_PASSTHROUGH_S_grade", "ATE_CMD_BANK_NOC_PASSTHROUGH_W_grade", "ATE_CMD_BANK_NOC_ROUTE_N_grade",
-    "ATE_CMD_BANK_NOC_ROUTE_S_grade", "ATE_CMD_BANK_NOC_ROUTE_W_grade", "ATE_CMD_BANK_NOC_BUFFER_grade",
-    "ATE_CMD_BANK_CRAM_BIST_10N_grade", "ATE_CMD_BANK_CRAM_BIST_FULL_grade", "ATE_CMD_BANK_CRAM_BIST_B2B_grade",
-    "ATE_CMD_BANK_CRAM_BIST_BURST_grade", "ATE_CMD_CMCM_ALL_FUNCTIONAL_grade", "ATE_CMD_UCM_ALL_grade",
-    "ATE_CMD_PCM_BANK_IDC_PING_S_grade", "ATE_CMD_DDR_APB_ACCESS_grade", "ATE_CMD_DDR_MCU_MEM_grade",
-    "ATE_CMD_DDR_ACK_HO_grade", "ATE_CMD_DDR_ACK_FS_grade", "ATE_CMD_DDR_PHYINIT_TRAIN_NORTH_grade",
-    "ATE_CMD_DDR_PHYINIT_ALL_NORTH_WR_RD_grade", "ATE_CMD_DDR_MEM_SWP_WRRD_N_grade", "ATE_CMD_DDR_MEM_SWP_RDLOOP_N_grade",
-    "ATE_CMD_DDR_PHYINIT_TRAIN_EAST_grade", "ATE_CMD_DDR_PHYINIT_ALL_EAST_WR_RD_grade", "ATE_CMD_DDR_MEM_SWP_WRRD_E_grade",
-    "ATE_CMD_DDR_MEM_SWP_RDLOOP_E_grade", "ATE_CMD_DDR_PHYINIT_FULL_grade"
-]
 
-    patterns = {
-    "Timestamp": r"curr_time=(\d{4}-\d{2}-\d{2}_\d{2}-\d{2}-\d{2})",
-    "Chip Number": r"chip_id=([\w\d\.]+)",
-    "Marking Id": r"Marking ID: ([\w\d\-\_]+)",
-    "Chip Version": r"Chip version: ([\w\d]+)",
-    "SLT Test Version": r"Diagnostic fw version: (v[\d\.]+)",
-    "Current Frequency": r"ctUtilsPower : INFO : Current Frequency: (\d+)",
-    "Current Power Mode": r"ctUtilsPower : INFO : Current Power Mode: (\w+)",
-    "VDDP": r"VDDP: (\d+)",
-    "VDDM": r"VDDM: (\d+)",
-    "VDDCORE": r"VDDCORE: (\d+)",
-    "VDDHF": r"VDDHF: (\d+)",
-    "VDDIO": r"VDDIO: (\d+)",
-    "VDDWL": r"VDDWL: (\d+)",
-    "Banks Failed": r"Banks Failed: \{([\d, ]+)\}"
-}
+def parse_log_file2(log_file_path: str, streaming: bool = False, use_mmap: bool = False, typed: bool = False) ->  pd.DataFrame:
+    """
+    Parse a log file for format2 and extract structured data.
+    Returns a dictionary with extracted metrics instead of directly writing to Excel.
+    """
+    # Only the first line and the last "Failures by Test:" line are needed,
+    # so the binary modes read the head and search back from the end
+    if use_mmap or streaming:
+        with open(log_file_path, "rb") as file:
+            if use_mmap and os.fstat(file.fileno()).st_size > 0:
+                with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                    first_line = first_line_of(mapped)
+                    failures_line = last_line_containing(mapped, FAILURES_BY_TEST.encode())
+            else:
+                first_line = decode_capture(file.readline().rstrip(b"\n"))
+                failures_line = read_last_line_containing(file, FAILURES_BY_TEST.encode())
+        records = format2_records(log_file_path, first_line, failures_line)
+    else:
+        with open(log_file_path, "r", encoding="utf-8") as file:
+            records = format2_from_content(log_file_path, file.read())
 
-    patterns1 = {
-    "Columns with Failures": r"Columns with failures: \{([\d, ]+)\}",
-    "Banks Repairable after CRAM test": r"Banks Repairable after CRAM test: \{([\d, ]+)\}",
-    "Banks Failed after CRAM Test": r"Banks Failed after CRAM [Tt]est:\s*\{([\d, ]+)\}",
-    "Repair Data Applied": r"Repair Data Applied: \{(.*?)\}",
-    "Total Banks Failed": r"Total Numbers of Banks Failed: (\d+)",
-    "Bank Co-ordinates with Failures": r"Bank Coordinates with failures:\s*(\[\[.*?\]\])"
-}
-    file_name = os.path.basename(log_file_path)
-
-    extracted_data = {col: "N/A" for col in columns + test_columns + test_summary}
-    
-    extracted_data["File Name"] = file_name  # Store file name
-# Function to extract data from a single log file
-    
-    with open(log_file_path, "r") as log_file:
-        log_content = log_file.read()
-        for key, pattern in patterns.items():
-            match = re.search(pattern, log_content)
-            if match:
-                extracted_data[key] = match.group(1)
+    df=pd.DataFrame(records)
+    return to_typed(df) if typed else df
 
-        for key, pattern in patterns1.items():
-            match = re.search(pattern, log_content)
-            if match:
-                extracted_data[key] = match.group(1)
 
-        for summary in test_summary:
-            pattern2 = rf"Test Name: {summary.replace('_grade', '')} : (PASS|FAIL)"
-            match = re.search(pattern2, log_content)
-            if match:
-                extracted_data[summary] = match.group(1)
+def parse_log_file3(log_file_path: str, streaming: bool = False, use_mmap: bool = False, typed: bool = False) ->  pd.DataFrame:
+    """
+    Parse a log file and extract structured data
+    Returns dictionary with 40+ extracted metrics
+    """
+    extracted_data = scan_log_file(log_file_path, MERGE_COLUMNS, streaming, use_mmap=use_mmap).extracted_data
 
-    # Extract test_columns data
-        for test_col in test_columns:
-            pattern = rf"{test_col}': (set\(\)|\[.*?\]|\{{.*?\}}|\d+)"
-            match = re.search(pattern, log_content)
-            if match:
-                extracted_data[test_col] = match.group(1)
-    
-    def count_failures(test_group, extracted_data):
-        fail_count = 0
-        for test in test_group:
-            if extracted_data.get(f"{test}_grade") == "FAIL":
-                fail_count += 1
-        return f"{fail_count}f" if fail_count > 0 else "P"
-    
-
-    extracted_data["Failed Banks"] = count_failures([
-    "ATE_CMD_BANK_PE_ALL_REG_ACCESS", "ATE_CMD_BANK_PE_MACC", "ATE_CMD_BANK_PE_MULT5X5", 
-    "ATE_CMD_BANK_PE_ACC", "ATE_CMD_BANK_PE_ROTATE", "ATE_CMD_BANK_PE_NORM_PRIORITY", 
-    "ATE_CMD_BANK_PE_GEMV_FP8", "ATE_CMD_BANK_PE_GEMV_FP8_SFP16", "ATE_CMD_BANK_PE_GEMV_SFP16", 
-    "ATE_CMD_BANK_PE_GEMV_INT4", "ATE_CMD_BANK_PE_GEMV_INT8", "ATE_CMD_BANK_PE_ROW_REDUCE", 
-    "ATE_CMD_BANK_PE_NORM_REDUCE_ADDER", "ATE_CMD_BANK_PE_NORM_BYTEADDER_SHIFT_PRIO", 
-    "ATE_CMD_BANK_PE_GEMV_BROADCAST", "ATE_CMD_BANK_PE_GEMV_SPARSITY", "ATE_CMD_BANK_PE_NORM_DATA_MUX", 
-    "ATE_CMD_BANK_GEMV_HALF_ZERO", "ATE_CMD_BANK_PE_NORM", "ATE_CMD_BANK_PE_ZERO_DETECT", "ATE_CMD_BANK_NOC_BUFFER"
-], extracted_data)
-
-    extracted_data["Noc PassThrough"] = count_failures([
-    "ATE_CMD_BANK_NOC_PASSTHROUGH_N", "ATE_CMD_BANK_NOC_PASSTHROUGH_S", 
-    "ATE_CMD_BANK_NOC_PASSTHROUGH_E", "ATE_CMD_BANK_NOC_PASSTHROUGH_W"
-], extracted_data)
-    
-    extracted_data["Noc Route"] = count_failures([
-    "ATE_CMD_BANK_NOC_ROUTE_N", "ATE_CMD_BANK_NOC_ROUTE_S", 
-    "ATE_CMD_BANK_NOC_ROUTE_E", "ATE_CMD_BANK_NOC_ROUTE_W"
-], extracted_data)
-
-    extracted_data["Bank Cram Test"] = count_failures([
-    "ATE_CMD_BANK_CRAM_BIST_10N", "ATE_CMD_BANK_CRAM_BIST_FULL", 
-    "ATE_CMD_BANK_CRAM_BIST_B2B", "ATE_CMD_BANK_CRAM_BIST_BURST"
-], extracted_data)
-
-    extracted_data["CMCM Functional Tests"] = count_failures([
-    "ATE_CMD_CMCM_ALL_FUNCTIONAL"
-], extracted_data)
-
-    extracted_data["UCM_ALL"] = count_failures([
-    "ATE_CMD_UCM_ALL"
-], extracted_data)
-
-    extracted_data["LPDDR Test"] = count_failures([
-    "ATE_CMD_DDR_APB_ACCESS", "ATE_CMD_DDR_MCU_MEM", "ATE_CMD_DDR_ACK_HO", 
-    "ATE_CMD_DDR_ACK_FS", "ATE_CMD_DDR_PHYINIT_TRAIN_NORTH", 
-    "ATE_CMD_DDR_PHYINIT_ALL_NORTH_WR_RD", "ATE_CMD_DDR_MEM_SWP_WRRD_N", 
-    "ATE_CMD_DDR_MEM_SWP_RDLOOP_N", "ATE_CMD_DDR_PHYINIT_TRAIN_EAST", 
-    "ATE_CMD_DDR_PHYINIT_ALL_EAST_WR_RD", "ATE_CMD_DDR_MEM_SWP_WRRD_E", 
-    "ATE_CMD_DDR_MEM_SWP_RDLOOP_E", "ATE_CMD_DDR_PHYINIT_FULL"
-], extracted_data)
+    df = pd.DataFrame([merge_record(log_file_path, extracted_data)])
+    return to_typed(df) if typed else df
 
-    def get_failure_count(value):
-        if value == "P":
-            return 0
-        elif value.endswith('f'):
-            try:
-                return int(value[:-1])  # Extract numeric part before 'f'
-            except:
-                return 0
-        return 0
-    fb_count = get_failure_count(extracted_data.get("Failed Banks", ""))
-    bct_count = get_failure_count(extracted_data.get("Bank Cram Test", ""))
-    ucm_count = get_failure_count(extracted_data.get("UCM_ALL", ""))
-    lpddr_count = get_failure_count(extracted_data.get("LPDDR Test", ""))
-    cmcm_count = get_failure_count(extracted_data.get("CMCM Functional Tests", ""))
-    noc_route_count = get_failure_count(extracted_data.get("Noc Route", ""))
-    noc_passthrough_count = get_failure_count(extracted_data.get("Noc Passthrough", ""))
 
-    bank_failures=[]
-    Remarks = []
-    Non_Bank = []
+def parse_log_all_records(log_file_path: str, streaming: bool = False, use_mmap: bool = False):
+    """
+    Parse a log file once and return the plain rows of all three outputs:
+    (Format 1 record, list of Format 2 records, Merge record).
+    """
+    scanner = scan_log_file(log_file_path, COLUMNS, streaming, encoding="utf-8", use_mmap=use_mmap)
+    return records_from_scanner(log_file_path, scanner)
 
-    if fb_count >= 1:
-        Remarks.append("Failed Banks")
-        bank_failures.append("Failed Banks")
-    if bct_count >= 1:
-        Remarks.append("Bank Cram Test")
-        bank_failures.append("Bank Cram Test")
-    if ucm_count >= 1:
-        Remarks.append("UCM")
-        Non_Bank.append("UCM")
-    if lpddr_count >= 1:
-        Remarks.append("LPDDR")
-        Non_Bank.append("LPDDR")
-    if cmcm_count >= 1:
-        Remarks.append("CMCM")
-        Non_Bank.append("CMCM")
-    if noc_route_count >= 1:
-        Remarks.append("Noc Route")
-        Non_Bank.append("Noc Route")
-    if noc_passthrough_count >= 1:
-        Remarks.append("Noc Passthrough")
-        Non_Bank.append("Noc Passthrough")
 
-    if bank_failures:
-        extracted_data["Bank Related Fails"] = f"Bank-rel({', '.join(bank_failures)})"
-    else:
-        extracted_data["Bank Related Fails"] = "N/A"
+def records_from_scanner(log_file_path: str, scanner: LogScanner, in_progress: bool = False):
+    """
+    Build (Format 1 record, list of Format 2 records, Merge record) from a
+    finished LogScanner run with COLUMNS. Consumes its extracted_data.
+    in_progress is passed on to finalize_row.
+    """
+    extracted_data = scanner.extracted_data
 
-    if Non_Bank:
-        extracted_data["Non-Bank Related Fails"] = f"Non-Bank-rel({', '.join(Non_Bank)})"
-    else:
-        extracted_data["Non-Bank Related Fails"] = "N/A"
+    # Merge is Format 1 without the coordinates column when it wasn't found;
+    # otherwise the column moves to just after the per-test columns.
+    merge_data = {col: extracted_data[col] for col in MERGE_COLUMNS + TEST_COLUMNS + TEST_SUMMARY}
+    if extracted_data["Bank Co-ordinates with Failures"] != "N/A":
+        merge_data["Bank Co-ordinates with Failures"] = extracted_data["Bank Co-ordinates with Failures"]
 
-    if Remarks:
-        extracted_data["Remarks"] = f"Bank-rel({', '.join(Remarks)})"
-    else:
-        extracted_data["Remarks"] = "N/A"
+    return (
+        format1_record(log_file_path, extracted_data, in_progress),
+        format2_records(log_file_path, scanner.first_line, scanner.failures_line),
+        merge_record(log_file_path, merge_data, in_progress),
+    )
 
-    def format_adjacent_failures(numbers):
-        numbers = sorted(set(map(int, numbers.split(", "))))  # Convert to sorted list of integers
-        if not numbers:
-            return "No Adjacent Failures"
-        ranges = []
-        start = numbers[0]
-        prev = numbers[0]
-        for num in numbers[1:]:
-            if num == prev + 1:
-                prev = num  # Continue range
-            else:
-                ranges.append(f"{start}-{prev}" if start != prev else str(start))
-                start = prev = num  # Start new range
-        ranges.append(f"{start}-{prev}" if start != prev else str(start))
-        return ", ".join(ranges)
 
-    if extracted_data["Columns with Failures"] != "N/A":
-        extracted_data["Adjacent Columns Failures"] = format_adjacent_failures(extracted_data["Columns with Failures"])
+def parse_log_all(log_file_path: str, streaming: bool = False, use_mmap: bool = False, typed: bool = False):
+    """
+    Parse a log file once and build all three outputs from the same read.
+    Returns (Format 1, Format 2, Merge) DataFrames, equal to calling
+    parse_log_file, parse_log_file2 and parse_log_file3 separately.
+    With streaming the file is read in bounded chunks; with use_mmap it is
+    scanned as bytes from a memory map. typed returns to_typed frames.
+    """
+    record1, records2, record3 = parse_log_all_records(log_file_path, streaming, use_mmap)
+    frames = pd.DataFrame([record1]), pd.DataFrame(records2), pd.DataFrame([record3])
+    return tuple(to_typed(df) for df in frames) if typed else frames
 
-    def format_multiple_values(value, limit=5):
-        if value == "N/A":
-            return value
-        if isinstance(value, str):
-            if value.startswith("{") or value.startswith("["):
-                values = re.findall(r"\d+", value)
-                if len(values) > limit:
-                    return ", ".join(values[:limit]) + ", +more..."
-                else:
-                    return ", ".join(values)
-            return value
-    for key in ["Banks Failed", "Columns with Failures", "Banks Repairable after CRAM test", "Banks Failed after CRAM Test"]:
-        extracted_data[key] = format_multiple_values(extracted_data[key])
 
-    if extracted_data["Repair Data Applied"] != "N/A":
-        repair_data_list = re.findall(r"(\d+: \[\d+, \d+\])", extracted_data["Repair Data Applied"])
-        if len(repair_data_list) > 5:
-            extracted_data["Repair Data Applied"] = ", ".join(repair_data_list[:5]) + ", +more..."
-        else:
-            extracted_data["Repair Data Applied"] = ", ".join(repair_data_list)
+class ColumnBuilder:
+    """
+    Accumulates records (dicts) column by column, so a batch of any size
+    becomes one DataFrame in a single construction. Equal to
+    pd.DataFrame(records): columns in order of first appearance, NaN for
+    keys a record lacks.
+    """
 
-    if extracted_data["Adjacent Columns Failures"] != "N/A":
-        extracted_data["Adjacent"] = "YES"
-    else:
-        extracted_data["Adjacent"] = "NO"
+    def __init__(self):
+        self.columns = {}
+        self.rows = 0
 
-    if "More than 2 bad columns. Bad CHIP" in log_content:
-        extracted_data["Remark"] = "More than 2 bad columns. Bad CHIP"
-    elif "passing" in log_content:
-        extracted_data["Remark"] = "passing"
-    elif "BAD CHIP. Below Test failed" in log_content:
-        extracted_data["Remark"] = "BAD CHIP. Below Test failed"
-    else:
-        extracted_data["Remark"] = "No match found"
+    def append(self, record):
+        for col in record:
+            if col not in self.columns:
+                self.columns[col] = [float("nan")] * self.rows
+        for col, values in self.columns.items():
+            values.append(record.get(col, float("nan")))
+        self.rows += 1
 
-# Convert "Total Banks Failed" safely to integer
-    total_banks_failed = int(extracted_data.get("Total Banks Failed", "0"))  # Default "0" to avoid errors
+    def extend(self, records):
+        for record in records:
+            self.append(record)
 
-    power_mode = extracted_data.get("Current Power Mode", "").strip().upper()
+    def to_frame(self) -> pd.DataFrame:
+        return pd.DataFrame(self.columns)
 
-# Initialize Final Bin
-    final_bin = "N/A"
 
-    if power_mode == "ECO":
-        if total_banks_failed <= 2:
-            final_bin = "Failed(ECO)"
-        elif extracted_data.get("Adjacent") == "YES":
-            final_bin = "Failed(ECO)"
-        else:
-            chip_version = extracted_data.get("Chip Version", "").strip()
-            non_bank = extracted_data.get("Non Bank", "").strip()
-
-            if chip_version == "A0":
-                # Ignore Noc Passthrough, check Non Bank
-                if non_bank == "N/A":
-                    final_bin = "Failed(ECO)"
-                else:
-                    final_bin = "HB1(ECO)"
-            else:
-                if non_bank == "N/A":
-                    final_bin = "Failed(ECO)"
-                else:
-                    final_bin = "HB1(ECO)"
-
-    elif power_mode == "SPORT":
-        if total_banks_failed <= 5:
-            final_bin = "Failed(SPORT)"
-        elif extracted_data.get("Adjacent") == "YES":
-            final_bin = "Failed(SPORT)"
-        else:
-            chip_version = extracted_data.get("Chip Version", "").strip()
-            non_bank = extracted_data.get("Non Bank", "").strip()
-
-            if chip_version == "A0":
-                # Ignore Noc Passthrough, check Non Bank
-                if non_bank == "N/A":
-                    final_bin = "Failed(SPORT)"
-                else:
-                    final_bin = "HB1(SPORT)"
-            else:
-                if non_bank == "N/A":
-                    final_bin = "Failed(SPORT)"
-                else:
-                    final_bin = "HB1(SPORT)"
-    extracted_data["Final Bin"] = final_bin
-    extracted_data["Mark Power"] = extracted_data["Current Power Mode"] + extracted_data["Marking Id"]
-    
-    delete_columns = test_columns + test_summary
-    for i in set(delete_columns):
-        extracted_data.pop(i, None)  # Safe deletion
+class RecordBatch:
+    """
+    Shared builder for the (Format 1, Format 2, Merge) outputs of many logs.
+    Add parsed records with add() or parse straight into it with add_file(),
+    then build all three DataFrames once with frames().
+    """
+
+    def __init__(self):
+        self.format1 = ColumnBuilder()
+        self.format2 = ColumnBuilder()
+        self.merge = ColumnBuilder()
+
+    def add(self, record1, records2, record3):
+        """Add one log's records, as returned by parse_log_all_records."""
+        self.format1.append(record1)
+        self.format2.extend(records2)
+        self.merge.append(record3)
+
+    def add_file(self, log_file_path: str, streaming: bool = False, use_mmap: bool = False):
+        self.add(*parse_log_all_records(log_file_path, streaming, use_mmap))
+
+    def frames(self, typed: bool = False):
+        """Returns (Format 1, Format 2, Merge) DataFrames of everything added."""
+        frames = self.format1.to_frame(), self.format2.to_frame(), self.merge.to_frame()
+        return tuple(to_typed(df) for df in frames) if typed else frames
+
+
+def is_archive(path: str) -> bool:
+    return path.lower().endswith(ZIP_SUFFIXES + TAR_SUFFIXES + GZIP_SUFFIXES)
+
+
+def is_archive_member_log(name: str) -> bool:
+    return not name.endswith("/") and not name.startswith(ARCHIVE_SKIP_PREFIXES)
 
-    extracted_data_list = [extracted_data]
- 
-    return pd.DataFrame(extracted_data_list)
 
+def parse_stream_records(log_name: str, log_file):
+    """parse_log_all_records for a binary stream; log_name stands in for the path."""
+    return records_from_scanner(log_name, scan_log_stream(log_file))
+
+
+def parse_file_records(log_file_path: str, use_mmap: bool = False):
+    return [parse_log_all_records(log_file_path, use_mmap=use_mmap)]
+
+
+def parse_zip_member(archive_path: str, member: str):
+    with zipfile.ZipFile(archive_path) as archive, archive.open(member) as log_file:
+        return [parse_stream_records(member, log_file)]
+
+
+def parse_tar(archive_path: str):
+    # Tar members can only be reached in order, so one job streams them all
+    records = []
+    with tarfile.open(archive_path, "r|*") as archive:
+        for member in archive:
+            if member.isfile() and is_archive_member_log(member.name):
+                records.append(parse_stream_records(member.name, archive.extractfile(member)))
+    return records
+
+
+def parse_gzip(archive_path: str):
+    log_name = os.path.basename(archive_path)[:-len(".gz")]
+    with gzip.open(archive_path, "rb") as log_file:
+        return [parse_stream_records(log_name, log_file)]
+
+
+def parse_jobs(path: str, use_mmap: bool = False):
+    """
+    Split an uploaded file into parse jobs: (label, callable) pairs whose
+    callables return lists of parse_log_all_records tuples. A plain log or
+    a gzip/tar archive is one job; every zip member is a job of its own.
+    """
+    name = os.path.basename(path)
+    lowered = path.lower()
+    if lowered.endswith(ZIP_SUFFIXES):
+        with zipfile.ZipFile(path) as archive:
+            members = [member for member in archive.namelist() if is_archive_member_log(member)]
+        return [(f"{name}/{member}", partial(parse_zip_member, path, member)) for member in members]
+    if lowered.endswith(TAR_SUFFIXES):
+        return [(name, partial(parse_tar, path))]
+    if lowered.endswith(GZIP_SUFFIXES):
+        return [(name, partial(parse_gzip, path))]
+    return [(name, partial(parse_file_records, path, use_mmap=use_mmap))]
+
+
+def parse_many(log_file_paths, workers=None, use_mmap: bool = True, cache=None, typed: bool = False):
+    """
+    Parse many log files across a process pool.
+    Returns (Format 1, Format 2, Merge) DataFrames covering every file, in
+    the order given. Archives (zip, tar, gzip) contribute one set of rows
+    per member log, zip members being parsed in parallel. workers defaults
+    to the CPU count; workers=1 parses in-process. With a ParseCache, files
+    already parsed by this parser version are served from it and only the
+    rest are parsed. typed returns to_typed frames.
+    Raises ValueError naming the first file that failed.
+    """
+    log_file_paths = list(log_file_paths)
+    workers = workers or os.cpu_count() or 1
+
+    # Per path, the list of record tuples of every log it holds
+    results = [None] * len(log_file_paths)
+    keys = [None] * len(log_file_paths)
+    if cache is not None:
+        for index, log_file_path in enumerate(log_file_paths):
+            keys[index] = cache.key_for(log_file_path, PARSER_VERSION)
+            cached = cache.get(keys[index])
+            if cached is not None:
+                results[index] = cached if is_archive(log_file_path) else [cached]
+    pending = [index for index, result in enumerate(results) if result is None]
+
+    jobs = []
+    for index in pending:
+        try:
+            jobs.extend((index, label, job) for label, job in parse_jobs(log_file_paths[index], use_mmap))
+        except Exception as e:
+            raise ValueError(f"Error processing file {os.path.basename(log_file_paths[index])}: {str(e)}") from e
+        results[index] = []
+
+    if workers == 1 or len(jobs) <= 1:
+        for index, label, job in jobs:
+            try:
+                results[index].extend(job())
+            except Exception as e:
+                raise ValueError(f"Error processing file {label}: {str(e)}") from e
+    else:
+        with ProcessPoolExecutor(max_workers=min(workers, len(jobs))) as pool:
+            futures = [pool.submit(job) for _, _, job in jobs]
+            for (index, label, _), future in zip(jobs, futures):
+                try:
+                    results[index].extend(future.result())
+                except Exception as e:
+                    raise ValueError(f"Error processing file {label}: {str(e)}") from e
+
+    if cache is not None and pending:
+        for index in pending:
+            records = results[index]
+            cache.put(keys[index], records if is_archive(log_file_paths[index]) else records[0])
+        cache.evict()
+
+    batch = RecordBatch()
+    for records in results:
+        for record in records:
+            batch.add(*record)
+    return batch.frames(typed)
@@ -0,0 +1,121 @@
+import time
+import pickle
+import hashlib
+import sqlite3
+from contextlib import contextmanager
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    key TEXT PRIMARY KEY,
+    dataset_version TEXT NOT NULL,
+    value BLOB NOT NULL,
+    size INTEGER NOT NULL,
+    last_used REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS results_last_used ON results (last_used);
+CREATE INDEX IF NOT EXISTS results_dataset_version ON results (dataset_version);
+"""
+
+_MISSING = object()  # Tells a miss apart from a stored None
+
+
+class ResultCache:
+    """
+    Cache of computed tables and charts shared by every worker process,
+    kept in SQLite. Entries derived from the Merge history carry the
+    dataset version they were computed from and are only served for it;
+    entries keyed on their own inputs (e.g. an upload's content hash) use
+    an empty version. The least recently used entries, which soon include
+    those of versions the dataset has moved on from, are evicted once the
+    stored values grow past max_bytes.
+    """
+
+    def __init__(self, path, max_bytes=64 * 1024 * 1024):
+        self.path = path
+        self.max_bytes = max_bytes
+        db = sqlite3.connect(path, timeout=30)
+        try:
+            db.execute("PRAGMA journal_mode=WAL")  # Readers don't block the writer
+            db.executescript(SCHEMA)
+        finally:
+            db.close()
+
+    @staticmethod
+    def key_for(name, *contents):
+        """Key for the result called name computed from the given bytes (e.g. uploaded files)."""
+        digest = hashlib.sha256(f"{name}\0".encode())
+        for content in contents:
+            digest.update(f"{len(content)}\0".encode())  # Keep the boundaries between inputs
+            digest.update(content)
+        return f"{name}:{digest.hexdigest()}"
+
+    @contextmanager
+    def _connect(self):
+        db = sqlite3.connect(self.path, timeout=30)
+        try:
+            with db:  # Commits, or rolls back on error
+                yield db
+        finally:
+            db.close()
+
+    def get(self, key, dataset_version="", default=None):
+        """Return the value stored under key for dataset_version, or default on a miss."""
+        with self._connect() as db:
+            row = db.execute(
+                "SELECT value FROM results WHERE key = ? AND dataset_version = ?", (key, dataset_version)
+            ).fetchone()
+            if row is None:
+                return default
+            db.execute("UPDATE results SET last_used = ? WHERE key = ?", (time.time(), key))
+        try:
+            return pickle.loads(row[0])
+        except (pickle.UnpicklingError, EOFError, AttributeError, ImportError):
+            return default
+
+    def put(self, key, value, dataset_version=""):
+        """Store value (anything picklable) under key, then evict down to max_bytes."""
+        data = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        with self._connect() as db:
+            db.execute(
+                "INSERT OR REPLACE INTO results (key, dataset_version, value, size, last_used) VALUES (?, ?, ?, ?, ?)",
+                (key, dataset_version, data, len(data), time.time())
+            )
+            self._evict(db)
+
+    def get_or_compute(self, key, compute, dataset_version=""):
+        """Return the cached value for key, computing and storing it on a miss."""
+        value = self.get(key, dataset_version, default=_MISSING)
+        if value is _MISSING:
+            value = compute()
+            self.put(key, value, dataset_version)
+        return value
+
+    def get_or_compute_current(self, key, compute, current_version):
+        """
+        get_or_compute for a result of a dataset that changes under it:
+        current_version() names the version the result is computed from, or
+        None if it can't, and the result isn't cached. The version is read
+        again once computed and the result is only stored if it hasn't moved,
+        so a result overlapping a change is never filed under either version.
+        """
+        dataset_version = current_version()
+        if dataset_version is None:
+            return compute()
+        value = self.get(key, dataset_version, default=_MISSING)
+        if value is _MISSING:
+            value = compute()
+            if current_version() == dataset_version:
+                self.put(key, value, dataset_version)
+        return value
+
+    def _evict(self, db):
+        total = db.execute("SELECT COALESCE(SUM(size), 0) FROM results").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        stale = []
+        for key, size in db.execute("SELECT key, size FROM results ORDER BY last_used"):
+            if total <= self.max_bytes:
+                break
+            stale.append((key,))
+            total -= size
+        db.executemany("DELETE FROM results WHERE key = ?", stale)
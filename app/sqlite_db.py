@@ -0,0 +1,39 @@
+import sqlite3
+from contextlib import contextmanager
+
+# Rows looked up per IN (...) query; SQLite's default cap on bound parameters is 999
+PARAMETER_CHUNK = 500
+
+
+@contextmanager
+def transaction(path):
+    """
+    A write transaction on the SQLite database at path, taken up front
+    (BEGIN IMMEDIATE) so concurrent writers queue instead of failing on
+    upgrade. Commits on success and rolls back on any error.
+    """
+    db = sqlite3.connect(path, timeout=30, isolation_level=None)
+    try:
+        db.execute("BEGIN IMMEDIATE")
+        yield db
+        db.execute("COMMIT")
+    except BaseException:
+        if db.in_transaction:
+            db.execute("ROLLBACK")
+        raise
+    finally:
+        db.close()
+
+
+@contextmanager
+def snapshot(path):
+    """
+    A read transaction on the SQLite database at path (deferred BEGIN): a
+    consistent view that, under WAL, neither blocks nor waits for writers.
+    """
+    db = sqlite3.connect(path, timeout=30, isolation_level=None)
+    try:
+        db.execute("BEGIN")
+        yield db
+    finally:
+        db.close()
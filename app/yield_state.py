@@ -0,0 +1,400 @@
+import sqlite3
+from collections import Counter
+
+import pandas as pd
+
+from app.history_store import DEDUP_KEYS
+from app.sqlite_db import PARAMETER_CHUNK, snapshot, transaction
+from app.yield_summary import (
+    DEFAULT_LOT_PATTERN, FAILURE_MODE_ROWS, PASSING_FINAL_BINS, PIE_CHART_COLUMNS, ROLLUP_DIMENSIONS,
+    calculate_final_binning, count_failure_categories, count_failure_modes, count_pie_sums, count_rollups,
+    render_rollup
+)
+
+# Bump whenever the stored counters change meaning, so they are rebuilt.
+YIELD_STATE_VERSION = "4"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+CREATE TABLE IF NOT EXISTS history_rows (
+    seq INTEGER PRIMARY KEY, dedup_key TEXT, marking_id TEXT, mode TEXT,
+    final_bin TEXT NOT NULL, remarks TEXT NOT NULL, bank TEXT, non_bank TEXT
+);
+CREATE INDEX IF NOT EXISTS history_rows_dedup_key ON history_rows (dedup_key);
+CREATE INDEX IF NOT EXISTS history_rows_marking_id ON history_rows (marking_id);
+CREATE INDEX IF NOT EXISTS history_rows_bank ON history_rows (bank);
+CREATE INDEX IF NOT EXISTS history_rows_non_bank ON history_rows (non_bank);
+CREATE TABLE IF NOT EXISTS tracker (
+    marking_id TEXT PRIMARY KEY,
+    seq INTEGER NOT NULL,
+    eco_bin TEXT NOT NULL, eco_remarks TEXT NOT NULL,
+    sport_bin TEXT NOT NULL, sport_remarks TEXT NOT NULL,
+    final_binning TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS tracker_seq ON tracker (seq);
+CREATE TABLE IF NOT EXISTS tracker_bins (
+    column_name TEXT NOT NULL, bin TEXT NOT NULL, count INTEGER NOT NULL,
+    PRIMARY KEY (column_name, bin)
+);
+CREATE TABLE IF NOT EXISTS failure_modes (
+    mode TEXT NOT NULL, label TEXT NOT NULL, count INTEGER NOT NULL,
+    PRIMARY KEY (mode, label)
+);
+CREATE TABLE IF NOT EXISTS categories (category TEXT PRIMARY KEY, bank_seq INTEGER, non_bank_seq INTEGER);
+CREATE TABLE IF NOT EXISTS category_counts (
+    mode TEXT NOT NULL, category TEXT NOT NULL, count INTEGER NOT NULL, adjacent INTEGER NOT NULL,
+    PRIMARY KEY (mode, category)
+);
+CREATE TABLE IF NOT EXISTS pie_sums (
+    mode TEXT NOT NULL, test TEXT NOT NULL, total INTEGER NOT NULL,
+    PRIMARY KEY (mode, test)
+);
+CREATE TABLE IF NOT EXISTS rollups (
+    dimension TEXT NOT NULL, bucket TEXT NOT NULL, mode TEXT NOT NULL, final_bin TEXT NOT NULL, count INTEGER NOT NULL,
+    PRIMARY KEY (dimension, bucket, mode, final_bin)
+);
+"""
+
+STATE_TABLES = [
+    "meta", "history_rows", "tracker", "tracker_bins", "failure_modes", "categories", "category_counts", "pie_sums",
+    "rollups"
+]
+
+
+class StaleYieldState(ValueError):
+    """The counters were built by another YIELD_STATE_VERSION or lot pattern, or never built."""
+
+
+class YieldState:
+    """
+    Running SLT Tracker and Yield counters over the Merge history, kept in
+    SQLite. Each ingested batch of Merge rows updates them by its delta,
+    taking out the rows it replaced (see HistoryStore.append), so ingest
+    cost follows the batch size rather than the history size:
+    - per history row, the few fields the tracker and the category order
+      depend on, keyed by its dedup key, so a replaced row can be found;
+    - per marking ID, its first ECO and SPORT result (as create_slt_tracker
+      keeps the first row per marking ID and mode) and its Final Binning,
+      re-derived from the rows of the chips a batch touches;
+    - counts of every tracker bin, failure mode and failure category, and
+      the pie chart sums of each test;
+    - trend rollups: rows per day, lot prefix (lot_pattern, see
+      rollup_buckets) and SLT Test Version, by power mode and Final Bin.
+    The tables read back from it equal a full recomputation over the
+    Merge rows applied so far.
+    """
+
+    def __init__(self, path, lot_pattern=DEFAULT_LOT_PATTERN):
+        self.path = path
+        self.lot_pattern = lot_pattern
+        db = sqlite3.connect(path, timeout=30)
+        try:
+            db.execute("PRAGMA journal_mode=WAL")  # Readers don't block the writer
+            db.executescript(SCHEMA)  # executescript manages its own transaction
+        finally:
+            db.close()
+
+    @staticmethod
+    def _meta(db, key, default=None):
+        row = db.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else default
+
+    @staticmethod
+    def _set_meta(db, key, value):
+        db.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, str(value)))
+
+    def _current(self, db):
+        # Counters of another version, or rolled up by another lot pattern, are stale
+        return self._meta(db, "version") == YIELD_STATE_VERSION and self._meta(db, "lot_pattern") == self.lot_pattern
+
+    def applied_rows(self):
+        """Number of Merge rows applied so far, or None if the state is stale or empty."""
+        with snapshot(self.path) as db:
+            if not self._current(db):
+                return None
+            return int(self._meta(db, "rows", 0))
+
+    def dataset_version(self):
+        """
+        Token naming the Merge history the counters cover: it changes with
+        every applied batch and every rebuild. None if the state is stale.
+        """
+        with snapshot(self.path) as db:
+            if not self._current(db):
+                return None
+            return f"{self._meta(db, 'generation', 0)}.{self._meta(db, 'next_row', 0)}"
+
+    def rebuild(self, history):
+        """
+        Drop every counter and apply history as the whole Merge history:
+        a frame, or an iterable of consecutive chunks of it, which give the
+        same counters with memory bounded by the chunk size.
+        """
+        with transaction(self.path) as db:
+            self._rebuild(db, history)
+
+    def _rebuild(self, db, history):
+        chunks = [history] if isinstance(history, pd.DataFrame) else history
+        generation = int(self._meta(db, "generation", 0)) + 1
+        for table in STATE_TABLES:
+            db.execute(f"DELETE FROM {table}")
+        self._set_meta(db, "version", YIELD_STATE_VERSION)
+        self._set_meta(db, "generation", generation)
+        self._set_meta(db, "lot_pattern", self.lot_pattern)
+        for chunk in chunks:
+            self._apply(db, chunk)
+
+    def sync(self, row_count, load_history):
+        """
+        Rebuild from load_history() (the whole Merge history, as rebuild
+        takes it) unless the counters already cover exactly row_count rows.
+        """
+        with transaction(self.path) as db:
+            if not self._current(db) or int(self._meta(db, "rows", 0)) != row_count:
+                self._rebuild(db, load_history())
+
+    def apply(self, merge_df, replaced, preceding_rows, load_history):
+        """
+        Update every counter with a batch of new Merge rows, which replaced
+        the stored rows replaced and were appended to the history after its
+        first preceding_rows rows (see HistoryStore.append). If the counters
+        don't cover exactly the rows the history held before, e.g. another
+        worker applied its own batch or rebuilt from a history that already
+        holds this one, they are rebuilt from load_history() (as rebuild
+        takes it) instead. Returns whether the batch was applied incrementally.
+        """
+        with transaction(self.path) as db:
+            if self._current(db) and int(self._meta(db, "rows", 0)) == preceding_rows + len(replaced):
+                self._apply(db, merge_df, replaced)
+                return True
+            self._rebuild(db, load_history())
+            return False
+
+    def _apply(self, db, merge_df, replaced=None):
+        replaced = merge_df.iloc[:0] if replaced is None else replaced
+        if merge_df.empty and replaced.empty:
+            return
+        rows = int(self._meta(db, "rows", 0))
+        next_row = int(self._meta(db, "next_row", 0))
+        for batch, sign in [(replaced, -1), (merge_df, 1)]:
+            if not batch.empty:
+                self._add_failure_modes(db, batch, sign)
+                self._add_category_counts(db, batch, sign)
+                self._add_pie_sums(db, batch, sign)
+                self._add_rollups(db, batch, sign)
+        self._remove_history_rows(db, replaced)
+        self._insert_history_rows(db, merge_df, next_row)
+        self._update_categories(db, [replaced, merge_df])
+        self._update_tracker(db, [replaced, merge_df])
+        self._set_meta(db, "rows", rows - len(replaced) + len(merge_df))
+        self._set_meta(db, "next_row", next_row + len(merge_df))
+
+    @staticmethod
+    def _add_counts(db, table, keys, values, counts, sign):
+        """Add sign times counts, rows of keys then values, to a counter table, dropping those back at zero."""
+        assignments = ", ".join(f"{value} = {value} + excluded.{value}" for value in values)
+        db.executemany(
+            f"INSERT INTO {table} ({', '.join(keys + values)}) VALUES ({', '.join('?' * (len(keys) + len(values)))}) "
+            f"ON CONFLICT ({', '.join(keys)}) DO UPDATE SET {assignments}",
+            [row[:len(keys)] + tuple(sign * count for count in row[len(keys):]) for row in counts]
+        )
+        if sign < 0:
+            db.executemany(
+                f"DELETE FROM {table} WHERE {' AND '.join(f'{key} = ?' for key in keys)} AND {values[0]} = 0",
+                [row[:len(keys)] for row in counts]
+            )
+
+    def _add_rollups(self, db, merge_df, sign):
+        counts = count_rollups(merge_df, self.lot_pattern)
+        self._add_counts(db, "rollups", ["dimension", "bucket", "mode", "final_bin"], ["count"], [
+            (dimension, str(bucket), str(mode), str(final_bin), int(count))
+            for dimension, bucket, mode, final_bin, count in counts.itertuples(index=False)
+        ], sign)
+
+    def _add_failure_modes(self, db, merge_df, sign):
+        counts = count_failure_modes(merge_df)
+        self._add_counts(db, "failure_modes", ["mode", "label"], ["count"], [
+            (mode, label, int(count)) for mode, labels in counts.items() for label, count in labels.items()
+        ], sign)
+
+    def _add_category_counts(self, db, merge_df, sign):
+        _, counts = count_failure_categories(merge_df)
+        self._add_counts(db, "category_counts", ["mode", "category"], ["count", "adjacent"], [
+            (mode, category, int(count), int(adjacent))
+            for (mode, category), count, adjacent in zip(counts.index, counts["count"], counts["adjacent"])
+        ], sign)
+
+    def _add_pie_sums(self, db, merge_df, sign):
+        sums = count_pie_sums(merge_df)
+        self._add_counts(db, "pie_sums", ["mode", "test"], ["total"], [
+            (mode, test, int(total)) for mode, totals in sums.items() for test, total in totals.items()
+        ], sign)
+
+    @staticmethod
+    def _categories(values):
+        return [None if pd.isna(value) or value == "N/A" else value for value in values.tolist()]
+
+    def _insert_history_rows(self, db, merge_df, next_row):
+        key = DEDUP_KEYS["Merge"]
+        keys = merge_df[key].tolist() if key in merge_df.columns else [None] * len(merge_df)
+        remarks = [
+            f"Bank Related: {bank}, Non-Bank Related: {non_bank}"
+            for bank, non_bank in zip(merge_df["Bank Related Fails"].tolist(), merge_df["Non-Bank Related Fails"].tolist())
+        ]
+        db.executemany("INSERT INTO history_rows VALUES (?, ?, ?, ?, ?, ?, ?, ?)", [
+            (next_row + position, None if pd.isna(dedup_key) else dedup_key,
+             None if pd.isna(marking_id) else marking_id, None if pd.isna(mode) else mode,
+             "" if pd.isna(final_bin) else final_bin, remark, bank, non_bank)
+            for position, (dedup_key, marking_id, mode, final_bin, remark, bank, non_bank) in enumerate(zip(
+                keys, merge_df["Marking Id"].tolist(), merge_df["Current Power Mode"].tolist(),
+                merge_df["Final Bin"].tolist(), remarks,
+                self._categories(merge_df["Bank Related Fails"]), self._categories(merge_df["Non-Bank Related Fails"])
+            ))
+        ])
+
+    @staticmethod
+    def _remove_history_rows(db, replaced):
+        # The history keeps one row per dedup key, so the key names the row replaced
+        key = DEDUP_KEYS["Merge"]
+        if not replaced.empty:
+            db.executemany("DELETE FROM history_rows WHERE dedup_key = ?", [(value,) for value in replaced[key].tolist()])
+
+    def _update_categories(self, db, batches):
+        # Table order is by first appearance over the whole history, so the
+        # first position of each category in either column is kept
+        categories = {
+            category for batch in batches for column in ["Bank Related Fails", "Non-Bank Related Fails"]
+            for category in self._categories(batch[column]) if category is not None
+        }
+        db.executemany(
+            "INSERT OR REPLACE INTO categories (category, bank_seq, non_bank_seq) VALUES (?, "
+            "(SELECT MIN(seq) FROM history_rows WHERE bank = ?), (SELECT MIN(seq) FROM history_rows WHERE non_bank = ?))",
+            [(category, category, category) for category in categories]
+        )
+        db.execute("DELETE FROM categories WHERE bank_seq IS NULL AND non_bank_seq IS NULL")
+
+    def _tracker_rows(self, db, marking_ids):
+        tracker, history_rows = {}, {}
+        for start in range(0, len(marking_ids), PARAMETER_CHUNK):
+            chunk = marking_ids[start:start + PARAMETER_CHUNK]
+            placeholders = ", ".join("?" * len(chunk))
+            for row in db.execute(f"SELECT * FROM tracker WHERE marking_id IN ({placeholders})", chunk):
+                tracker[row[0]] = row
+            for row in db.execute(
+                f"SELECT marking_id, seq, mode, final_bin, remarks FROM history_rows "
+                f"WHERE marking_id IN ({placeholders}) ORDER BY seq", chunk
+            ):
+                history_rows.setdefault(row[0], []).append(row[1:])
+        return tracker, history_rows
+
+    def _update_tracker(self, db, batches):
+        # Only the chips a batch touches can change; each is re-derived from its rows
+        marking_ids = list(dict.fromkeys(
+            marking_id for batch in batches for marking_id in batch["Marking Id"].tolist() if not pd.isna(marking_id)
+        ))
+        tracker, history_rows = self._tracker_rows(db, marking_ids)
+
+        updated, removed, bin_deltas = [], [], Counter()
+        for marking_id in marking_ids:
+            old = tracker.get(marking_id)
+            new = None
+            if marking_id in history_rows:
+                # Its first row orders it; the first row per mode wins, as in create_slt_tracker
+                rows = history_rows[marking_id]
+                by_mode = {}
+                for _, mode, final_bin, remarks in rows:
+                    by_mode.setdefault(mode, (final_bin, remarks))
+                eco_bin, eco_remarks = by_mode.get("ECO", ("", ""))
+                sport_bin, sport_remarks = by_mode.get("SPORT", ("", ""))
+                final_binning = calculate_final_binning({"Binning_ECO": eco_bin, "Binning_SPORT": sport_bin})
+                new = (marking_id, rows[0][0], eco_bin, eco_remarks, sport_bin, sport_remarks, final_binning)
+                updated.append(new)
+            else:
+                removed.append((marking_id,))
+            for row, sign in [(old, -1), (new, 1)]:
+                if row is not None:
+                    for column, value in zip(["Binning_ECO", "Binning_SPORT", "Final Binning"], row[2:7:2]):
+                        bin_deltas[(column, value)] += sign
+
+        db.executemany("DELETE FROM tracker WHERE marking_id = ?", removed)
+        db.executemany("INSERT OR REPLACE INTO tracker VALUES (?, ?, ?, ?, ?, ?, ?)", updated)
+        self._add_counts(db, "tracker_bins", ["column_name", "bin"], ["count"], [
+            (column, value, delta) for (column, value), delta in bin_deltas.items() if delta > 0
+        ], 1)
+        self._add_counts(db, "tracker_bins", ["column_name", "bin"], ["count"], [
+            (column, value, -delta) for (column, value), delta in bin_deltas.items() if delta < 0
+        ], -1)
+
+    def slt_tracker(self):
+        """The SLT Tracker table, as create_slt_tracker builds it from the history."""
+        with snapshot(self.path) as db:
+            rows = db.execute(
+                "SELECT marking_id, eco_bin, sport_bin, eco_remarks, sport_remarks, final_binning FROM tracker ORDER BY seq"
+            ).fetchall()
+        return pd.DataFrame(rows, columns=[
+            "Marking Id", "Binning_ECO", "Binning_SPORT", "Failure_Remarks_ECO", "Failure_Remarks_SPORT", "Final Binning"
+        ])
+
+    def bin_counts(self):
+        """count_tracker_bins of the SLT Tracker."""
+        with snapshot(self.path) as db:
+            rows = db.execute("SELECT column_name, bin, count FROM tracker_bins").fetchall()
+        return {(column, value): count for column, value, count in rows}
+
+    def failure_counts(self):
+        """count_failure_modes of the history."""
+        with snapshot(self.path) as db:
+            rows = db.execute("SELECT mode, label, count FROM failure_modes").fetchall()
+        stored = {(mode, label): count for mode, label, count in rows}
+        labels = [label for label, _, _ in FAILURE_MODE_ROWS] + ["Passing"]
+        return {mode: {label: stored.get((mode, label), 0) for label in labels} for mode in PASSING_FINAL_BINS}
+
+    def pie_sums(self):
+        """count_pie_sums of the history."""
+        with snapshot(self.path) as db:
+            rows = db.execute("SELECT mode, test, total FROM pie_sums").fetchall()
+        stored = {(mode, test): total for mode, test, total in rows}
+        return {mode: {test: stored.get((mode, test), 0) for test in PIE_CHART_COLUMNS} for mode in PASSING_FINAL_BINS}
+
+    def failure_categories(self):
+        """count_failure_categories of the history: (categories, counts)."""
+        with snapshot(self.path) as db:
+            categories = [row[0] for row in db.execute(
+                "SELECT category FROM categories ORDER BY bank_seq IS NULL, bank_seq, non_bank_seq"
+            )]
+            rows = db.execute("SELECT mode, category, count, adjacent FROM category_counts").fetchall()
+        index = pd.MultiIndex.from_arrays(
+            [[row[0] for row in rows], [row[1] for row in rows]], names=["mode", "category"]
+        )
+        counts = pd.DataFrame(
+            {"count": [row[2] for row in rows], "adjacent": [row[3] for row in rows]}, index=index, dtype="int64"
+        )
+        return categories, counts
+
+    def rollups(self, dimension, modes=None, start=None, end=None):
+        """
+        The render_rollup table of a dimension ("day", "lot" or "firmware"),
+        optionally for some power modes and buckets from start to end,
+        both inclusive (days compare as YYYY-MM-DD).
+        Raises StaleYieldState unless the counters are current (see sync).
+        """
+        if dimension not in ROLLUP_DIMENSIONS:
+            raise ValueError(f"Unknown rollup '{dimension}', expected one of {', '.join(ROLLUP_DIMENSIONS)}")
+        conditions, params = ["dimension = ?"], [dimension]
+        if modes:
+            conditions.append(f"mode IN ({', '.join('?' * len(modes))})")
+            params += list(modes)
+        if start is not None:
+            conditions.append("bucket >= ?")
+            params.append(start)
+        if end is not None:
+            conditions.append("bucket <= ?")
+            params.append(end)
+        with snapshot(self.path) as db:
+            if not self._current(db):
+                raise StaleYieldState("Yield state is stale; rebuild it from the Merge history first")
+            rows = db.execute(
+                f"SELECT bucket, mode, final_bin, count FROM rollups WHERE {' AND '.join(conditions)}", params
+            ).fetchall()
+        counts = pd.DataFrame(rows, columns=["bucket", "mode", "final_bin", "count"])
+        return render_rollup(counts, dimension)
@@ -0,0 +1,375 @@
+import re
+
+import numpy as np
+import pandas as pd
+
+from app.parser_script import TIMESTAMP_FORMAT
+
+# SLT Tracker and Yield tables computed from the Merge history. Kept apart
+# from app.py (which talks to Google at import time) so the incremental
+# yield state can share the same rules.
+
+# SLT Tracker Final Binning from a chip's ECO and SPORT bins; the first
+# rule that holds wins, "" otherwise. Conditions work on scalars and on
+# whole columns alike.
+FINAL_BINNING_RULES = [
+    (lambda eco, sport: eco == "HB1(ECO)", "HB1(ECO)"),
+    (lambda eco, sport: (eco == "Failed(ECO)") & (sport == "HB2(SPORT)"), "HB2(SPORT)"),
+    (lambda eco, sport: (eco == "HB1(ECO)") & (sport == "HB2(SPORT)"), "HB1(ECO)"),
+    (lambda eco, sport: (eco == "Failed(ECO)") & ((sport == "Failed(SPORT)") | (sport == "")), "Failed(ECO)"),
+]
+
+
+def create_slt_tracker(merge_df):
+    print("Columns in Merge Sheet:", merge_df.columns.tolist())
+
+    required_columns = ["Marking Id", "Current Power Mode", "Final Bin", "Bank Related Fails", "Non-Bank Related Fails"]
+    for column in required_columns:
+        if column not in merge_df.columns:
+            raise ValueError(f"Column '{column}' not found in the Merge sheet.")
+
+    merge_df = merge_df.drop_duplicates(subset=["Marking Id", "Current Power Mode"], keep="first")
+    unique_ids = merge_df["Marking Id"].unique()
+
+    # One row per marking ID, one column per power mode
+    merge_df = merge_df[merge_df["Current Power Mode"].isin(["ECO", "SPORT"])]
+    remarks = [
+        f"Bank Related: {bank}, Non-Bank Related: {non_bank}"
+        for bank, non_bank in zip(merge_df["Bank Related Fails"].tolist(), merge_df["Non-Bank Related Fails"].tolist())
+    ]
+    by_mode = pd.DataFrame({
+        "Marking Id": merge_df["Marking Id"],
+        "Current Power Mode": merge_df["Current Power Mode"],
+        "Binning": merge_df["Final Bin"],
+        "Failure_Remarks": remarks,
+    }).set_index(["Marking Id", "Current Power Mode"]).unstack("Current Power Mode")
+
+    slt_tracker_df = pd.DataFrame({"Marking Id": unique_ids})
+    for column in ["Binning", "Failure_Remarks"]:
+        for mode in ["ECO", "SPORT"]:
+            if (column, mode) in by_mode.columns:
+                values = by_mode[(column, mode)].reindex(unique_ids).fillna("").to_numpy()
+            else:
+                values = ""
+            slt_tracker_df[f"{column}_{mode}"] = values
+
+    slt_tracker_df["Final Binning"] = calculate_final_binning_column(slt_tracker_df)
+
+    return slt_tracker_df
+
+def calculate_final_binning(row):
+    eco_bin = row["Binning_ECO"].strip()
+    sport_bin = row["Binning_SPORT"].strip()
+
+    for condition, final_binning in FINAL_BINNING_RULES:
+        if condition(eco_bin, sport_bin):
+            return final_binning
+    return ""
+
+
+def calculate_final_binning_column(slt_tracker_df):
+    """calculate_final_binning for every row of the tracker at once."""
+    eco_bin = slt_tracker_df["Binning_ECO"].astype(str).str.strip().to_numpy()
+    sport_bin = slt_tracker_df["Binning_SPORT"].astype(str).str.strip().to_numpy()
+
+    conditions = [condition(eco_bin, sport_bin) for condition, _ in FINAL_BINNING_RULES]
+    choices = [final_binning for _, final_binning in FINAL_BINNING_RULES]
+    return np.select(conditions, choices, default="").astype(object)
+
+
+# Layouts of the SLT Tracker yield tables: the label column, its rows as
+# (label, tracker column, bin) and the (tracker column, bin) counts summed
+# into Grand Total. The ECO table keeps its historical SPORT labels and
+# the final table counts Special Case twice in its total, as it always has.
+YIELD_SUMMARY_TABLES = {
+    "ECO": {
+        "label": "SPORT-from SLT Tracker",
+        "rows": [
+            ("Failed (SPORT)", "Binning_ECO", "Failed(ECO)"),
+            ("HB1 (SPORT)", "Binning_ECO", "HB1(ECO)"),
+            ("Special Case", "Binning_ECO", "Special Case"),
+        ],
+    },
+    "SPORT": {
+        "label": "SPORT-from SLT Tracker",
+        "rows": [
+            ("Failed (SPORT)", "Binning_SPORT", "Failed(SPORT)"),
+            ("HB1 (SPORT)", "Binning_SPORT", "HB1(SPORT)"),
+            ("Special Case", "Binning_SPORT", "Special Case"),
+        ],
+    },
+    "Final": {
+        "label": "Final Binning",
+        "rows": [
+            ("Failed (ECO)", "Final Binning", "Failed(ECO)"),
+            ("HB1 (ECO)", "Final Binning", "HB1(ECO)"),
+            ("Failed (SPORT)", "Final Binning", "Failed(SPORT)"),
+            ("HB1 (SPORT)", "Final Binning", "HB1(SPORT)"),
+            ("Special Case", "Final Binning", "Special Case"),
+        ],
+        "total": [
+            ("Final Binning", "Failed(ECO)"), ("Final Binning", "HB1(ECO)"), ("Final Binning", "Special Case"),
+            ("Final Binning", "Failed(SPORT)"), ("Final Binning", "HB1(SPORT)"), ("Final Binning", "Special Case"),
+        ],
+    },
+}
+
+# Failure-mode rows of count_all_failures: (label, Merge column, values
+# that do not count besides missing and " ")
+FAILURE_MODE_ROWS = [
+    ("Bank-related Fails", "Bank Related Fails", []),
+    ("Adjacent Col Fails", "Adjacent", []),
+    ("CMCM Func Fails", "CMCM Functional Tests", ["p"]),
+    ("LPDDR Fails", "LPDDR Test", ["p"]),
+]
+# Final Bin counted as passing per mode (over all rows, whatever their mode)
+PASSING_FINAL_BINS = {"ECO": "HB1", "SPORT": "HB2"}
+
+
+def count_tracker_bins(slt_tracker_df):
+    """Count of every (tracker column, bin) pair the yield tables read, one value_counts per column."""
+    columns = {column for table in YIELD_SUMMARY_TABLES.values() for _, column, _ in table["rows"]}
+    return {
+        (column, bin_name): count
+        for column in columns
+        for bin_name, count in slt_tracker_df[column].value_counts().items()
+    }
+
+
+def render_yield_summary(bin_counts, table):
+    """Build one SLT Tracker yield table from count_tracker_bins output."""
+    layout = YIELD_SUMMARY_TABLES[table]
+    counts = [bin_counts.get((column, bin_name), 0) for _, column, bin_name in layout["rows"]]
+    total_terms = layout.get("total", [(column, bin_name) for _, column, bin_name in layout["rows"]])
+
+    # Calculate Grand Total as the sum of individual counts
+    grand_total = sum(bin_counts.get(term, 0) for term in total_terms)
+
+    summary = {
+        layout["label"]: [label for label, _, _ in layout["rows"]] + ["Grand Total"],
+        "Count of marking ID": counts + [grand_total],
+    }
+    return pd.DataFrame(summary)
+
+
+def create_yield_summary(slt_tracker_df, bin_counts=None):
+    if bin_counts is None:
+        bin_counts = count_tracker_bins(slt_tracker_df)
+    return render_yield_summary(bin_counts, "ECO")
+
+
+def create_yield_summary2(slt_tracker_df, bin_counts=None):
+    if bin_counts is None:
+        bin_counts = count_tracker_bins(slt_tracker_df)
+    return render_yield_summary(bin_counts, "SPORT")
+
+def create_yield_summary3(slt_tracker_df, bin_counts=None):
+    if bin_counts is None:
+        bin_counts = count_tracker_bins(slt_tracker_df)
+    return render_yield_summary(bin_counts, "Final")
+
+
+
+# Label column of the bank/non-bank failure summary of each power mode
+FAILURE_SUMMARY_LABELS = {"ECO": "failure_ECO", "SPORT": "Failure_SPORT"}
+
+
+def count_failure_categories(Merge):
+    """
+    Bank/non-bank failure category counts of every power mode in one pass.
+    Returns (categories, counts): the categories in table order and a frame
+    of count and Adjacent count indexed by (mode, category).
+    """
+    # Categories are the values of either column other than N/A, in order
+    # of first appearance (Bank Related Fails first), across all modes
+    bank = Merge["Bank Related Fails"]
+    non_bank = Merge["Non-Bank Related Fails"]
+    bank = bank.where(bank != "N/A")
+    non_bank = non_bank.where(non_bank != "N/A")
+    categories = pd.unique(pd.concat([bank.dropna(), non_bank.dropna()], ignore_index=True))
+
+    # A row counts once for each distinct category it names
+    non_bank = non_bank.where(non_bank != bank)
+    mode = Merge["Current Power Mode"]
+    adjacent = Merge["Adjacent"] == "Yes"
+    rows = pd.DataFrame({
+        "mode": pd.concat([mode, mode], ignore_index=True),
+        "category": pd.concat([bank, non_bank], ignore_index=True),
+        "adjacent": pd.concat([adjacent, adjacent], ignore_index=True),
+    }).dropna(subset=["category"])
+    counts = rows.groupby(["mode", "category"]).agg(count=("adjacent", "size"), adjacent=("adjacent", "sum"))
+    return list(categories), counts
+
+
+def render_failure_summaries(categories, counts):
+    """
+    Build the failure summary of each mode of FAILURE_SUMMARY_LABELS from
+    count_failure_categories output: the categories, then their Adjacent
+    counts, then a Grand Total row, with zero counts left out.
+    """
+    summaries = {}
+    for mode_name, label in FAILURE_SUMMARY_LABELS.items():
+        if mode_name in counts.index.get_level_values("mode"):
+            mode_counts = counts.xs(mode_name, level="mode").reindex(categories, fill_value=0)
+        else:
+            mode_counts = pd.DataFrame({"count": 0, "adjacent": 0}, index=categories)
+        conditions = dict(zip(categories, mode_counts["count"].to_numpy()))
+        conditions.update(zip([category + " (Adjacent)" for category in categories], mode_counts["adjacent"].to_numpy()))
+
+        # Convert dictionary to DataFrame
+        summary = pd.DataFrame(list(conditions.items()), columns=[label, "Count"])
+
+        # Filter out zero-count entries
+        summary = summary[summary["Count"] > 0].reset_index(drop=True)
+
+        # Compute grand total
+        grand_total = summary["Count"].sum()
+
+        # Append the Grand Total row
+        summary.loc[len(summary.index)] = ["Grand Total", grand_total]
+
+        summaries[mode_name] = summary
+    return summaries
+
+
+def count_bank_nonbank_failures_by_mode(Merge):
+    """Returns {mode: failure summary} for ECO and SPORT, from one counting pass."""
+    return render_failure_summaries(*count_failure_categories(Merge))
+
+
+def count_bank_nonbank_failures_ECO(Merge):
+    return count_bank_nonbank_failures_by_mode(Merge)["ECO"]
+
+
+def count_bank_nonbank_failures_SPORT(Merge):
+    return count_bank_nonbank_failures_by_mode(Merge)["SPORT"]
+
+
+def count_failure_modes(Merge):
+    """
+    Counts behind count_all_failures: one groupby over Current Power Mode of
+    the FAILURE_MODE_ROWS indicators, plus the PASSING_FINAL_BINS counts.
+    Returns {mode: {label: count}} for ECO and SPORT.
+    """
+    indicators = pd.DataFrame({
+        label: Merge[column].notna() & (Merge[column] != " ") & ~Merge[column].isin(excluded)
+        for label, column, excluded in FAILURE_MODE_ROWS
+    })
+    by_mode = indicators.groupby(Merge["Current Power Mode"]).sum()
+    final_bins = Merge["Final Bin"].value_counts()
+
+    counts = {}
+    for mode, passing_bin in PASSING_FINAL_BINS.items():
+        mode_counts = by_mode.loc[mode] if mode in by_mode.index else {}
+        counts[mode] = {label: mode_counts.get(label, 0) for label, _, _ in FAILURE_MODE_ROWS}
+        counts[mode]["Passing"] = final_bins.get(passing_bin, 0)
+    return counts
+
+
+def count_all_failures(Merge, failure_counts=None):
+    if failure_counts is None:
+        failure_counts = count_failure_modes(Merge)
+    eco = failure_counts["ECO"]
+    sport = failure_counts["SPORT"]
+    failure_modes = list(eco)
+
+    # Total counts
+    total_eco = sum(eco.values())
+    total_sport = sum(sport.values())
+
+    # Compute percentages
+    def calc_percentage(count, total):
+        return f"{(count / total * 100):.1f}%" if total > 0 else "0%"
+
+    summary = pd.DataFrame({
+        "Failure Modes": failure_modes,
+        "ECO": [eco[mode] for mode in failure_modes],
+        "SPORT": [sport[mode] for mode in failure_modes],
+        "ECO %": [calc_percentage(eco[mode], total_eco) for mode in failure_modes],
+        "SPORT %": [calc_percentage(sport[mode], total_sport) for mode in failure_modes]
+    })
+
+    # Append total row
+    summary.loc[len(summary.index)] = ["Total", total_eco, total_sport, "", ""]
+
+    return summary
+
+
+# First run of digits in a test result, e.g. '12F' -> 12; results without
+# one ("P", i.e. 100% passed, blanks and NaN) count as 0.
+NUMERIC_PATTERN = r"(\d+)"
+
+
+def extract_numeric(values):
+    """Vectorized numeric part of a column of test results, as int64."""
+    # A column holds few distinct results, so only those are parsed
+    codes, uniques = pd.factorize(values, use_na_sentinel=False)
+    numbers = pd.Series([str(value) for value in uniques], dtype=object).str.extract(NUMERIC_PATTERN, expand=False)
+    numbers = pd.to_numeric(numbers).fillna(0).astype("int64").to_numpy()
+    return pd.Series(numbers[codes], index=values.index)
+
+
+def pie_chart_data(df, test_columns):
+    """Sum of the numeric results per test column, leaving df untouched."""
+    return {column: extract_numeric(df[column]).sum() for column in test_columns if column in df.columns}
+
+
+# Test result columns summed into the ECO and SPORT pie charts
+PIE_CHART_COLUMNS = ["Noc PassThrough", "Noc Route", "Bank Cram Test", "CMCM Functional Tests", "UCM_ALL", "LPDDR Test", "Failed Banks"]
+
+
+def count_pie_sums(Merge):
+    """pie_chart_data of the PIE_CHART_COLUMNS, per mode: {mode: {column: sum}} for ECO and SPORT."""
+    modes = Merge["Current Power Mode"]
+    return {mode: pie_chart_data(Merge[modes == mode], PIE_CHART_COLUMNS) for mode in PASSING_FINAL_BINS}
+
+
+# Trend rollups of the Merge rows, per dimension: the label of its bucket column
+ROLLUP_DIMENSIONS = {"day": "Day", "lot": "Lot", "firmware": "SLT Test Version"}
+
+# Lot prefix of a Marking Id: the first group of this pattern, or its whole
+# match if it has no group; rows it doesn't match go to "N/A"
+DEFAULT_LOT_PATTERN = r"^[A-Za-z0-9]+"
+
+
+def rollup_buckets(Merge, lot_pattern=DEFAULT_LOT_PATTERN):
+    """Bucket of every Merge row per rollup dimension, "N/A" when it has none."""
+    def column(name):
+        return Merge[name] if name in Merge.columns else pd.Series(np.nan, index=Merge.index, dtype=object)
+
+    if not re.compile(lot_pattern).groups:
+        lot_pattern = f"({lot_pattern})"
+    timestamps = pd.to_datetime(column("Timestamp"), format=TIMESTAMP_FORMAT, errors="coerce")
+    return pd.DataFrame({
+        "day": timestamps.dt.strftime("%Y-%m-%d"),
+        "lot": column("Marking Id").astype(object).str.extract(lot_pattern, expand=True)[0],
+        "firmware": column("SLT Test Version"),
+    }, index=Merge.index).astype(object).fillna("N/A")
+
+
+def count_rollups(Merge, lot_pattern=DEFAULT_LOT_PATTERN):
+    """Rows per (dimension, bucket, power mode, Final Bin), as a long frame with a count column."""
+    buckets = rollup_buckets(Merge, lot_pattern)
+    mode = Merge["Current Power Mode"].astype(object).fillna("N/A")
+    final_bin = Merge["Final Bin"].astype(object).fillna("N/A")
+    frames = []
+    for dimension in ROLLUP_DIMENSIONS:
+        counts = pd.DataFrame({"bucket": buckets[dimension], "mode": mode, "final_bin": final_bin})
+        counts = counts.value_counts(sort=False).reset_index(name="count")
+        counts.insert(0, "dimension", dimension)
+        frames.append(counts)
+    return pd.concat(frames, ignore_index=True)
+
+
+def render_rollup(counts, dimension):
+    """
+    One rollup table from count_rollups rows of a dimension: a row per
+    bucket and power mode, its Final Bin counts and their total in Rows.
+    """
+    table = counts.pivot_table(
+        index=["bucket", "mode"], columns="final_bin", values="count", aggfunc="sum", fill_value=0
+    )
+    table.columns.name = None
+    table.insert(0, "Rows", table.sum(axis=1))
+    table = table.reset_index().rename(columns={"bucket": ROLLUP_DIMENSIONS[dimension], "mode": "Current Power Mode"})
+    return table.astype({column: "int64" for column in table.columns[2:]})
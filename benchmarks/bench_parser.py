@@ -0,0 +1,133 @@
+import os
+import gc
+import ast
+import random
+import time
+import argparse
+import tempfile
+import tracemalloc
+
+from app.parser_script import TEST_COLUMNS, parse_log_file, parse_log_file2, parse_log_file3, parse_log_all, parse_many
+from app.literal_decoder import decode_literal
+from benchmarks.synthetic_logs import write_logs
+
+# Parser throughput and peak memory over a synthetic corpus.
+#   python -m benchmarks.bench_parser --count 200 --size-kb 256
+# Timings are the best of --repeat runs; peak memory is measured in a
+# separate tracemalloc run, since tracing slows the parse down.
+
+PARSERS = {
+    "parse_log_file": parse_log_file,
+    "parse_log_file2": parse_log_file2,
+    "parse_log_file3": parse_log_file3,
+    "parse_log_all": parse_log_all,
+    "parse_log_all (streaming)": lambda path: parse_log_all(path, streaming=True),
+    "parse_log_all (mmap)": lambda path: parse_log_all(path, use_mmap=True),
+}
+
+
+def _best_time(run, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        run()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def _peak_memory(run):
+    gc.collect()
+    tracemalloc.start()
+    try:
+        run()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def _report(name, seconds, total_bytes, files, peak):
+    print(
+        f"{name:<28} {seconds:8.3f}s {total_bytes / seconds / 2**20:9.1f} MB/s "
+        f"{files / seconds:9.1f} files/s {peak / 2**20:9.1f} MiB peak"
+    )
+
+
+def bench_parsers(paths, repeat, workers):
+    total_bytes = sum(os.path.getsize(path) for path in paths)
+    print(f"{len(paths)} logs, {total_bytes / 2**20:.1f} MiB")
+    for name, parse in PARSERS.items():
+        run = lambda: [parse(path) for path in paths]
+        _report(name, _best_time(run, repeat), total_bytes, len(paths), _peak_memory(run))
+
+    # Pool start-up is part of what an upload pays, so it is timed too
+    run = lambda: parse_many(paths, workers=workers)
+    _report(f"parse_many (workers={workers})", _best_time(run, repeat), total_bytes, len(paths), _peak_memory(run))
+
+
+# Literal decoders compared by bench_literals; eval is what the parser used before
+LITERAL_DECODERS = {
+    "eval": eval,
+    "ast.literal_eval": ast.literal_eval,
+    "decode_literal": decode_literal,
+}
+
+# Pairs in the large "Bank Coordinates with failures:" dump of bench_literals,
+# about what a chip with every bank of a bad column failing prints
+COORDINATE_DUMP_PAIRS = 20000
+
+
+def bench_literals(paths, repeat):
+    """
+    Time decode_literal against eval and ast.literal_eval on the literal
+    shapes the logs hold: the Failures by Test dicts and Bank Coordinates
+    lists of the corpus, and one large coordinate dump.
+    """
+    shapes = {"Failures by Test": [], "Bank Coordinates": []}
+    for path in paths:
+        with open(path, encoding="utf-8") as log_file:
+            for line in log_file:
+                if line.startswith("Failures by Test:"):
+                    shapes["Failures by Test"].append(line.split(":", 1)[1].strip())
+                elif line.startswith("Bank Coordinates with failures:"):
+                    shapes["Bank Coordinates"].append(line.split(":", 1)[1].strip())
+    rng = random.Random(0)
+    shapes["Coordinate dump"] = [repr([[rng.randrange(64), rng.randrange(512)] for _ in range(COORDINATE_DUMP_PAIRS)])]
+
+    for shape, literals in shapes.items():
+        if not literals:
+            continue
+        expected = [eval(literal) for literal in literals]
+        baseline = None
+        for name, decode in LITERAL_DECODERS.items():
+            assert [decode(literal) for literal in literals] == expected, f"{name} disagrees with eval on {shape}"
+            seconds = _best_time(lambda: [decode(literal) for literal in literals], repeat)
+            baseline = baseline or seconds
+            print(
+                f"{shape + ': ' + name:<40} {seconds:8.3f}s {len(literals) / seconds:11.1f} literals/s "
+                f"{baseline / seconds:6.1f}x eval"
+            )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the SLT log parsers.")
+    parser.add_argument("--logs", help="directory of existing logs; synthetic logs are generated if omitted")
+    parser.add_argument("--count", type=int, default=100)
+    parser.add_argument("--size-kb", type=int, default=64)
+    parser.add_argument("--tests", type=int, default=len(TEST_COLUMNS))
+    parser.add_argument("--failure-density", type=float, default=0.1)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        if args.logs:
+            paths = sorted(entry.path for entry in os.scandir(args.logs) if entry.is_file())
+        else:
+            paths = write_logs(temp_dir, args.count, args.size_kb * 1024, args.tests, args.failure_density)
+        bench_parsers(paths, args.repeat, args.workers)
+        bench_literals(paths, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+import os
+import random
+import argparse
+
+from app.parser_script import TEST_COLUMNS
+
+# Writes SLT logs shaped like the ones the tester produces, for the parser
+# benchmarks. Every section the parsers read is present; the rest of the
+# file is debug chatter padded out to the requested size.
+
+POWER_MODES = ["ECO", "SPORT"]
+CHIP_VERSIONS = ["A0", "B0"]
+FREQUENCIES = [800, 1000, 1200]
+VDD_RAILS = ["VDDP", "VDDM", "VDDCORE", "VDDHF", "VDDIO", "VDDWL"]
+REMARK_LINES = ["chip passing", "BAD CHIP. Below Test failed", "More than 2 bad columns. Bad CHIP"]
+
+
+def _bank_set(rng, count, banks=64):
+    return "{" + ", ".join(str(bank) for bank in sorted(rng.sample(range(banks), count))) + "}"
+
+
+def generate_log(rng, index, size_bytes=64 * 1024, test_count=len(TEST_COLUMNS), failure_density=0.1):
+    """
+    Return the text of one synthetic log of roughly size_bytes.
+    test_count of the known ATE_CMD_* tests are run; each fails with
+    probability failure_density.
+    """
+    mode = POWER_MODES[index % len(POWER_MODES)]
+    marking_id = f"MK{index:06d}-LOT{index % 17:02d}"
+    header = [
+        f"Marking ID: {marking_id}",
+        f"[boot] curr_time=2024-{1 + index % 12:02d}-{1 + index % 28:02d}_10-{index % 60:02d}-{index % 59:02d} chip_id=chip.{index}",
+        f"Chip version: {rng.choice(CHIP_VERSIONS)}",
+        f"Diagnostic fw version: v1.{index % 4}.{index % 7}",
+        f"ctUtilsPower : INFO : Current Frequency: {rng.choice(FREQUENCIES)}",
+        f"ctUtilsPower : INFO : Current Power Mode: {mode}",
+    ]
+    header += [f"{rail}: {rng.randint(500, 900)}" for rail in VDD_RAILS]
+
+    tests = TEST_COLUMNS[:test_count]
+    test_lines = []
+    failures = {}
+    for test in tests:
+        failed = rng.random() < failure_density
+        test_lines.append(f"Test Name: {test} : {'FAIL' if failed else 'PASS'}")
+        failures[test] = sorted(rng.sample(range(64), rng.randint(1, 4))) if failed else set()
+    failed_banks = sum(1 for banks in failures.values() if banks)
+
+    summary = [
+        "Failures by Test: " + repr(failures),
+        "Banks Failed: " + _bank_set(rng, max(failed_banks, 1)),
+        "Columns with failures: " + _bank_set(rng, rng.randint(1, 4), banks=20),
+        "Banks Repairable after CRAM test: " + _bank_set(rng, 2),
+        "Banks Failed after CRAM Test:  " + _bank_set(rng, rng.randint(1, 6)),
+        "Repair Data Applied: {1: [2, 3], 4: [5, 6]}",
+        f"Total Numbers of Banks Failed: {failed_banks}",
+        "Bank Coordinates with failures: "
+        + repr([[rng.randint(0, 7), rng.randint(0, 7)] for _ in range(max(failed_banks, 1))]),
+        REMARK_LINES[0] if not failed_banks else rng.choice(REMARK_LINES[1:]),
+    ]
+
+    fixed = "\n".join(header + test_lines + summary)
+    debug = []
+    padding = len(fixed)
+    line_number = 0
+    while padding < size_bytes:
+        line = f"[{line_number:08d}] dbg : bank={rng.randrange(64)} addr=0x{rng.getrandbits(32):08x} val=0x{rng.getrandbits(32):08x}"
+        debug.append(line)
+        padding += len(line) + 1
+        line_number += 1
+
+    # Debug chatter sits between the test results and the summary, as on the tester
+    split = len(debug) // 2
+    lines = header + debug[:split] + test_lines + debug[split:] + summary
+    return "\n".join(lines) + "\n"
+
+
+def write_logs(directory, count, size_bytes=64 * 1024, test_count=len(TEST_COLUMNS), failure_density=0.1, seed=0):
+    """Write count synthetic logs into directory and return their paths."""
+    os.makedirs(directory, exist_ok=True)
+    rng = random.Random(seed)
+    paths = []
+    for index in range(count):
+        mode = POWER_MODES[index % len(POWER_MODES)]
+        path = os.path.join(directory, f"slt_{index:06d}_{mode}.log")
+        with open(path, "w", encoding="utf-8") as log_file:
+            log_file.write(generate_log(rng, index, size_bytes, test_count, failure_density))
+        paths.append(path)
+    return paths
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Write synthetic SLT logs.")
+    parser.add_argument("directory")
+    parser.add_argument("--count", type=int, default=100)
+    parser.add_argument("--size-kb", type=int, default=64, help="approximate size of each log")
+    parser.add_argument("--tests", type=int, default=len(TEST_COLUMNS), help="number of ATE_CMD_* tests per log")
+    parser.add_argument("--failure-density", type=float, default=0.1, help="probability that a test fails")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    paths = write_logs(args.directory, args.count, args.size_kb * 1024, args.tests, args.failure_density, args.seed)
+    print(f"Wrote {len(paths)} logs to {args.directory}")
+
+
+if __name__ == "__main__":
+    main()
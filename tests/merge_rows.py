@@ -0,0 +1,38 @@
+import numpy as np
+import pandas as pd
+
+TEST_GROUPS = ["Noc PassThrough", "Noc Route", "Bank Cram Test", "CMCM Functional Tests", "UCM_ALL", "LPDDR Test", "Failed Banks"]
+
+
+def make_merge_rows(n, chips=None, seed=0):
+    """
+    n synthetic Merge rows over chips marking IDs, with the value mix the
+    Merge sheet holds: repeated chips and modes, odd bins and missing values.
+    """
+    rng = np.random.default_rng(seed)
+    chips = chips or max(n // 3, 1)
+
+    def choice(values, p=None):
+        return rng.choice(np.array(values, dtype=object), n, p=p)
+
+    df = pd.DataFrame({
+        "File Name": [f"run{position}.log" for position in range(n)],
+        "Timestamp": choice(
+            [f"2024-{1 + day % 12:02d}-{1 + day % 28:02d}_10-{day % 60:02d}-00" for day in range(40)] + ["N/A"]
+        ),
+        "Marking Id": choice([f"LOT{chip % 7:02d}X{chip:05d}" for chip in range(chips)]),
+        "Chip Version": choice(["A0", "B0"]),
+        "SLT Test Version": choice(["v1.0.1", "v1.2.0", "v2.0.0"]),
+        "Current Frequency": choice(["800", "1000", "1200"]),
+        "Current Power Mode": choice(["ECO", "SPORT", "N/A"], p=[0.45, 0.45, 0.1]),
+        "Adjacent": choice(["YES", "NO", "Yes"]),
+        "Total Banks Failed": choice([str(banks) for banks in range(8)]),
+        "Final Bin": choice(["Failed(ECO)", "HB1(ECO)", "Failed(SPORT)", "HB1(SPORT)", "HB2", "N/A"]),
+        "Bank Related Fails": choice(["N/A", "Bank-rel(Failed Banks)", "Bank-rel(Failed Banks, Bank Cram Test)"]),
+        "Non-Bank Related Fails": choice(["N/A", "Non-Bank-rel(UCM)", "Non-Bank-rel(LPDDR, CMCM)"]),
+    })
+    for group in TEST_GROUPS:
+        df[group] = choice(["P", "1f", "2f", "12f", "N/A"])
+    df["Mark Power"] = df["Current Power Mode"] + df["Marking Id"]  # As merge_record builds it
+    df.loc[rng.random(n) < 0.03, "Adjacent"] = np.nan
+    return df
@@ -0,0 +1,37 @@
+import itertools
+
+import pandas as pd
+import pytest
+
+from app.history_store import HistoryStore
+from app.parser_script import evaluate_final_bin, final_bin
+
+ROWS = [
+    {"Total Banks Failed": str(banks), "Current Power Mode": mode, "Adjacent": adjacent}
+    for banks, mode, adjacent in itertools.product(
+        range(8), ["ECO", "SPORT", " eco ", "N/A", ""], ["YES", "NO", "Yes", None]
+    )
+]
+
+
+def test_evaluate_final_bin_matches_final_bin():
+    df = pd.DataFrame(ROWS)
+    assert evaluate_final_bin(df).tolist() == [final_bin(row) for row in ROWS]
+
+
+def test_evaluate_final_bin_rejects_missing_bank_counts():
+    with pytest.raises(ValueError):
+        evaluate_final_bin(pd.DataFrame({"Total Banks Failed": ["1", None], "Current Power Mode": ["ECO", "ECO"]}))
+
+
+def test_rebin_rewrites_stale_bins(tmp_path):
+    history = HistoryStore(str(tmp_path / "history.sqlite3"))
+    df = pd.DataFrame(ROWS)
+    df["Mark Power"] = [f"MK{position}" for position in range(len(df))]
+    df["Final Bin"] = "HB1(ECO)"  # As binned by some earlier rules
+    history.append("Merge", df)
+
+    expected = [final_bin(row) for row in ROWS]
+    assert history.rebin("Merge", chunk_rows=7) == sum(bin != "HB1(ECO)" for bin in expected)
+    assert history.read("Merge")["Final Bin"].tolist() == expected
+    assert history.rebin("Merge") == 0
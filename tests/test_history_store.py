@@ -0,0 +1,177 @@
+import sqlite3
+
+import pandas as pd
+import pytest
+
+from merge_rows import make_merge_rows
+
+from app.history_store import HistoryStore
+
+
+@pytest.fixture
+def history(tmp_path):
+    return HistoryStore(str(tmp_path / "history.sqlite3"))
+
+
+def unique_merge_rows(n, seed=0):
+    merge_df = make_merge_rows(n, seed=seed)
+    merge_df["Mark Power"] = [f"MP{position}" for position in range(n)]  # No duplicates to drop
+    return merge_df
+
+
+def test_rows_read_back_as_parsed(history):
+    merge_df = unique_merge_rows(120)
+    merge_df.loc[3, "Total Banks Failed"] = "N/A"  # Kept as text in an INTEGER column
+    stored, replaced, preceding = history.append("Merge", merge_df)
+    assert (len(stored), len(replaced), preceding) == (120, 0, 0)
+    pd.testing.assert_frame_equal(history.read("Merge").astype(object), merge_df.astype(object))
+    assert history.columns("Merge") == list(merge_df.columns)
+
+    typed = history.read("Merge", typed=True)
+    assert typed["Total Banks Failed"].dtype == "Int64"
+    assert typed["Total Banks Failed"].isna().sum() == 1
+
+
+def test_integer_columns_are_stored_as_integers(history, tmp_path):
+    history.append("Merge", unique_merge_rows(10))
+    db = sqlite3.connect(str(tmp_path / "history.sqlite3"))
+    try:
+        types = {row[0] for row in db.execute('SELECT typeof("Current Frequency") FROM merge')}
+    finally:
+        db.close()
+    assert types == {"integer"}
+
+
+def test_new_columns_are_added(history):
+    history.append("Format 1", pd.DataFrame({"File Name": ["a.log"], "VDDP": ["700"]}))
+    history.append("Format 1", pd.DataFrame({"File Name": ["b.log"], "Remark": ["passing"]}))
+    assert history.columns("Format 1") == ["File Name", "VDDP", "Remark"]
+    assert history.read("Format 1").fillna("").values.tolist() == [["a.log", "700", ""], ["b.log", "", "passing"]]
+
+
+def test_seed_runs_once(history):
+    assert not history.seeded("Format 2")
+    history.seed("Format 2", pd.DataFrame({"File Name": ["a.log"]}))
+    history.seed("Format 2", pd.DataFrame({"File Name": ["b.log"]}))
+    assert history.seeded("Format 2")
+    assert history.read("Format 2")["File Name"].tolist() == ["a.log"]
+
+
+def test_unknown_history_and_columns_are_rejected(history):
+    with pytest.raises(ValueError):
+        history.read("Format 3")
+    history.append("Merge", unique_merge_rows(5))
+    with pytest.raises(ValueError):
+        history.query("Merge", equals={"Colour": ["red"]})
+
+
+def test_empty_history(history):
+    assert history.count("Merge") == 0
+    assert history.read("Merge").empty
+    assert list(history.query_chunks("Merge")) == []
+
+
+def test_query_filters_match_pandas(history):
+    merge_df = unique_merge_rows(300)
+    history.append("Merge", merge_df)
+    equals = {"Chip Version": ["B0"], "Current Power Mode": ["ECO", "SPORT"]}
+    expected = merge_df[merge_df["Chip Version"].eq("B0") & merge_df["Current Power Mode"].isin(["ECO", "SPORT"])]
+
+    assert history.count("Merge", equals) == len(expected)
+    assert history.query("Merge", equals)["File Name"].tolist() == expected["File Name"].tolist()
+    chunks = list(history.query_chunks("Merge", equals, chunk_rows=40))
+    assert all(len(chunk) <= 40 for chunk in chunks)
+    assert pd.concat(chunks, ignore_index=True)["File Name"].tolist() == expected["File Name"].tolist()
+    assert history.count("Merge", ranges={"Current Frequency": (1000, None)}) == (
+        merge_df["Current Frequency"].astype(int) >= 1000
+    ).sum()
+
+
+def test_ranges_skip_values_that_are_not_timestamps_or_integers(history):
+    merge_df = unique_merge_rows(200)
+    merge_df.loc[::10, "Total Banks Failed"] = "N/A"
+    history.append("Merge", merge_df)
+    dated = merge_df[merge_df["Timestamp"] != "N/A"]
+    counted = merge_df[merge_df["Total Banks Failed"] != "N/A"]
+    assert (merge_df["Timestamp"] == "N/A").any()
+
+    assert history.count("Merge", ranges={"Timestamp": ("2024-06-01_00-00-00", None)}) == (
+        dated["Timestamp"] >= "2024-06-01_00-00-00"
+    ).sum()
+    assert history.count("Merge", ranges={"Timestamp": (None, "2024-06-01_00-00-00")}) == (
+        dated["Timestamp"] < "2024-06-01_00-00-00"
+    ).sum()
+    assert history.count("Merge", ranges={"Total Banks Failed": (3, None)}) == (
+        counted["Total Banks Failed"].astype(int) >= 3
+    ).sum()
+    assert history.count("Merge", ranges={"Timestamp": (None, None)}) == len(merge_df)
+
+
+def expected_winners(merge_df, dedup_policy):
+    """Reference for the dedup policies: the File Names kept, in ingest order."""
+    frame = merge_df.reset_index(drop=True).assign(position=lambda df: range(len(df)))
+    if dedup_policy == "latest":
+        frame["time"] = pd.to_datetime(frame["Timestamp"], format="%Y-%m-%d_%H-%M-%S", errors="coerce")
+        frame = frame.sort_values(["time", "position"], ascending=[False, True], na_position="last")
+    return frame.drop_duplicates("Mark Power").sort_values("position")["File Name"].tolist()
+
+
+@pytest.mark.parametrize("dedup_policy", ["first", "latest"])
+def test_dedup_policies_across_batches(tmp_path, dedup_policy):
+    history = HistoryStore(str(tmp_path / "history.sqlite3"), dedup_policy=dedup_policy)
+    merge_df = make_merge_rows(500, chips=60)
+    cuts = [0, 90, 91, 300, 500]
+    for start, end in zip(cuts, cuts[1:]):
+        stored, replaced, _ = history.append("Merge", merge_df.iloc[start:end])
+        if dedup_policy == "first":
+            assert replaced.empty
+
+    kept = history.read("Merge")
+    assert kept["Mark Power"].is_unique
+    assert sorted(kept["File Name"]) == sorted(expected_winners(merge_df, dedup_policy))
+
+
+def test_latest_replaces_only_older_rows(tmp_path):
+    history = HistoryStore(str(tmp_path / "history.sqlite3"), dedup_policy="latest")
+    row = {"Mark Power": "ECOMK1", "File Name": "a.log", "Timestamp": "2024-03-02_10-00-00"}
+    history.append("Merge", pd.DataFrame([row]))
+
+    stored, replaced, _ = history.append("Merge", pd.DataFrame([{**row, "File Name": "b.log", "Timestamp": "N/A"}]))
+    assert (len(stored), len(replaced)) == (0, 0)  # Undated rows never win
+    stored, replaced, _ = history.append("Merge", pd.DataFrame([{**row, "File Name": "c.log"}]))
+    assert (len(stored), len(replaced)) == (0, 0)  # Ties go to the stored row
+    stored, replaced, _ = history.append(
+        "Merge", pd.DataFrame([{**row, "File Name": "d.log", "Timestamp": "2024-03-02_11-00-00"}])
+    )
+    assert (len(stored), replaced["File Name"].tolist()) == (1, ["a.log"])
+    assert history.read("Merge")["File Name"].tolist() == ["d.log"]
+
+
+def test_seed_drops_duplicates(history):
+    merge_df = make_merge_rows(100, chips=10)
+    dropped = history.seed("Merge", merge_df)
+    assert dropped == len(merge_df) - merge_df["Mark Power"].nunique()
+    assert history.read("Merge")["File Name"].tolist() == expected_winners(merge_df, "first")
+
+
+def test_duplicates_stored_before_the_unique_index_are_dropped(tmp_path):
+    path = str(tmp_path / "history.sqlite3")
+    db = sqlite3.connect(path)
+    with db:
+        db.execute('CREATE TABLE merge ("File Name" TEXT, "Timestamp" TEXT, "Mark Power" TEXT)')
+        db.executemany("INSERT INTO merge VALUES (?, ?, ?)", [
+            ("a.log", "2024-01-01_00-00-00", "ECOMK1"),
+            ("b.log", "2024-01-02_00-00-00", "ECOMK1"),
+            ("c.log", "2024-01-01_00-00-00", "SPORTMK1"),
+        ])
+    db.close()
+
+    history = HistoryStore(path, dedup_policy="latest")
+    assert history.read("Merge")["File Name"].tolist() == ["b.log", "c.log"]
+    stored, _, _ = history.append("Merge", pd.DataFrame([{"File Name": "d.log", "Mark Power": "SPORTMK1"}]))
+    assert stored.empty
+
+
+def test_unknown_dedup_policy_is_rejected(tmp_path):
+    with pytest.raises(ValueError):
+        HistoryStore(str(tmp_path / "history.sqlite3"), dedup_policy="last")
@@ -0,0 +1,47 @@
+import time
+
+import pytest
+
+from app.literal_decoder import decode_literal
+
+LITERALS = [
+    "{}",
+    "{'ATE_CMD_UCM_ALL': [3, 7], 'ATE_CMD_DDR_ACK_HO': set()}",
+    "{'A': {5, 1, 3}, 'B': {9, 2}, 'C': {40, 8, 16, 2, 33}}",
+    "{'A': (1, 2), 'B': (3,), 'C': (3), 'D': ()}",
+    "{'A': {}, 'B': { }, 'C': set()}",
+    "{'A': -4, \"B\": [ -1 , 0 ,], 'C': { 7 , }}",
+    "{  'A' :  [ 1 ,  2 ]  ,  }",
+    "[[1, 2], [3, 4]]",
+    "[[0, 31], [], [7]]",
+    "[]",
+]
+
+
+@pytest.mark.parametrize("text", LITERALS)
+def test_decode_matches_eval(text):
+    decoded = decode_literal(text)
+    assert decoded == eval(text)
+    # Format 2 "Bank Ids" is str() of each value, so set order has to match too
+    assert str(decoded) == str(eval(text))
+
+
+def test_unknown_shapes_fall_back_to_literal_eval():
+    assert decode_literal("{'A': 'text'}") == {"A": "text"}
+    with pytest.raises(ValueError):
+        decode_literal("{'A': __import__('os')}")
+
+
+@pytest.mark.parametrize("text", [
+    "{'A': [1," + " " * (1 << 20) + "2]}",
+    "{'A': [1, 2]" + " " * (1 << 20) + "}",
+    "{'A': [1" + " " * (1 << 20) + ", 2]" + " " * (1 << 20) + "}",
+    "{'A': [1, 2" + " " * (1 << 20) + "x]}",
+])
+def test_long_whitespace_runs_decode_in_linear_time(text):
+    start = time.perf_counter()
+    try:
+        decode_literal(text)
+    except SyntaxError:
+        pass
+    assert time.perf_counter() - start < 2
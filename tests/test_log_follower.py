@@ -0,0 +1,25 @@
+import random
+
+from benchmarks.synthetic_logs import generate_log
+
+from app.log_follower import LogFollower
+from app.parser_script import parse_log_all_records
+
+
+def test_poll_follows_a_growing_log(tmp_path):
+    text = generate_log(random.Random(0), 3, size_bytes=16 * 1024)
+    if not text.endswith("\n"):
+        text += "\n"
+    log_file_path = tmp_path / "run_SPORT.log"
+    follower = LogFollower(str(tmp_path / "checkpoints"))
+
+    cut = text.index("Total Numbers of Banks Failed")
+    with open(log_file_path, "w") as log_file:
+        log_file.write(text[:cut])
+    format1_record, _, merge_record = follower.poll(str(log_file_path))
+    assert format1_record["Final Bin"] == "N/A"  # Still in progress
+    assert follower.poll(str(log_file_path)) is None  # Nothing appended since
+
+    with open(log_file_path, "a") as log_file:
+        log_file.write(text[cut:])
+    assert follower.poll(str(log_file_path)) == parse_log_all_records(str(log_file_path))
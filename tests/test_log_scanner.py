@@ -0,0 +1,74 @@
+import io
+import random
+
+import pytest
+
+from benchmarks.synthetic_logs import generate_log
+
+from app.parser_script import (
+    COLUMNS, MERGE_COLUMNS, REMARK_MARKERS, LogScanner, parse_log_all_records, read_last_line_containing
+)
+
+SUMMARIES = [
+    [],
+    ["chip passing"],
+    ["BAD CHIP. Below Test failed", "Failures by Test: {'ATE_CMD_UCM_ALL': [3]}", "chip passing"],
+    ["More than 2 bad columns. Bad CHIP", "Failures by Test: {'A': [1]}", "Failures by Test: {'B': [2, 5]}"],
+]
+
+
+def log_text(summary, debug_lines=2000):
+    text = generate_log(random.Random(0), 1, size_bytes=4 * 1024)
+    return "\n".join([text.rstrip("\n")] + [f"debug {line}" for line in range(debug_lines)] + summary) + "\n"
+
+
+@pytest.mark.parametrize("summary", SUMMARIES)
+def test_search_tail_matches_a_full_feed(summary):
+    text = log_text(summary)
+    full = LogScanner(COLUMNS)
+    full.feed(text)
+
+    tail = LogScanner(COLUMNS)
+    for line in io.StringIO(text):
+        tail.feed(line)
+        if tail.complete:
+            break
+    assert tail.complete
+    tail.search_tail(io.BytesIO(text.encode()), block_size=64)
+
+    assert tail.failures_line == full.failures_line
+    assert tail.finish()["Remark"] == full.finish()["Remark"]
+    assert set(REMARK_MARKERS) >= tail.remarks_seen
+
+
+@pytest.mark.parametrize("summary", SUMMARIES)
+def test_streaming_stops_at_complete_with_the_same_records(tmp_path, summary):
+    log_file_path = tmp_path / "run_ECO.log"
+    log_file_path.write_text(log_text(summary, debug_lines=150000))
+    assert parse_log_all_records(str(log_file_path), streaming=True) == parse_log_all_records(str(log_file_path))
+
+
+def test_read_last_line_containing_across_blocks():
+    text = b"first Failures by Test: {1}\n" + b"x" * 300 + b"\nlast Failures by Test: {2}\n" + b"y" * 300
+    assert read_last_line_containing(io.BytesIO(text), b"Failures by Test:", block_size=7) == "last Failures by Test: {2}"
+    assert read_last_line_containing(io.BytesIO(text), b"missing", block_size=7) is None
+
+
+def test_a_log_that_skips_tests_completes_at_failures_by_test():
+    text = generate_log(random.Random(0), 1, size_bytes=4 * 1024, test_count=10)
+    scanner = LogScanner(MERGE_COLUMNS)
+    for line in io.StringIO(text):
+        scanner.feed(line)
+        if scanner.complete:
+            break
+    assert scanner.complete
+    assert scanner.failures_line is not None
+
+
+def test_search_tail_only_reads_past_the_completed_offset():
+    head = b"BAD CHIP. Below Test failed\nFailures by Test: {'A': [1]}\n"
+    text = head + b"debug\n" * 100 + b"chip passing\n"
+    scanner = LogScanner(COLUMNS)
+    scanner.search_tail(io.BytesIO(text), start=len(head), block_size=16)
+    assert scanner.remarks_seen == {"passing"}  # The head was left to the forward scan
+    assert scanner.failures_line is None
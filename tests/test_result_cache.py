@@ -0,0 +1,63 @@
+import pytest
+
+from app.result_cache import ResultCache
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return ResultCache(str(tmp_path / "result_cache.sqlite3"))
+
+
+def test_key_for_keeps_input_boundaries():
+    assert ResultCache.key_for("charts", b"ab", b"c") != ResultCache.key_for("charts", b"a", b"bc")
+    assert ResultCache.key_for("charts", b"ab") == ResultCache.key_for("charts", b"ab")
+    assert ResultCache.key_for("charts", b"ab") != ResultCache.key_for("tables", b"ab")
+
+
+def test_entries_are_served_for_their_dataset_version_only(cache):
+    cache.put("merge_results", {"rows": 3}, "1.3")
+    assert cache.get("merge_results", "1.3") == {"rows": 3}
+    assert cache.get("merge_results", "1.4") is None
+    assert cache.get("merge_results") is None
+
+
+def test_get_or_compute_caches_none(cache):
+    calls = []
+
+    def compute():
+        calls.append(1)
+        return None
+
+    assert cache.get_or_compute("result", compute) is None
+    assert cache.get_or_compute("result", compute) is None
+    assert len(calls) == 1
+
+
+def test_get_or_compute_current_skips_results_overlapping_a_change(cache):
+    version = ["1.3"]
+    current_version = lambda: version[0]
+
+    def compute_during_ingest():
+        version[0] = "1.4"
+        return "old"
+
+    # The dataset moved on while computing: returned, but not cached
+    assert cache.get_or_compute_current("merge_results", compute_during_ingest, current_version) == "old"
+    assert cache.get("merge_results", "1.3") is None
+    assert cache.get_or_compute_current("merge_results", lambda: "new", current_version) == "new"
+    assert cache.get_or_compute_current("merge_results", lambda: pytest.fail("computed"), current_version) == "new"
+
+
+def test_get_or_compute_current_without_a_version_always_computes(cache):
+    assert cache.get_or_compute_current("merge_results", lambda: 1, lambda: None) == 1
+    assert cache.get_or_compute_current("merge_results", lambda: 2, lambda: None) == 2
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path):
+    cache = ResultCache(str(tmp_path / "result_cache.sqlite3"), max_bytes=2500)
+    for key in ["a", "b", "c"]:
+        cache.put(key, b"x" * 1000)
+        cache.get("a")  # Keep "a" in use
+    assert cache.get("a") == b"x" * 1000
+    assert cache.get("b") is None
+    assert cache.get("c") == b"x" * 1000
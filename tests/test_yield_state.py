@@ -0,0 +1,165 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from merge_rows import make_merge_rows
+
+from app.history_store import HistoryStore
+from app.sqlite_db import transaction
+from app.yield_state import StaleYieldState, YieldState
+from app.yield_summary import (
+    ROLLUP_DIMENSIONS, count_all_failures, count_failure_categories, count_pie_sums, count_rollups, create_slt_tracker,
+    create_yield_summary, create_yield_summary2, create_yield_summary3, render_failure_summaries, render_rollup
+)
+
+
+def assert_matches_history(state, merge_df):
+    """Every table read from state equals its full recomputation over merge_df."""
+    slt_tracker_df = create_slt_tracker(merge_df.reset_index(drop=True))
+    pd.testing.assert_frame_equal(state.slt_tracker(), slt_tracker_df)
+    for create in [create_yield_summary, create_yield_summary2, create_yield_summary3]:
+        pd.testing.assert_frame_equal(create(state.slt_tracker(), state.bin_counts()), create(slt_tracker_df))
+    pd.testing.assert_frame_equal(count_all_failures(None, state.failure_counts()), count_all_failures(merge_df))
+    expected = render_failure_summaries(*count_failure_categories(merge_df))
+    for mode, table in render_failure_summaries(*state.failure_categories()).items():
+        pd.testing.assert_frame_equal(table, expected[mode])
+    expected = count_pie_sums(merge_df)
+    for mode, sums in state.pie_sums().items():
+        assert sums == {test: expected[mode].get(test, 0) for test in sums}
+    counts = count_rollups(merge_df)
+    for dimension in ROLLUP_DIMENSIONS:
+        expected = render_rollup(counts[counts["dimension"] == dimension], dimension)
+        pd.testing.assert_frame_equal(state.rollups(dimension), expected)
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_incremental_apply_matches_a_full_rebuild(tmp_path, seed):
+    merge_df = make_merge_rows(600, seed=seed)
+    cuts = sorted(np.random.default_rng(seed).choice(range(1, len(merge_df)), 5, replace=False).tolist())
+    state = YieldState(str(tmp_path / "yield_state.sqlite3"))
+    state.rebuild(merge_df.iloc[:0])
+
+    preceding = 0
+    for start, end in zip([0] + cuts, cuts + [len(merge_df)]):
+        batch = merge_df.iloc[start:end]
+        assert state.apply(batch, batch.iloc[:0], preceding, lambda: pytest.fail("rebuilt"))
+        preceding += len(batch)
+
+    assert_matches_history(state, merge_df)
+    rebuilt = YieldState(str(tmp_path / "rebuilt.sqlite3"))
+    rebuilt.rebuild([merge_df.iloc[:250], merge_df.iloc[250:]])
+    assert_matches_history(rebuilt, merge_df)
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_replaced_rows_are_taken_out_of_the_counters(tmp_path, seed):
+    history = HistoryStore(str(tmp_path / "history.sqlite3"), dedup_policy="latest")
+    state = YieldState(str(tmp_path / "yield_state.sqlite3"))
+    state.rebuild([])
+    merge_df = make_merge_rows(600, chips=50, seed=seed)
+    cuts = [0] + sorted(np.random.default_rng(seed).choice(range(1, len(merge_df)), 7, replace=False).tolist())
+
+    replaced_rows = 0
+    for start, end in zip(cuts, cuts[1:] + [len(merge_df)]):
+        stored, replaced, preceding = history.append("Merge", merge_df.iloc[start:end])
+        assert state.apply(stored, replaced, preceding, lambda: pytest.fail("rebuilt"))
+        replaced_rows += len(replaced)
+
+    assert replaced_rows
+    assert state.applied_rows() == history.count("Merge")
+    assert_matches_history(state, history.read("Merge"))
+
+
+def test_a_replaced_first_row_moves_its_chip_and_category(tmp_path):
+    history = HistoryStore(str(tmp_path / "history.sqlite3"), dedup_policy="latest")
+    state = YieldState(str(tmp_path / "yield_state.sqlite3"))
+    state.rebuild([])
+    merge_df = make_merge_rows(4, seed=1)
+    merge_df["Marking Id"] = ["MK1", "MK2", "MK1", "MK1"]
+    merge_df["Current Power Mode"] = ["ECO", "ECO", "SPORT", "ECO"]
+    merge_df["Mark Power"] = merge_df["Current Power Mode"] + merge_df["Marking Id"]
+    merge_df["Timestamp"] = ["2024-03-01_10-00-00"] * 3 + ["2024-03-02_10-00-00"]
+    merge_df["Bank Related Fails"] = ["Bank-rel(Only first)", "N/A", "N/A", "N/A"]
+
+    for batch in [merge_df.iloc[:3], merge_df.iloc[3:]]:
+        stored, replaced, preceding = history.append("Merge", batch)
+        assert state.apply(stored, replaced, preceding, lambda: pytest.fail("rebuilt"))
+
+    assert state.slt_tracker()["Marking Id"].tolist() == ["MK2", "MK1"]
+    assert "Bank-rel(Only first)" not in state.failure_categories()[0]
+    assert_matches_history(state, history.read("Merge"))
+
+
+def test_apply_after_a_concurrent_rebuild_does_not_count_twice(tmp_path):
+    history = HistoryStore(str(tmp_path / "history.sqlite3"))
+    state = YieldState(str(tmp_path / "yield_state.sqlite3"))
+    merge_df = make_merge_rows(400)
+    merge_df["Mark Power"] = [f"MP{position}" for position in range(len(merge_df))]  # No duplicates to drop
+    load_history = lambda: history.read_chunks("Merge", 100)
+
+    stored, replaced, preceding = history.append("Merge", merge_df.iloc[:200])
+    assert not state.apply(stored, replaced, preceding, load_history)  # Empty state: rebuilt from the history
+
+    # Worker A stores its batch; worker B rebuilds from a history that already holds it
+    stored, replaced, preceding = history.append("Merge", merge_df.iloc[200:])
+    assert (len(replaced), preceding) == (0, 200)
+    state.rebuild(load_history())
+    assert not state.apply(stored, replaced, preceding, load_history)
+
+    assert state.applied_rows() == history.count("Merge")
+    assert_matches_history(state, history.read("Merge"))
+
+
+def test_sync_rebuilds_only_when_the_row_count_differs(tmp_path):
+    state = YieldState(str(tmp_path / "yield_state.sqlite3"))
+    merge_df = make_merge_rows(90)
+    state.sync(len(merge_df), lambda: merge_df)
+    version = state.dataset_version()
+    state.sync(len(merge_df), lambda: pytest.fail("rebuilt"))
+    assert state.dataset_version() == version
+    assert_matches_history(state, merge_df)
+
+
+def test_rollups_refuse_stale_counters(tmp_path):
+    path = str(tmp_path / "yield_state.sqlite3")
+    merge_df = make_merge_rows(90)
+    with pytest.raises(StaleYieldState):
+        YieldState(path).rollups("lot")  # Never built
+
+    YieldState(path).rebuild(merge_df)
+    state = YieldState(path, lot_pattern=r"^LOT\d")  # Redeployed with another lot pattern
+    with pytest.raises(StaleYieldState):
+        state.rollups("lot")
+
+    state.sync(len(merge_df), lambda: merge_df)
+    assert set(state.rollups("lot")["Lot"]) == {"LOT0"}
+
+
+def test_an_ingest_rebuilds_stale_counters(tmp_path):
+    path = str(tmp_path / "yield_state.sqlite3")
+    merge_df = make_merge_rows(90)
+    YieldState(path, lot_pattern=r"^LOT\d").rebuild(merge_df.iloc[:60])
+    state = YieldState(path)  # Redeployed with the default lot pattern
+    with pytest.raises(StaleYieldState):
+        state.rollups("day")  # Reads never rebuild
+
+    batch = merge_df.iloc[60:]
+    assert not state.apply(batch, batch.iloc[:0], 60, lambda: merge_df)
+    assert_matches_history(state, merge_df)
+
+
+def test_rollups_of_an_empty_history(tmp_path):
+    state = YieldState(str(tmp_path / "yield_state.sqlite3"))
+    state.sync(0, lambda: [])
+    assert state.rollups("day").empty
+
+
+def test_readers_do_not_wait_for_a_writer(tmp_path):
+    path = str(tmp_path / "yield_state.sqlite3")
+    state = YieldState(path)
+    merge_df = make_merge_rows(90)
+    state.rebuild(merge_df)
+    with transaction(path) as db:
+        db.execute("DELETE FROM rollups")  # Not committed yet: readers see the last commit
+        assert state.applied_rows() == len(merge_df)
+        assert_matches_history(state, merge_df)